@@ -22,6 +22,8 @@ Requires: python3-uvloop
 Requires: python3-bonsai
 Requires: python3-unidecode
 Requires: python36-lxml
+Requires: python3-fastavro
+Requires: python3-msgpack
 
 BuildRequires: python3-devel python3-setuptools
 
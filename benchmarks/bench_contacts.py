@@ -0,0 +1,88 @@
+#!/usr/bin/python3
+
+"""
+   Join of contacts with synthetic GOCDB-like topology.
+
+   PYTHONPATH=tests python3 benchmarks/bench_contacts.py -e 100000
+"""
+
+import argparse
+import copy
+import logging
+import time
+
+from argo_connectors.log import Logger
+from argo_connectors.mesh.contacts import attach_contacts_topodata
+
+
+def build_topology(num_endpoints, num_sites, uid):
+    group_endpoints, group_groups = list(), list()
+    endpoints_contacts, sites_contacts = dict(), dict()
+
+    for i in range(num_endpoints):
+        site = 'SITE_{}'.format(i % num_sites)
+        hostname = 'host{}.{}.example.org'.format(i, site.lower())
+        service = 'SERVICE-{}'.format(i % 17)
+        if uid:
+            hostname = '{}_{}G0'.format(hostname, i)
+        group_endpoints.append({
+            'group': site, 'hostname': hostname, 'service': service,
+            'type': 'SITES', 'notifications': {'enabled': True},
+            'tags': {'monitored': '1', 'production': '1', 'scope': 'EGI'}
+        })
+        # every fifth endpoint has no contacts
+        if i % 5:
+            key = hostname.replace('_', '+', 1) if uid else \
+                '{}+{}'.format(hostname, service)
+            endpoints_contacts[key] = ['admin{}@{}.example.org'.format(i % 3, site.lower())]
+
+    for i in range(num_sites):
+        site = 'SITE_{}'.format(i)
+        group_groups.append({
+            'group': 'NGI_{}'.format(i % 40), 'type': 'NGI', 'subgroup': site,
+            'notifications': {'enabled': True},
+            'tags': {'certification': 'Certified', 'scope': 'EGI'}
+        })
+        # long contact lists with duplicates and comma separated entries
+        sites_contacts[site] = [
+            'ops{0}@{1}.example.org,sec{0}@{1}.example.org'.format(j % 100, site.lower())
+            for j in range(i % 400)
+        ] + ['noemail']
+
+    return group_endpoints, group_groups, endpoints_contacts, sites_contacts
+
+
+def bench(logger, contacts, topology, notification_flag, repeat):
+    best = None
+    for _ in range(repeat):
+        data = copy.deepcopy(topology)
+        start = time.perf_counter()
+        attach_contacts_topodata(logger, contacts, data, notification_flag)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark contacts join')
+    parser.add_argument('-e', dest='endpoints', type=int, default=100000)
+    parser.add_argument('-s', dest='sites', type=int, default=5000)
+    parser.add_argument('-r', dest='repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    logger = Logger('bench_contacts.py')
+    logger.logger.setLevel(logging.ERROR)
+    logger.customer = 'BENCH'
+
+    for uid in [False, True]:
+        group_endpoints, group_groups, endpoints_contacts, sites_contacts = \
+            build_topology(args.endpoints, args.sites, uid)
+        took = bench(logger, endpoints_contacts, group_endpoints, True, args.repeat)
+        print('endpoints={} uid={} join={:.3f}s'.format(len(group_endpoints), uid, took))
+
+    took = bench(logger, sites_contacts, group_groups, True, args.repeat)
+    print('groups={} join={:.3f}s'.format(len(group_groups), took))
+
+
+if __name__ == '__main__':
+    main()
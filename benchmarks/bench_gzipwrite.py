@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+
+"""
+   Compression of synthetic group of endpoints JSON document with gzip
+   module and with block-parallel gzip on growing number of threads.
+
+   PYTHONPATH=tests python3 benchmarks/bench_gzipwrite.py -e 200000 -t 1 2 4 8
+"""
+
+import argparse
+import gzip
+import io
+import json
+import os
+import time
+
+from argo_connectors.io.gzipwrite import ParallelGzipWriter
+
+
+def build_document(num_endpoints, num_sites):
+    group_endpoints = list()
+    for i in range(num_endpoints):
+        site = 'site{}'.format(i % num_sites)
+        group_endpoints.append({
+            'type': 'SITES', 'group': site.upper(), 'service': 'SERVICE-{}'.format(i % 17),
+            'notifications': {'contacts': ['admin@{}.example.org'.format(site)], 'enabled': True},
+            'hostname': 'host{}.{}.example.org'.format(i, site),
+            'tags': {'scope': 'EGI, wlcg, tier2', 'monitored': '1', 'production': '1',
+                     'info_ID': '{}G0'.format(i),
+                     'info_URL': 'https://host{}.{}.example.org:8443/'.format(i, site)}
+        })
+
+    return json.dumps(group_endpoints, indent=4).encode()
+
+
+def compress(data, level, threads):
+    out = io.BytesIO()
+    if threads:
+        gz = ParallelGzipWriter(out, filename='group_endpoints.json.gz',
+                                compresslevel=level, threads=threads)
+    else:
+        gz = gzip.GzipFile(filename='group_endpoints.json.gz', mode='wb',
+                           fileobj=out, compresslevel=level)
+    with gz:
+        # as JsonWriter writes it, in pieces of encoded entries
+        for i in range(0, len(data), 256 * 1024):
+            gz.write(data[i:i + 256 * 1024])
+
+    return out.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark parallel gzip')
+    parser.add_argument('-e', dest='endpoints', type=int, default=200000)
+    parser.add_argument('-s', dest='sites', type=int, default=5000)
+    parser.add_argument('-l', dest='level', type=int, default=6)
+    parser.add_argument('-t', dest='threads', type=int, nargs='+',
+                        default=sorted(set([1, 2, 4, os.cpu_count() or 1])))
+    args = parser.parse_args()
+
+    data = build_document(args.endpoints, args.sites)
+    print('document={:.1f}MB cpus={}'.format(len(data) / 1024.0 / 1024.0, os.cpu_count()))
+
+    for threads in [0] + args.threads:
+        start = time.perf_counter()
+        compressed = compress(data, args.level, threads)
+        elapsed = time.perf_counter() - start
+        assert gzip.decompress(compressed) == data
+        print('{:18} level={} compress={:.3f}s size={:.2f}MB'.format(
+            'gzip module' if not threads else 'parallel threads={}'.format(threads),
+            args.level, elapsed, len(compressed) / 1024.0 / 1024.0))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/python3
+
+"""
+   Writing synthetic GOCDB-like topology of group of endpoints to gzipped
+   JSON with whole document encoded at once and with streaming JsonWriter.
+
+   PYTHONPATH=tests python3 benchmarks/bench_jsonwrite.py -e 200000
+"""
+
+import argparse
+import gzip
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from argo_connectors.io.jsonwrite import JsonWriter
+from argo_connectors.records import GroupEndpoint
+
+
+def build_topology(num_endpoints, num_sites):
+    group_endpoints = list()
+    for i in range(num_endpoints):
+        site = 'SITE_{}'.format(i % num_sites)
+        group_endpoints.append(GroupEndpoint(
+            type='SITES', group=site, service='SERVICE-{}'.format(i % 17),
+            notifications={'contacts': ['admin@{}.example.org'.format(site.lower())],
+                           'enabled': True},
+            hostname='host{}.{}.example.org'.format(i, site.lower()),
+            tags={'scope': 'EGI, wlcg, tier2', 'monitored': '1', 'production': '1',
+                  'info_ID': '{}G0'.format(i),
+                  'info_URL': 'https://host{}.{}.example.org:8443/'.format(i, site.lower())}
+        ))
+
+    return group_endpoints
+
+
+def write_whole(data, filename):
+    # what JsonWriter did before, records as dicts to have the same output
+    json_data = json.dumps([entity.to_dict() for entity in data], indent=4)
+    with gzip.open(filename + '.gz', 'wb') as f:
+        f.write(json_data.encode())
+
+
+def write_stream(data, filename, compact, compress_level):
+    ret, excep = JsonWriter(data, filename, 'True', compact=compact,
+                            compress_level=compress_level).write_json()
+    if not ret:
+        raise excep
+
+
+def measure(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark JSON writer')
+    parser.add_argument('-e', dest='endpoints', type=int, default=200000)
+    parser.add_argument('-s', dest='sites', type=int, default=5000)
+    args = parser.parse_args()
+
+    data = build_topology(args.endpoints, args.sites)
+    dirpath = tempfile.mkdtemp()
+    filename = os.path.join(dirpath, 'group_endpoints.json')
+
+    runs = [
+        ('whole indent level=9', write_whole, (data, filename)),
+        ('stream indent level=9', write_stream, (data, filename, False, 9)),
+        ('stream indent level=6', write_stream, (data, filename, False, 6)),
+        ('stream compact level=6', write_stream, (data, filename, True, 6)),
+        ('stream compact level=1', write_stream, (data, filename, True, 1))
+    ]
+    for name, func, func_args in runs:
+        elapsed, peak = measure(func, *func_args)
+        size = os.stat(filename + '.gz').st_size
+        print('{:24} endpoints={} write={:.3f}s peak={:.1f}MB size={:.1f}MB'.format(
+            name, len(data), elapsed, peak / 1024.0 / 1024.0, size / 1024.0 / 1024.0))
+        os.remove(filename + '.gz')
+
+    os.rmdir(dirpath)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/python3
+
+"""
+   Writing synthetic GOCDB-like topology of group of endpoints in JSON,
+   Avro and MessagePack formats and reading it back as compute engine
+   would, with and without compression.
+
+   PYTHONPATH=tests:benchmarks python3 benchmarks/bench_outputwrite.py -e 200000
+"""
+
+import argparse
+import gzip
+import json
+import os
+import tempfile
+import time
+
+import fastavro
+import msgpack
+
+from argo_connectors.io.outputwrite import build_writer
+
+from bench_jsonwrite import build_topology
+
+
+def read_json(filename):
+    opener = gzip.open if filename.endswith('.gz') else open
+    with opener(filename, 'rb') as fp:
+        return json.loads(fp.read())
+
+
+def read_msgpack(filename):
+    opener = gzip.open if filename.endswith('.gz') else open
+    with opener(filename, 'rb') as fp:
+        return msgpack.unpackb(fp.read())
+
+
+def read_avro(filename):
+    with open(filename, 'rb') as fp:
+        return list(fastavro.reader(fp))
+
+
+READERS = {'json': read_json, 'msgpack': read_msgpack, 'avro': read_avro}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark output formats')
+    parser.add_argument('-e', dest='endpoints', type=int, default=200000)
+    parser.add_argument('-s', dest='sites', type=int, default=5000)
+    args = parser.parse_args()
+
+    data = build_topology(args.endpoints, args.sites)
+    dirpath = tempfile.mkdtemp()
+    filename = os.path.join(dirpath, 'group_endpoints.json')
+
+    for compress in ['False', 'True']:
+        for fmt in ['json', 'msgpack', 'avro']:
+            globopts = {'generalcompressjson': compress, 'jsonformat': fmt}
+            writer = build_writer(data, filename, 'group_endpoints', globopts)
+            path = writer.filename
+            if compress == str(True) and fmt != 'avro':
+                path += '.gz'
+
+            start = time.perf_counter()
+            ret, excep = writer.write()
+            if not ret:
+                raise excep
+            write = time.perf_counter() - start
+
+            start = time.perf_counter()
+            entries = READERS[fmt](path)
+            read = time.perf_counter() - start
+            assert len(entries) == len(data)
+
+            size = os.stat(path).st_size
+            print('{:8} compress={:5} endpoints={} write={:.3f}s read={:.3f}s size={:.1f}MB'.format(
+                fmt, compress, len(data), write, read, size / 1024.0 / 1024.0))
+            os.remove(path)
+
+    os.rmdir(dirpath)
+
+
+if __name__ == '__main__':
+    main()
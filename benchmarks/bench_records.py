@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+
+"""
+   Memory taken by synthetic GOCDB-like topology kept as dictionaries and
+   as __slots__ records.
+
+   PYTHONPATH=tests python3 benchmarks/bench_records.py -e 300000
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from argo_connectors.records import GroupEndpoint, GroupGroup
+
+
+def build_endpoint(cls, i, num_sites):
+    entity = cls()
+    # values are built at runtime as they are when parsed from feed
+    entity['type'] = ''.join(['SI', 'TES'])
+    entity['group'] = 'SITE_{}'.format(i % num_sites)
+    entity['service'] = 'SERVICE-{}'.format(i % 17)
+    entity['notifications'] = {'contacts': [], 'enabled': True}
+    entity['hostname'] = 'host{}.site{}.example.org'.format(i, i % num_sites)
+    entity['tags'] = {'scope': 'EGI', 'monitored': '1', 'production': '1',
+                      'info_ID': str(i)}
+    return entity
+
+
+def build_group(cls, i):
+    entity = cls()
+    entity['type'] = ''.join(['N', 'GI'])
+    entity['group'] = 'NGI_{}'.format(i % 40)
+    entity['subgroup'] = 'SITE_{}'.format(i)
+    entity['notifications'] = {'contacts': [], 'enabled': True}
+    entity['tags'] = {'certification': 'Certified', 'scope': 'EGI',
+                      'infrastructure': 'Production'}
+    return entity
+
+
+def measure(endpoint_cls, group_cls, num_endpoints, num_sites):
+    tracemalloc.start()
+    start = time.perf_counter()
+    group_endpoints = [build_endpoint(endpoint_cls, i, num_sites)
+                       for i in range(num_endpoints)]
+    group_groups = [build_group(group_cls, i) for i in range(num_sites)]
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del group_endpoints, group_groups
+
+    return current, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark topology records memory')
+    parser.add_argument('-e', dest='endpoints', type=int, default=300000)
+    parser.add_argument('-s', dest='sites', type=int, default=5000)
+    args = parser.parse_args()
+
+    for name, endpoint_cls, group_cls in [('dict', dict, dict),
+                                          ('records', GroupEndpoint, GroupGroup)]:
+        size, elapsed = measure(endpoint_cls, group_cls, args.endpoints, args.sites)
+        print('{:8} endpoints={} groups={} memory={:.1f}MB per_endpoint={}B build={:.3f}s'.format(
+            name, args.endpoints, args.sites, size / 1024.0 / 1024.0,
+            size // (args.endpoints + args.sites), elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+
+"""
+   Map of storage endpoints and VO paths built from synthetic GlueSATop
+   BDII dump.
+
+   PYTHONPATH=tests python3 benchmarks/bench_sepath.py -n 300000
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from bonsai import LDAPEntry
+
+from argo_connectors.log import Logger
+from argo_connectors.mesh.storage_element_path import build_map_endpoint_path
+
+
+def build_entries(num_entries, num_endpoints):
+    entries = list()
+    for i in range(num_entries):
+        endpoint = 'se{}.grid.example.org'.format(i % num_endpoints)
+        # every endpoint supports a few hundred VOs
+        vo = 'vo{}.example.org'.format((i // num_endpoints) % 300)
+        entry = LDAPEntry('GlueVOInfoLocalID={0}:pool{1},GlueSALocalID=pool{1}:replica:online,'
+                          'GlueSEUniqueID={2},Mds-Vo-name=SITE{3},Mds-Vo-name=local,o=grid'.format(
+                              vo, i, endpoint, i % 800))
+        entry['GlueVOInfoAccessControlBaseRule'] = [vo, 'VO:{}'.format(vo)]
+        entry['GlueVOInfoPath'] = ['/dpm/{}/home/{}'.format(endpoint, vo)]
+        entries.append(entry)
+
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark SE path map builder')
+    parser.add_argument('-n', dest='entries', type=int, default=300000)
+    parser.add_argument('-e', dest='endpoints', type=int, default=1000)
+    args = parser.parse_args()
+
+    logger = Logger('bench_sepath.py')
+    logger.customer = 'BENCH'
+    entries = build_entries(args.entries, args.endpoints)
+
+    start = time.perf_counter()
+    mapping = build_map_endpoint_path(logger, entries)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    build_map_endpoint_path(logger, entries)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print('entries={} endpoints={} paths={} build={:.3f}s peak={:.1f}MB'.format(
+        len(entries), len(mapping), sum([len(paths) for paths in mapping.values()]),
+        elapsed, peak / 1024.0 / 1024.0))
+
+
+if __name__ == '__main__':
+    main()
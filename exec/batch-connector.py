@@ -0,0 +1,90 @@
+#!/usr/bin/python3
+
+import argparse
+import os
+import sys
+
+import asyncio
+import uvloop
+
+from argo_connectors.batch import BatchRunner, BATCH_CONNECTORS, DEFAULT_CONCURRENCY, date_range
+from argo_connectors.exceptions import ConnectorError
+from argo_connectors.log import Logger
+from argo_connectors.utils import date_check
+from argo_connectors.io.http import close_sessions
+
+logger = None
+
+
+def main():
+    global logger
+    parser = argparse.ArgumentParser(description="""Run connectors for many customers
+                                                    and dates within single process""")
+    parser.add_argument('-c', dest='custconf', nargs='+', metavar='customer.conf',
+                        help='paths to customer configuration files', type=str, required=True)
+    parser.add_argument('-g', dest='gloconf', nargs=1, metavar='global.conf',
+                        help='path to global configuration file', type=str, required=False)
+    parser.add_argument('-n', dest='connectors', nargs='+', metavar='connector',
+                        help='connectors to run', choices=sorted(BATCH_CONNECTORS.keys()),
+                        default=sorted(BATCH_CONNECTORS.keys()), required=False)
+    parser.add_argument('-d', dest='date', metavar='YEAR-MONTH-DAY',
+                        help='write data for this date', type=str, required=False)
+    parser.add_argument('--from', dest='datefrom', metavar='YEAR-MONTH-DAY',
+                        help='write data for every date starting with this one', type=str, required=False)
+    parser.add_argument('--to', dest='dateto', metavar='YEAR-MONTH-DAY',
+                        help='write data for every date up to this one', type=str, required=False)
+    parser.add_argument('-p', dest='concurrency', metavar='N', default=DEFAULT_CONCURRENCY,
+                        help='number of tasks running at the same time', type=int, required=False)
+    args = parser.parse_args()
+
+    logger = Logger(os.path.basename(sys.argv[0]))
+    logger.customer = ''
+
+    dates = [None]
+    try:
+        if args.datefrom or args.dateto:
+            if not args.datefrom or not args.dateto:
+                logger.error('Both --from and --to dates must be given')
+                raise SystemExit(1)
+            dates = date_range(args.datefrom, args.dateto)
+        elif args.date and date_check(args.date):
+            dates = [args.date]
+
+    except ValueError as exc:
+        logger.error(exc)
+        raise SystemExit(1)
+
+    loop = uvloop.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    confpath = args.gloconf[0] if args.gloconf else None
+    runner = BatchRunner(loop, confpath, max(args.concurrency, 1))
+
+    failed = 0
+    try:
+        for connector in args.connectors:
+            for custconf in args.custconf:
+                try:
+                    runner.add(connector, custconf, dates)
+
+                except (ConnectorError, SystemExit) as exc:
+                    logger.error('%s %s: %s' % (connector, custconf, repr(exc)))
+                    failed += 1
+
+        failed += loop.run_until_complete(runner.run())
+
+    except KeyboardInterrupt as exc:
+        logger.error(repr(exc))
+        failed += 1
+
+    finally:
+        runner.shutdown()
+        loop.run_until_complete(close_sessions())
+        loop.close()
+
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -14,6 +14,8 @@ from argo_connectors.tasks.flat_downtimes import TaskCsvDowntimes
 from argo_connectors.tasks.common import write_state
 
 from argo_connectors.config import Global, CustomerConf
+from argo_connectors.io.http import close_sessions
+from argo_connectors.utils import window_days
 
 logger = None
 globopts = {}
@@ -32,7 +34,9 @@ def get_webapi_opts(cglob, confcust):
 def main():
     global logger, globopts
     parser = argparse.ArgumentParser(description='Fetch downtimes from CSV for given date')
-    parser.add_argument('-d', dest='date', nargs=1, metavar='YEAR-MONTH-DAY', required=True)
+    parser.add_argument('-d', dest='date', nargs=1, metavar='YEAR-MONTH-DAY', required=False)
+    parser.add_argument('--from', dest='datefrom', nargs=1, metavar='YEAR-MONTH-DAY', help='backfill downtimes starting with this date', required=False)
+    parser.add_argument('--to', dest='dateto', nargs=1, metavar='YEAR-MONTH-DAY', help='backfill downtimes up to this date', required=False)
     parser.add_argument('-c', dest='custconf', nargs=1, metavar='customer.conf', help='path to customer configuration file', type=str, required=False)
     parser.add_argument('-g', dest='gloconf', nargs=1, metavar='global.conf', help='path to global configuration file', type=str, required=False)
     args = parser.parse_args()
@@ -50,15 +54,22 @@ def main():
     feed = confcust.get_downfeed()
     logger.customer = confcust.get_custname()
 
-    if len(args.date) == 0:
+    if args.date and not args.datefrom and not args.dateto:
+        datefrom, dateto = args.date[0], args.date[0]
+    elif args.datefrom and args.dateto and not args.date:
+        datefrom, dateto = args.datefrom[0], args.dateto[0]
+    else:
         print(parser.print_help())
         raise SystemExit(1)
 
     # calculate start and end times
     try:
-        current_date = datetime.datetime.strptime(args.date[0], '%Y-%m-%d')
+        current_date = datetime.datetime.strptime(datefrom, '%Y-%m-%d')
         timestamp = current_date.strftime('%Y_%m_%d')
         current_date = current_date.replace(hour=0, minute=0, second=0)
+        end_date = datetime.datetime.strptime(dateto, '%Y-%m-%d')
+        if end_date < current_date:
+            raise ValueError('End date %s before start date %s' % (dateto, datefrom))
 
     except ValueError as exc:
         logger.error(exc)
@@ -76,16 +87,18 @@ def main():
         task = TaskCsvDowntimes(loop, logger, sys.argv[0], globopts,
                                 webapi_opts, confcust,
                                 confcust.get_custname(cust), feed,
-                                current_date, uidservtype, args.date[0],
-                                timestamp)
+                                current_date, uidservtype, datefrom,
+                                timestamp, end_date)
         loop.run_until_complete(task.run())
 
     except (ConnectorHttpError, ConnectorParseError, KeyboardInterrupt) as exc:
         logger.error(repr(exc))
-        loop.run_until_complete(
-            write_state(sys.argv[0], globopts, confcust, timestamp, False)
-        )
+        for day in window_days(current_date, end_date):
+            loop.run_until_complete(
+                write_state(sys.argv[0], globopts, confcust, day.replace('-', '_'), False)
+            )
 
+    loop.run_until_complete(close_sessions())
     loop.close()
 
 if __name__ == '__main__':
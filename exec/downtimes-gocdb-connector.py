@@ -8,34 +8,31 @@ import sys
 import asyncio
 import uvloop
 
-from argo_connectors.exceptions import ConnectorHttpError, ConnectorParseError
+from argo_connectors.exceptions import ConnectorError, ConnectorHttpError, ConnectorParseError
 from argo_connectors.log import Logger
-from argo_connectors.tasks.gocdb_downtimes import TaskGocdbDowntimes
+from argo_connectors.tasks.builders import build_downtimes_gocdb_task
 from argo_connectors.tasks.common import write_state
 
 from argo_connectors.config import Global, CustomerConf
+from argo_connectors.io.http import close_sessions
+from argo_connectors.utils import window_days
 
 logger = None
 globopts = {}
 
 
-def get_webapi_opts(cglob, confcust):
-    webapi_custopts = confcust.get_webapiopts()
-    webapi_opts = cglob.merge_opts(webapi_custopts, 'webapi')
-    webapi_complete, missopt = cglob.is_complete(webapi_opts, 'webapi')
-    if not webapi_complete:
-        logger.error('Customer:%s %s options incomplete, missing %s' %
-                     (logger.customer, 'webapi', ' '.join(missopt)))
-        raise SystemExit(1)
-    return webapi_opts
-
-
 def main():
     global logger, globopts
     parser = argparse.ArgumentParser(
         description='Fetch downtimes from GOCDB for given date')
     parser.add_argument('-d', dest='date', nargs=1,
-                        metavar='YEAR-MONTH-DAY', required=True)
+                        metavar='YEAR-MONTH-DAY', required=False)
+    parser.add_argument('--from', dest='datefrom', nargs=1,
+                        help='backfill downtimes starting with this date',
+                        metavar='YEAR-MONTH-DAY', required=False)
+    parser.add_argument('--to', dest='dateto', nargs=1,
+                        help='backfill downtimes up to this date',
+                        metavar='YEAR-MONTH-DAY', required=False)
     parser.add_argument('-c', dest='custconf', nargs=1, metavar='customer.conf',
                         help='path to customer configuration file', type=str, required=False)
     parser.add_argument('-g', dest='gloconf', nargs=1, metavar='global.conf',
@@ -55,51 +52,52 @@ def main():
 
     logger.customer = confcust.get_custname()
 
-    auth_custopts = confcust.get_authopts()
-    auth_opts = cglob.merge_opts(auth_custopts, 'authentication')
-    auth_complete, missing = cglob.is_complete(auth_opts, 'authentication')
-    if not auth_complete:
-        logger.error('%s options incomplete, missing %s' %
-                     ('authentication', ' '.join(missing)))
-        raise SystemExit(1)
-
-    if len(args.date) == 0:
+    if args.date and not args.datefrom and not args.dateto:
+        datefrom, dateto = args.date[0], args.date[0]
+    elif args.datefrom and args.dateto and not args.date:
+        datefrom, dateto = args.datefrom[0], args.dateto[0]
+    else:
+        logger.error('Either -d or both --from and --to dates must be given')
         raise SystemExit(1)
 
     # calculate start and end times
     try:
-        start = datetime.datetime.strptime(args.date[0], '%Y-%m-%d')
-        end = datetime.datetime.strptime(args.date[0], '%Y-%m-%d')
+        start = datetime.datetime.strptime(datefrom, '%Y-%m-%d')
+        end = datetime.datetime.strptime(dateto, '%Y-%m-%d')
         timestamp = start.strftime('%Y_%m_%d')
         start = start.replace(hour=0, minute=0, second=0)
         end = end.replace(hour=23, minute=59, second=59)
+        if end < start:
+            raise ValueError('End date %s before start date %s' % (dateto, datefrom))
 
     except ValueError as exc:
         logger.error(exc)
         raise SystemExit(1)
 
-    downtime_feed = confcust.get_downfeed()
-
-    uidservtype = confcust.get_uidserviceendpoints()
-    webapi_opts = get_webapi_opts(cglob, confcust)
-
     loop = uvloop.new_event_loop()
     asyncio.set_event_loop(loop)
 
     try:
-        cust = list(confcust.get_customers())[0]
-        task = TaskGocdbDowntimes(loop, logger, sys.argv[0], globopts,
-                                  auth_opts, webapi_opts, confcust,
-                                  confcust.get_custname(cust), downtime_feed, start,
-                                  end, uidservtype, args.date[0], timestamp)
+        task = build_downtimes_gocdb_task(loop, logger, sys.argv[0], cglob,
+                                          globopts, confcust, start, end,
+                                          datefrom, timestamp)
+
+    except ConnectorError as exc:
+        logger.error('Customer:%s %s' % (logger.customer, exc))
+        loop.close()
+        raise SystemExit(1)
+
+    try:
         loop.run_until_complete(task.run())
 
     except (ConnectorHttpError, ConnectorParseError, KeyboardInterrupt) as exc:
         logger.error(repr(exc))
-        loop.run_until_complete(
-            write_state(sys.argv[0], globopts, confcust, timestamp, False)
-        )
+        for day in window_days(start, end):
+            loop.run_until_complete(
+                write_state(sys.argv[0], globopts, confcust, day.replace('-', '_'), False)
+            )
 
+    loop.run_until_complete(close_sessions())
     loop.close()
 
 
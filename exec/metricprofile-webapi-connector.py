@@ -11,6 +11,7 @@ from argo_connectors.config import CustomerConf, Global
 from argo_connectors.log import Logger
 from argo_connectors.tasks.webapi_metricprofile import TaskWebApiMetricProfile
 from argo_connectors.utils import date_check
+from argo_connectors.io.http import close_sessions
 
 logger = None
 
@@ -56,6 +57,7 @@ def main():
             logger.error(repr(exc))
 
         finally:
+            loop.run_until_complete(close_sessions())
             loop.close()
 
 
@@ -15,6 +15,7 @@ from argo_connectors.tasks.common import write_state
 from argo_connectors.utils import date_check
 
 from argo_connectors.config import Global, CustomerConf
+from argo_connectors.io.http import close_sessions
 
 logger = None
 globopts = {}
@@ -84,6 +85,7 @@ def main():
         )
 
     finally:
+        loop.run_until_complete(close_sessions())
         loop.close()
 
 if __name__ == '__main__':
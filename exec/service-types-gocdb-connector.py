@@ -8,28 +8,19 @@ import sys
 import asyncio
 import uvloop
 
-from argo_connectors.exceptions import ConnectorHttpError, ConnectorParseError
+from argo_connectors.exceptions import ConnectorError, ConnectorHttpError, ConnectorParseError
 from argo_connectors.log import Logger
-from argo_connectors.tasks.gocdb_servicetypes import TaskGocdbServiceTypes
+from argo_connectors.tasks.builders import build_servicetypes_gocdb_task
 from argo_connectors.tasks.common import write_state
 from argo_connectors.utils import date_check
 
 from argo_connectors.config import Global, CustomerConf
+from argo_connectors.io.http import close_sessions
 
 logger = None
 globopts = {}
 
 
-def get_webapi_opts(cglob, confcust):
-    webapi_custopts = confcust.get_webapiopts()
-    webapi_opts = cglob.merge_opts(webapi_custopts, 'webapi')
-    webapi_complete, missopt = cglob.is_complete(webapi_opts, 'webapi')
-    if not webapi_complete:
-        logger.error('Customer:%s %s options incomplete, missing %s' % (logger.customer, 'webapi', ' '.join(missopt)))
-        raise SystemExit(1)
-    return webapi_opts
-
-
 def main():
     global logger, globopts
     parser = argparse.ArgumentParser(description='Fetch service types from GOCDB')
@@ -53,27 +44,22 @@ def main():
     confcust.parse()
     confcust.make_dirstruct()
     confcust.make_dirstruct(globopts['InputStateSaveDir'.lower()])
-    feed = confcust.get_servicesfeed()
-    custname = confcust.get_custname()
     logger.customer = confcust.get_custname()
 
-    auth_custopts = confcust.get_authopts()
-    auth_opts = cglob.merge_opts(auth_custopts, 'authentication')
-    auth_complete, missing = cglob.is_complete(auth_opts, 'authentication')
-    if not auth_complete:
-        logger.error('%s options incomplete, missing %s' % ('authentication', ' '.join(missing)))
-        raise SystemExit(1)
-
-    webapi_opts = get_webapi_opts(cglob, confcust)
-
     loop = uvloop.new_event_loop()
     asyncio.set_event_loop(loop)
 
     try:
-        task = TaskGocdbServiceTypes(
-            loop, logger, sys.argv[0], globopts, auth_opts, webapi_opts,
-            confcust, custname, feed, fixed_date, args.initsync
-        )
+        task = build_servicetypes_gocdb_task(loop, logger, sys.argv[0], cglob,
+                                             globopts, confcust, fixed_date,
+                                             args.initsync)
+
+    except ConnectorError as exc:
+        logger.error('Customer:%s %s' % (logger.customer, exc))
+        loop.close()
+        raise SystemExit(1)
+
+    try:
         loop.run_until_complete(task.run())
 
     except (KeyboardInterrupt) as exc:
@@ -83,6 +69,7 @@ def main():
         )
 
     finally:
+        loop.run_until_complete(close_sessions())
         loop.close()
 
 if __name__ == '__main__':
@@ -13,6 +13,7 @@ from argo_connectors.config import Global, CustomerConf
 from argo_connectors.utils import date_check
 from argo_connectors.tasks.agora_topology import TaskProviderTopology
 from argo_connectors.tasks.common import write_state
+from argo_connectors.io.http import close_sessions
 
 
 logger = None
@@ -76,5 +77,9 @@ def main():
             write_state(sys.argv[0], globopts, confcust, fixed_date, False)
         )
 
+    loop.run_until_complete(close_sessions())
+    loop.close()
+
+
 if __name__ == '__main__':
     main()
\ No newline at end of file
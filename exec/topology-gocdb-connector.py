@@ -10,40 +10,17 @@ import uvloop
 from argo_connectors.config import Global, CustomerConf
 from argo_connectors.exceptions import ConnectorError, ConnectorParseError, ConnectorHttpError
 from argo_connectors.log import Logger
+from argo_connectors.tasks.builders import build_topology_gocdb_task
 from argo_connectors.tasks.common import write_state
-from argo_connectors.tasks.gocdb_topology import TaskGocdbTopology
 from argo_connectors.utils import date_check
+from argo_connectors.workers import build_worker_pool
+from argo_connectors.io.http import close_sessions
 
 logger = None
 globopts = {}
 custname = ''
 isok = True
 
-# GOCDB explicitly says &scope='' for all scopes
-
-def get_webapi_opts(cglob, confcust):
-    webapi_custopts = confcust.get_webapiopts()
-    webapi_opts = cglob.merge_opts(webapi_custopts, 'webapi')
-    webapi_complete, missopt = cglob.is_complete(webapi_opts, 'webapi')
-    if not webapi_complete:
-        logger.error('Customer:%s %s options incomplete, missing %s' %
-                     (logger.customer, 'webapi', ' '.join(missopt)))
-        raise SystemExit(1)
-    return webapi_opts
-
-
-def get_bdii_opts(confcust):
-    bdii_custopts = confcust._get_cust_options('BDIIOpts')
-    if bdii_custopts:
-        bdii_complete, missing = confcust.is_complete_bdii(bdii_custopts)
-        if not bdii_complete:
-            logger.error('%s options incomplete, missing %s' %
-                         ('bdii', ' '.join(missing)))
-            raise SystemExit(1)
-        return bdii_custopts
-    else:
-        return None
-
 
 def main():
     global logger, globopts, confcust
@@ -67,57 +44,31 @@ def main():
     confpath = args.gloconf[0] if args.gloconf else None
     cglob = Global(sys.argv[0], confpath)
     globopts = cglob.parse()
-    pass_extensions = eval(globopts['GeneralPassExtensions'.lower()])
 
     confpath = args.custconf[0] if args.custconf else None
     confcust = CustomerConf(sys.argv[0], confpath)
     confcust.parse()
     confcust.make_dirstruct()
     confcust.make_dirstruct(globopts['InputStateSaveDir'.lower()])
-    topofeed = confcust.get_topofeed()
-    topofeedpaging = confcust.get_topofeedpaging()
-    uidservendp = confcust.get_uidserviceendpoints()
-    topofetchtype = confcust.get_topofetchtype()
     custname = confcust.get_custname()
     logger.customer = custname
 
-    auth_custopts = confcust.get_authopts()
-    auth_opts = cglob.merge_opts(auth_custopts, 'authentication')
-    auth_complete, missing = cglob.is_complete(auth_opts, 'authentication')
-    if not auth_complete:
-        logger.error('%s options incomplete, missing %s' %
-                     ('authentication', ' '.join(missing)))
-        raise SystemExit(1)
-
-    bdii_opts = get_bdii_opts(confcust)
-    webapi_opts = get_webapi_opts(cglob, confcust)
-
-    toposcope = confcust.get_toposcope()
-    topofeedendpoints = confcust.get_topofeedendpoints()
-    topofeedservicegroups = confcust.get_topofeedservicegroups()
-    topofeedsites = confcust.get_topofeedsites()
-    notiflag = confcust.get_notif_flag()
-
-    if toposcope:
-        SERVICE_ENDPOINTS_PI = topofeedendpoints + toposcope
-        SERVICE_GROUPS_PI = topofeedservicegroups + toposcope
-        SITES_PI = topofeedsites + toposcope
-
-    else:
-        SERVICE_ENDPOINTS_PI = topofeedendpoints
-        SERVICE_GROUPS_PI = topofeedservicegroups
-        SITES_PI = topofeedsites
-
     loop = uvloop.new_event_loop()
     asyncio.set_event_loop(loop)
+    worker_pool = build_worker_pool(globopts)
+
+    try:
+        task = build_topology_gocdb_task(loop, logger, sys.argv[0], cglob,
+                                         globopts, confcust, fixed_date,
+                                         worker_pool)
+
+    except ConnectorError as exc:
+        logger.error('Customer:%s %s' % (logger.customer, exc))
+        worker_pool.shutdown()
+        loop.close()
+        raise SystemExit(1)
 
     try:
-        task = TaskGocdbTopology(
-            loop, logger, sys.argv[0], SERVICE_ENDPOINTS_PI, SERVICE_GROUPS_PI,
-            SITES_PI, globopts, auth_opts, webapi_opts, bdii_opts, confcust,
-            custname, topofeed, topofetchtype, fixed_date, uidservendp,
-            pass_extensions, topofeedpaging, notiflag
-        )
         loop.run_until_complete(task.run())
 
     except (ConnectorError, ConnectorParseError, ConnectorHttpError, KeyboardInterrupt) as exc:
@@ -127,6 +78,8 @@ def main():
         )
 
     finally:
+        worker_pool.shutdown()
+        loop.run_until_complete(close_sessions())
         loop.close()
 
 
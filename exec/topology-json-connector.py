@@ -13,6 +13,7 @@ from argo_connectors.log import Logger
 from argo_connectors.tasks.common import write_state
 from argo_connectors.tasks.flat_topology import TaskFlatTopology
 from argo_connectors.utils import date_check
+from argo_connectors.io.http import close_sessions
 
 logger = None
 globopts = {}
@@ -86,6 +87,9 @@ def main():
             write_state(sys.argv[0], globopts, confcust, fixed_date, False)
         )
 
+    loop.run_until_complete(close_sessions())
+    loop.close()
+
 
 if __name__ == '__main__':
     main()
@@ -15,6 +15,7 @@ from argo_connectors.config import Global, CustomerConf
 from argo_connectors.utils import filename_date, datestamp, date_check
 from argo_connectors.tasks.provider_topology import TaskProviderTopology
 from argo_connectors.tasks.common import write_state
+from argo_connectors.io.http import close_sessions
 
 
 logger = None
@@ -88,5 +89,9 @@ def main():
             write_state(sys.argv[0], globopts, confcust, fixed_date, False)
         )
 
+    loop.run_until_complete(close_sessions())
+    loop.close()
+
+
 if __name__ == '__main__':
     main()
@@ -8,12 +8,13 @@ import asyncio
 import uvloop
 
 from argo_connectors.exceptions import ConnectorHttpError, ConnectorParseError
-from argo_connectors.tasks.vapor_weights import TaskVaporWeights
+from argo_connectors.tasks.builders import build_weights_vapor_task, get_feed_labels
 from argo_connectors.tasks.common import write_weights_metricprofile_state as write_state
 from argo_connectors.log import Logger
 
 from argo_connectors.config import Global, CustomerConf
 from argo_connectors.utils import date_check
+from argo_connectors.io.http import close_sessions
 
 globopts = {}
 logger = None
@@ -54,19 +55,12 @@ def main():
     asyncio.set_event_loop(loop)
 
     for feed, jobcust in feeds.items():
-        customers = set(map(lambda jc: confcust.get_custname(jc[1]), jobcust))
-        customers = customers.pop() if len(
-            customers) == 1 else '({0})'.format(','.join(customers))
-        sjobs = set(map(lambda jc: jc[0], jobcust))
-        jobs = list(sjobs)[0] if len(
-            sjobs) == 1 else '({0})'.format(','.join(sjobs))
-        logger.job = jobs
-        logger.customer = customers
+        logger.job, logger.customer = get_feed_labels(confcust, jobcust)
 
         try:
-            task = TaskVaporWeights(loop, logger, sys.argv[0], globopts,
-                                    confcust, VAPORPI, jobcust, cglob,
-                                    fixed_date)
+            task = build_weights_vapor_task(loop, logger, sys.argv[0], cglob,
+                                            globopts, confcust, jobcust,
+                                            fixed_date)
             loop.run_until_complete(task.run())
 
         except (ConnectorHttpError, ConnectorParseError, KeyboardInterrupt) as exc:
@@ -77,6 +71,9 @@ def main():
                                 job, confcust, fixed_date, True)
                 )
 
+    loop.run_until_complete(close_sessions())
+    loop.close()
+
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,189 @@
+import asyncio
+import copy
+import datetime
+
+from argo_connectors.config import Global, CustomerConf
+from argo_connectors.log import Logger
+from argo_connectors.tasks.builders import build_downtimes_gocdb_task, build_servicetypes_gocdb_task, build_topology_gocdb_task, build_weights_vapor_task, get_feed_labels
+from argo_connectors.tasks.common import write_state, write_weights_metricprofile_state
+from argo_connectors.workers import build_worker_pool
+
+
+DEFAULT_CONCURRENCY = 8
+
+
+def date_range(start, end):
+    """
+       Dates from start to end, both included, as YEAR-MONTH-DAY strings
+    """
+    start = datetime.datetime.strptime(start, '%Y-%m-%d')
+    end = datetime.datetime.strptime(end, '%Y-%m-%d')
+    if end < start:
+        raise ValueError('End date {} before start date {}'.format(
+            end.strftime('%Y-%m-%d'), start.strftime('%Y-%m-%d')))
+
+    dates = list()
+    while start <= end:
+        dates.append(start.strftime('%Y-%m-%d'))
+        start += datetime.timedelta(days=1)
+
+    return dates
+
+
+def downtimes_window(date):
+    start = datetime.datetime.strptime(date, '%Y-%m-%d')
+    end = start.replace(hour=23, minute=59, second=59)
+    return start, end, start.strftime('%Y_%m_%d')
+
+
+class BatchJob(object):
+    """
+       Task of one connector for one customer and date together with
+       coroutine function that records failed state if task does not
+       complete.
+    """
+    def __init__(self, logger, task, fail):
+        self.logger = logger
+        self.task = task
+        self.fail = fail
+
+
+def topology_gocdb_jobs(runner, connector, logger, cglob, globopts, confcust, date):
+    task = build_topology_gocdb_task(runner.loop, logger, connector, cglob,
+                                     globopts, confcust, date,
+                                     runner.get_worker_pool(globopts))
+
+    async def fail():
+        await write_state(connector, globopts, confcust, date, False)
+
+    return [BatchJob(logger, task, fail)]
+
+
+def downtimes_gocdb_jobs(runner, connector, logger, cglob, globopts, confcust, date):
+    date = date or datetime.datetime.now().strftime('%Y-%m-%d')
+    start, end, timestamp = downtimes_window(date)
+    task = build_downtimes_gocdb_task(runner.loop, logger, connector, cglob,
+                                      globopts, confcust, start, end, date,
+                                      timestamp)
+
+    async def fail():
+        await write_state(connector, globopts, confcust, timestamp, False)
+
+    return [BatchJob(logger, task, fail)]
+
+
+def servicetypes_gocdb_jobs(runner, connector, logger, cglob, globopts, confcust, date):
+    task = build_servicetypes_gocdb_task(runner.loop, logger, connector, cglob,
+                                         globopts, confcust, date)
+
+    async def fail():
+        await write_state(connector, globopts, confcust, date, False)
+
+    return [BatchJob(logger, task, fail)]
+
+
+def weights_vapor_jobs(runner, connector, logger, cglob, globopts, confcust, date):
+    vaporpi = confcust.get_vaporpi()
+    feeds = confcust.get_mapfeedjobs(connector, deffeed=vaporpi)
+
+    jobs = list()
+    for feed, jobcust in feeds.items():
+        feedlogger = copy.copy(logger)
+        feedlogger.job, feedlogger.customer = get_feed_labels(confcust, jobcust)
+        task = build_weights_vapor_task(runner.loop, feedlogger, connector,
+                                        cglob, globopts, confcust, jobcust,
+                                        date)
+
+        async def fail(jobcust=jobcust):
+            for job, cust in jobcust:
+                await write_weights_metricprofile_state(connector, globopts,
+                                                        cust, job, confcust,
+                                                        date, False)
+
+        jobs.append(BatchJob(feedlogger, task, fail))
+
+    return jobs
+
+
+BATCH_CONNECTORS = {
+    'topology-gocdb-connector.py': topology_gocdb_jobs,
+    'downtimes-gocdb-connector.py': downtimes_gocdb_jobs,
+    'service-types-gocdb-connector.py': servicetypes_gocdb_jobs,
+    'weights-vapor-connector.py': weights_vapor_jobs
+}
+
+
+class BatchRunner(object):
+    """
+       Runs tasks of several connectors for many customers and dates on one
+       event loop. global.conf is parsed once per connector, tasks share
+       HTTP sessions and worker pool of the process and at most concurrency
+       of them are running at the same time.
+    """
+    def __init__(self, loop, gloconf=None, concurrency=DEFAULT_CONCURRENCY):
+        self.loop = loop
+        self.gloconf = gloconf
+        self.concurrency = concurrency
+        self.jobs = list()
+        self.worker_pool = None
+        self._globals = dict()
+        self._loggers = dict()
+
+    def get_global(self, connector):
+        if connector not in self._globals:
+            cglob = Global(connector, self.gloconf)
+            self._globals[connector] = (cglob, cglob.parse())
+        return self._globals[connector]
+
+    def get_logger(self, connector):
+        if connector not in self._loggers:
+            self._loggers[connector] = Logger(connector)
+        return copy.copy(self._loggers[connector])
+
+    def get_worker_pool(self, globopts):
+        if self.worker_pool is None:
+            self.worker_pool = build_worker_pool(globopts)
+        return self.worker_pool
+
+    def add(self, connector, custconf, dates):
+        """
+           Schedule tasks of connector for customer.conf and every date.
+           Date None stands for the current day.
+        """
+        cglob, globopts = self.get_global(connector)
+        confcust = CustomerConf(connector, custconf)
+        confcust.parse()
+        confcust.make_dirstruct()
+        confcust.make_dirstruct(globopts['InputStateSaveDir'.lower()])
+
+        for date in dates:
+            logger = self.get_logger(connector)
+            logger.customer = confcust.get_custname()
+            self.jobs.extend(BATCH_CONNECTORS[connector](
+                self, connector, logger, cglob, globopts, confcust, date))
+
+    async def _run_job(self, semaphore, job):
+        async with semaphore:
+            try:
+                await job.task.run()
+                return True
+
+            # write helpers bail out with SystemExit, it must not stop the
+            # whole batch
+            except (Exception, SystemExit) as exc:
+                job.logger.error(repr(exc))
+                await job.fail()
+                return False
+
+    async def run(self):
+        """
+           Run all scheduled tasks and return the number of failed ones
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = await asyncio.gather(*[self._run_job(semaphore, job)
+                                         for job in self.jobs])
+        return results.count(False)
+
+    def shutdown(self):
+        if self.worker_pool is not None:
+            self.worker_pool.shutdown()
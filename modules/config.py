@@ -16,9 +16,23 @@ class Global(object):
     conf_auth = {'Authentication': ['HostKey', 'HostCert', 'CAPath', 'CAFile',
                                     'VerifyServerCert', 'UsePlainHttpAuth',
                                     'HttpUser', 'HttpPass']}
-    conf_conn = {'Connection': ['Timeout', 'Retry', 'SleepRetry', 'RetryRandom', 'SleepRandomRetryMax']}
+    conf_conn = {'Connection': ['Timeout', 'Retry', 'SleepRetry', 'RetryRandom', 'SleepRandomRetryMax',
+                                'SleepRetryMax', 'BreakerThreshold', 'BreakerCooldown']}
     conf_state = {'InputState': ['SaveDir', 'Days']}
     conf_webapi = {'WebAPI': ['Token', 'Host']}
+    conf_workers = {'Workers': ['PoolSize', 'InProcessThreshold']}
+    conf_publish = {'Publish': ['Diff', 'Compress', 'CompressLevel']}
+    conf_json = {'Json': ['Compact', 'CompressLevel', 'CompressThreads',
+                          'Format']}
+    conf_cache = {'Cache': ['Http', 'HttpMaxAge', 'HttpMaxSize', 'Parsed',
+                            'ParsedMaxEntries', 'Bdii', 'BdiiTTL',
+                            'BdiiMaxStale']}
+    conf_metrics = {'Metrics': ['Prometheus', 'PrometheusDir', 'Summary',
+                                'SummaryDir']}
+
+    # options that can be left out from otherwise mandatory sections
+    conf_optional = {'Connection': ['SleepRetryMax', 'BreakerThreshold',
+                                    'BreakerCooldown']}
 
     # options specific for every connector
     conf_topo_output = {'Output': ['TopologyGroupOfEndpoints',
@@ -37,15 +51,26 @@ class Global(object):
 
         self.optional.update(self._lowercase_dict(self.conf_auth))
         self.optional.update(self._lowercase_dict(self.conf_webapi))
+        self.optional.update(self._lowercase_dict(self.conf_workers))
+        self.optional.update(self._lowercase_dict(self.conf_cache))
+        self.optional.update(self._lowercase_dict(self.conf_publish))
+        self.optional.update(self._lowercase_dict(self.conf_json))
+        self.optional.update(self._lowercase_dict(self.conf_metrics))
+        self.optional_opts = self._lowercase_dict(self.conf_optional)
 
         self.shared_secopts = self._merge_dict(self.conf_general,
                                                self.conf_auth, self.conf_conn,
                                                self.conf_state,
-                                               self.conf_webapi)
+                                               self.conf_webapi,
+                                               self.conf_cache,
+                                               self.conf_publish,
+                                               self.conf_json,
+                                               self.conf_metrics)
         self.secopts = {
             'topology-gocdb-connector.py':
             self._merge_dict(self.shared_secopts,
-                             self.conf_topo_output),
+                             self.conf_topo_output,
+                             self.conf_workers),
             'topology-json-connector.py':
             self._merge_dict(self.shared_secopts,
                              self.conf_topo_output),
@@ -172,6 +197,9 @@ class Global(object):
                                 if (s in self.optional.keys() and
                                         e.option in self.optional[s]):
                                     pass
+                                elif (s in self.optional_opts.keys() and
+                                        e.option in self.optional_opts[s]):
+                                    pass
                                 else:
                                     raise e
 
@@ -229,6 +257,9 @@ class CustomerConf(object):
 
     def __init__(self, caller, confpath, **kwargs):
         self.logger = Logger(str(self.__class__))
+        # per instance so several customer.conf can be parsed in one process
+        self._cust = dict()
+        self._jobs = dict()
         self._filename = '/etc/argo-connectors/customer.conf' if not confpath else confpath
         if not kwargs:
             self._jobattrs = self._defjobattrs[os.path.basename(caller)]
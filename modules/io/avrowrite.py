@@ -0,0 +1,93 @@
+from argo_connectors.io.jsonwrite import JsonWriter, DEFAULT_COMPRESS_LEVEL
+from argo_connectors.records import TopoRecord
+
+try:
+    import fastavro
+except ImportError:
+    fastavro = None
+
+
+TAG_VALUE = ['null', 'string', 'boolean', 'long', 'double']
+NOTIFICATIONS = ['null', {
+    'type': 'record', 'name': 'Notifications', 'fields': [
+        {'name': 'contacts', 'type': {'type': 'array', 'items': 'string'}, 'default': []},
+        {'name': 'enabled', 'type': ['boolean', 'string'], 'default': True}
+    ]
+}]
+
+SCHEMAS = {
+    'group_endpoints': {
+        'type': 'record', 'name': 'GroupEndpoint', 'namespace': 'argo.avro',
+        'fields': [
+            {'name': 'type', 'type': 'string'},
+            {'name': 'group', 'type': 'string'},
+            {'name': 'service', 'type': 'string'},
+            {'name': 'hostname', 'type': 'string'},
+            {'name': 'notifications', 'type': NOTIFICATIONS, 'default': None},
+            {'name': 'tags', 'type': ['null', {'type': 'map', 'values': TAG_VALUE}],
+             'default': None}
+        ]
+    },
+    'group_groups': {
+        'type': 'record', 'name': 'GroupGroup', 'namespace': 'argo.avro',
+        'fields': [
+            {'name': 'type', 'type': 'string'},
+            {'name': 'group', 'type': 'string'},
+            {'name': 'subgroup', 'type': 'string'},
+            {'name': 'notifications', 'type': NOTIFICATIONS, 'default': None},
+            {'name': 'tags', 'type': ['null', {'type': 'map', 'values': TAG_VALUE}],
+             'default': None}
+        ]
+    },
+    'downtimes': {
+        'type': 'record', 'name': 'Downtime', 'namespace': 'argo.avro',
+        'fields': [
+            {'name': 'hostname', 'type': 'string'},
+            {'name': 'service', 'type': 'string'},
+            {'name': 'start_time', 'type': 'string'},
+            {'name': 'end_time', 'type': 'string'}
+        ]
+    },
+    'weights': {
+        'type': 'record', 'name': 'Weight', 'namespace': 'argo.avro',
+        'fields': [
+            {'name': 'type', 'type': 'string'},
+            {'name': 'site', 'type': 'string'},
+            {'name': 'weight', 'type': ['string', 'long', 'double']}
+        ]
+    },
+    'metric_profiles': {
+        'type': 'record', 'name': 'MetricProfile', 'namespace': 'argo.avro',
+        'fields': [
+            {'name': 'profile', 'type': 'string'},
+            {'name': 'service', 'type': 'string'},
+            {'name': 'metric', 'type': 'string'}
+        ]
+    }
+}
+
+
+class AvroWriter(JsonWriter):
+    """
+       Write list of entries as Avro object container file with schema of
+       given kind of data. Compression is done with deflate codec on Avro
+       blocks instead of gzipping whole file.
+    """
+    def __init__(self, data, filename, compress_json, schema,
+                 compress_level=DEFAULT_COMPRESS_LEVEL):
+        super(AvroWriter, self).__init__(data, filename, 'False',
+                                         compress_level=compress_level)
+        self.schema = SCHEMAS[schema]
+        self.codec = 'deflate' if compress_json == str(True) else 'null'
+
+    def _records(self):
+        for entry in self.data:
+            yield entry.to_dict() if isinstance(entry, TopoRecord) else entry
+
+    def _write(self, fp):
+        if fastavro is None:
+            raise ImportError('fastavro is needed for Avro output')
+
+        fastavro.writer(fp, fastavro.parse_schema(self.schema), self._records(),
+                        codec=self.codec,
+                        codec_compression_level=self.compress_level)
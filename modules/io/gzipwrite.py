@@ -0,0 +1,131 @@
+import os
+import struct
+import time
+import zlib
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+BLOCK_SIZE = 128 * 1024
+DICT_SIZE = 32 * 1024
+FNAME = 0x08
+
+
+def _deflate_block(block, zdict, level, last):
+    # raw deflate of a block primed with the tail of previous one, blocks
+    # other than the last end on byte boundary so they can be concatenated
+    if zdict:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS,
+                                      zlib.DEF_MEM_LEVEL, zlib.Z_DEFAULT_STRATEGY,
+                                      zdict)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return (compressor.compress(block) +
+            compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH))
+
+
+def compress_threads(threads=None):
+    # blocks are compressed in parallel only when asked for explicitly
+    return max(threads or 1, 1)
+
+
+class ParallelGzipWriter(object):
+    """
+       Write-only file object producing single member gzip stream with
+       input split into blocks deflated independently on a thread pool
+       as pigz does. zlib releases GIL while compressing so blocks are
+       compressed on as many cores as there are threads.
+    """
+    def __init__(self, fileobj, filename='', compresslevel=6, threads=None,
+                 block_size=BLOCK_SIZE):
+        self.fileobj = fileobj
+        self.level = compresslevel
+        self.block_size = block_size
+        self.threads = compress_threads(threads)
+        self._executor = ThreadPoolExecutor(max_workers=self.threads)
+        self._pending = deque()
+        self._buf = list()
+        self._buflen = 0
+        self._zdict = b''
+        self._crc = 0
+        self._size = 0
+        self._closed = False
+        self._write_header(filename)
+
+    def _write_header(self, filename):
+        fname = os.path.basename(filename)
+        if fname.endswith('.gz'):
+            fname = fname[:-3]
+        fname = fname.encode('latin-1', 'replace')
+
+        if self.level == zlib.Z_BEST_COMPRESSION:
+            xfl = 2
+        elif self.level == zlib.Z_BEST_SPEED:
+            xfl = 4
+        else:
+            xfl = 0
+
+        self.fileobj.write(b'\037\213\010' + bytes([FNAME if fname else 0]) +
+                           struct.pack('<L', int(time.time())) +
+                           bytes([xfl, 255]))
+        if fname:
+            self.fileobj.write(fname + b'\000')
+
+    def _submit(self, block, last=False):
+        self._crc = zlib.crc32(block, self._crc)
+        self._size += len(block)
+        self._pending.append(self._executor.submit(_deflate_block, block,
+                                                   self._zdict, self.level,
+                                                   last))
+        self._zdict = block[-DICT_SIZE:]
+
+        # compressed blocks are written out in order, and only few are kept
+        # in flight to bound memory
+        while len(self._pending) > 2 * self.threads:
+            self.fileobj.write(self._pending.popleft().result())
+
+    def write(self, data):
+        if self._closed:
+            raise ValueError('write to closed file')
+
+        n = len(data)
+        self._buf.append(bytes(data))
+        self._buflen += n
+        if self._buflen >= self.block_size:
+            buffered = b''.join(self._buf)
+            end = len(buffered) - len(buffered) % self.block_size
+            for i in range(0, end, self.block_size):
+                self._submit(buffered[i:i + self.block_size])
+            self._buf = [buffered[end:]]
+            self._buflen = len(buffered) - end
+
+        return n
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+
+        try:
+            self._submit(b''.join(self._buf), last=True)
+            self._buf = list()
+            while self._pending:
+                self.fileobj.write(self._pending.popleft().result())
+            self.fileobj.write(struct.pack('<LL', self._crc,
+                                           self._size & 0xffffffff))
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            # incomplete output is thrown away by the caller
+            self._closed = True
+            for future in self._pending:
+                future.cancel()
+            self._executor.shutdown(wait=True)
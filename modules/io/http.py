@@ -1,25 +1,82 @@
 import ssl
 import asyncio
 import aiohttp
-import random
+
+from urllib.parse import urlparse
 
 from aiohttp import client_exceptions, http_exceptions, ClientSession
 from argo_connectors.utils import module_class_name
 from argo_connectors.exceptions import ConnectorHttpError
+from argo_connectors.io.retry import CircuitOpenError, build_retry_policy, parse_retry_after
+from argo_connectors.io.httpcache import build_http_cache
+
+
+CONNECTION_LIMIT_PER_HOST = 10
+CONNECTION_KEEPALIVE = 30
+DNS_CACHE_TTL = 300
+STREAM_CHUNK_SIZE = 64 * 1024
+STREAM_QUEUE_SIZE = 16
+
+_ssl_contexts = dict()
+_sessions = dict()
 
 
 def build_ssl_settings(globopts):
     try:
-        sslcontext = ssl.create_default_context(capath=globopts['AuthenticationCAPath'.lower()],
-                                                cafile=globopts['AuthenticationCAFile'.lower()])
-        sslcontext.load_cert_chain(globopts['AuthenticationHostCert'.lower()],
-                                   globopts['AuthenticationHostKey'.lower()])
+        key = (globopts['AuthenticationCAPath'.lower()],
+               globopts['AuthenticationCAFile'.lower()],
+               globopts['AuthenticationHostCert'.lower()],
+               globopts['AuthenticationHostKey'.lower()])
+
+        # same context object is handed out for same settings so that
+        # connections and TLS sessions can be reused
+        if key not in _ssl_contexts:
+            sslcontext = ssl.create_default_context(capath=key[0], cafile=key[1])
+            sslcontext.load_cert_chain(key[2], key[3])
+            _ssl_contexts[key] = sslcontext
 
-        return sslcontext
+        return _ssl_contexts[key]
 
     except KeyError:
         return None
 
+
+def get_session(url, ssl_context, auth):
+    """
+       Return aiohttp ClientSession shared by all SessionWithRetry objects
+       within the running loop talking to the same host with the same SSL
+       context and HTTP auth.
+    """
+    loop = asyncio.get_event_loop()
+    key = (loop, urlparse(url).netloc, ssl_context, auth)
+    session = _sessions.get(key)
+
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(limit_per_host=CONNECTION_LIMIT_PER_HOST,
+                                         keepalive_timeout=CONNECTION_KEEPALIVE,
+                                         use_dns_cache=True,
+                                         ttl_dns_cache=DNS_CACHE_TTL)
+        session = ClientSession(connector=connector)
+        _sessions[key] = session
+
+    return session
+
+
+async def close_sessions(loop=None):
+    """
+       Close shared sessions created within given or current loop. Should
+       be called before the loop is closed.
+    """
+    loop = loop or asyncio.get_event_loop()
+    for key in [key for key in _sessions.keys() if key[0] is loop]:
+        session = _sessions.pop(key)
+        await session.close()
+
+
+async def _read_body(response):
+    return await response.read()
+
+
 def build_connection_retry_settings(globopts):
     retry = int(globopts['ConnectionRetry'.lower()])
     timeout = int(globopts['ConnectionTimeout'.lower()])
@@ -28,13 +85,12 @@ def build_connection_retry_settings(globopts):
 
 class SessionWithRetry(object):
     def __init__(self, logger, msgprefix, globopts, token=None, custauth=None,
-                 verbose_ret=False, handle_session_close=False):
+                 verbose_ret=False, retry_policy=None, use_cache=False):
         self.ssl_context = build_ssl_settings(globopts)
         n_try, client_timeout = build_connection_retry_settings(globopts)
-        client_timeout = aiohttp.ClientTimeout(total=client_timeout,
-                                               connect=client_timeout, sock_connect=client_timeout,
-                                               sock_read=client_timeout)
-        self.session = ClientSession(timeout=client_timeout)
+        self.client_timeout = aiohttp.ClientTimeout(total=client_timeout,
+                                                    connect=client_timeout, sock_connect=client_timeout,
+                                                    sock_read=client_timeout)
         self.n_try = n_try
         self.logger = logger
         self.token = token
@@ -46,12 +102,74 @@ class SessionWithRetry(object):
         else:
             self.custauth = None
         self.verbose_ret = verbose_ret
-        self.handle_session_close = handle_session_close
         self.globopts = globopts
+        self.retry_policy = retry_policy
+        self.use_cache = use_cache
+        self.http_cache = None
         self.erroneous_statuses = [404]
 
-    async def _http_method(self, method, url, data=None, headers=None):
-        method_obj = getattr(self.session, method)
+    def _cache_identity(self):
+        # cached entries are scoped to customer, its credentials and
+        # session token, so responses are never shared between them
+        return '\0'.join([getattr(self.logger, 'customer', None) or '',
+                          self.custauth.login if self.custauth else '',
+                          self.token or '',
+                          self.globopts.get('AuthenticationHostCert'.lower(), '')])
+
+    async def _http_get(self, url, headers=None, decode=True):
+        """
+           GET going through HTTP cache if one is enabled for the session.
+           Cached body is sent back without request while younger than
+           max-age, otherwise it is revalidated with If-None-Match and
+           If-Modified-Since and reused on 304 Not Modified.
+        """
+        if self.use_cache and self.http_cache is None:
+            self.http_cache = build_http_cache(self.globopts) or False
+
+        cache = self.http_cache
+        if not cache:
+            if decode:
+                return await self._http_method('get', url, headers=headers)
+            return await self._http_method('get', url, headers=headers,
+                                           consume=_read_body)
+
+        key = cache.key(url, self._cache_identity())
+        entry = cache.lookup(key)
+        if entry and entry.is_fresh():
+            body = entry.body()
+            content = body.decode(entry.encoding) if decode else body
+            if self.verbose_ret:
+                return (content, dict(), 200)
+            return content
+
+        if entry:
+            headers = dict(headers or {})
+            headers.update(entry.validators())
+
+        async def consume(response):
+            if entry and response.status == 304:
+                cache.refresh(entry)
+                body, encoding = entry.body(), entry.encoding
+            else:
+                body = await response.read()
+                encoding = response.get_encoding() if decode else None
+                # error bodies must not be sent back later as fresh content
+                if body and response.status == 200:
+                    cache.store(key, body, response.headers, encoding)
+            if decode:
+                return body.decode(encoding or 'utf-8')
+            return body
+
+        return await self._http_method('get', url, headers=headers,
+                                       consume=consume)
+
+    async def _http_method(self, method, url, data=None, headers=None,
+                           consume=None):
+        if self.retry_policy is None:
+            self.retry_policy = build_retry_policy(self.globopts)
+        session = get_session(url, self.ssl_context, self.custauth)
+        breaker = self.retry_policy.breaker(urlparse(url).netloc)
+        method_obj = getattr(session, method)
         raised_exc = None
         n = 1
         if self.token:
@@ -61,21 +179,26 @@ class SessionWithRetry(object):
                 'Accept': 'application/json'
             })
         try:
-            connct_rty_rnd = self.globopts['ConnectionRetryRandom'.lower()]
-            if connct_rty_rnd == 'True':
-                sleepsecs =  float(random.randint(0, float(self.globopts['ConnectionSleepRandomRetryMax'.lower()])))
-            else:
-                sleepsecs = float(self.globopts['ConnectionSleepRetry'.lower()])
-
             while n <= self.n_try:
                 if n > 1:
                     if getattr(self.logger, 'job', False):
                         self.logger.info(f"{module_class_name(self)} Customer:{self.logger.customer} Job:{self.logger.job} : HTTP Connection try - {n} after sleep {sleepsecs} seconds")
                     else:
                         self.logger.info(f"{module_class_name(self)} Customer:{self.logger.customer} : HTTP Connection try - {n} after sleep {sleepsecs} seconds")
+
+                # backend is known to be down so fail right away instead of
+                # sleeping and retrying in every coroutine
+                if not breaker.allow():
+                    raise CircuitOpenError('Circuit open for {}'.format(urlparse(url).netloc))
+
+                retry_after = None
                 try:
-                    async with method_obj(url, data=data, headers=headers,
-                                          ssl=self.ssl_context, auth=self.custauth) as response:
+                    # streamed body can be consumed only once so it is
+                    # given as factory called for every try
+                    payload = data() if callable(data) else data
+                    async with method_obj(url, data=payload, headers=headers,
+                                          ssl=self.ssl_context, auth=self.custauth,
+                                          timeout=self.client_timeout) as response:
                         if response.status in self.erroneous_statuses:
                             if getattr(self.logger, 'job', False):
                                 self.logger.error('{}.http_{}({}) Customer:{} Job:{} - Erroneous HTTP status: {} {}'.\
@@ -92,8 +215,20 @@ class SessionWithRetry(object):
                                                          self.logger.customer,
                                                          response.status,
                                                          response.reason))
+                            breaker.record_success()
                             break
-                        content = await response.text()
+                        if self.retry_policy.is_retryable(response.status):
+                            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                            raise client_exceptions.ClientResponseError(response.request_info,
+                                                                        response.history,
+                                                                        status=response.status,
+                                                                        message=response.reason,
+                                                                        headers=response.headers)
+                        breaker.record_success()
+                        if consume:
+                            content = await consume(response)
+                        else:
+                            content = await response.text()
                         if content:
                             if self.verbose_ret:
                                 return (content, response.headers, response.status)
@@ -115,6 +250,7 @@ class SessionWithRetry(object):
                 except (client_exceptions.ClientError,
                         client_exceptions.ServerTimeoutError,
                         asyncio.TimeoutError) as exc:
+                    breaker.record_failure()
                     if getattr(self.logger, 'job', False):
                         self.logger.error('{}.http_{}({}) Customer:{} Job:{} - {}'.format(module_class_name(self),
                                                                                           method, url, self.logger.customer,
@@ -138,7 +274,9 @@ class SessionWithRetry(object):
                                                                                    repr(exc)))
                     raise exc
 
-                await asyncio.sleep(sleepsecs)
+                if n < self.n_try:
+                    sleepsecs = self.retry_policy.delay(n, retry_after)
+                    await asyncio.sleep(sleepsecs)
                 n += 1
 
             else:
@@ -161,18 +299,75 @@ class SessionWithRetry(object):
                                                                            repr(exc)))
             raise exc
 
-        finally:
-            if not self.handle_session_close:
-                await self.session.close()
-
     async def http_get(self, url, headers=None):
         try:
-            content = await self._http_method('get', url, headers=headers)
+            content = await self._http_get(url, headers=headers)
+            return content
+
+        except Exception as exc:
+            raise ConnectorHttpError(repr(exc)) from exc
+
+    async def http_get_bytes(self, url, headers=None):
+        """
+           Same as http_get but returns raw body as bytes without decoding.
+        """
+        try:
+            content = await self._http_get(url, headers=headers, decode=False)
             return content
 
         except Exception as exc:
             raise ConnectorHttpError(repr(exc)) from exc
 
+    async def http_get_stream(self, url, headers=None,
+                              chunk_size=STREAM_CHUNK_SIZE):
+        """
+           Async generator yielding raw body in byte chunks as they arrive.
+           Request is retried as any other until the first chunk is handed
+           over, failure after that is raised right away as the consumer
+           already has part of the body.
+        """
+        queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+        state = {'started': False}
+
+        async def pump(response):
+            try:
+                async for chunk in response.content.iter_chunked(chunk_size):
+                    state['started'] = True
+                    await queue.put(chunk)
+            except (client_exceptions.ClientError, asyncio.TimeoutError) as exc:
+                if state['started']:
+                    raise ConnectorHttpError(repr(exc)) from exc
+                raise exc
+            return state['started']
+
+        fetch = asyncio.ensure_future(self._http_method('get', url,
+                                                        headers=headers,
+                                                        consume=pump))
+        try:
+            while True:
+                getter = asyncio.ensure_future(queue.get())
+                await asyncio.wait([getter, fetch],
+                                   return_when=asyncio.FIRST_COMPLETED)
+                if getter.done():
+                    yield getter.result()
+                    continue
+
+                getter.cancel()
+                while not queue.empty():
+                    yield queue.get_nowait()
+                break
+
+            try:
+                fetch.result()
+            except ConnectorHttpError as exc:
+                raise exc
+            except Exception as exc:
+                raise ConnectorHttpError(repr(exc)) from exc
+
+        finally:
+            if not fetch.done():
+                fetch.cancel()
+
     async def http_put(self, url, data, headers=None):
         try:
             content = await self._http_method('put', url, data=data,
@@ -199,6 +394,7 @@ class SessionWithRetry(object):
         except Exception as exc:
             raise ConnectorHttpError(repr(exc)) from exc
 
-
     async def close(self):
-        return await self.session.close()
+        # connections are pooled in sessions shared across the process and
+        # released with close_sessions() at loop shutdown
+        pass
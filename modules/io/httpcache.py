@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+
+DEFAULT_MAX_AGE = 0
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+CACHE_DIR = 'httpcache'
+
+
+def atomic_write(path, data):
+    """
+       Write data next to path and move it in place so that readers never
+       see partially written file.
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(data)
+        os.replace(tmp, path)
+    except OSError:
+        os.remove(tmp)
+        raise
+
+
+class HttpCacheEntry(object):
+    def __init__(self, cache, key, meta):
+        self.cache = cache
+        self.key = key
+        self.meta = meta
+
+    def is_fresh(self):
+        return time.time() - self.meta['stored'] < self.cache.max_age
+
+    def validators(self):
+        headers = dict()
+        if self.meta.get('etag'):
+            headers['If-None-Match'] = self.meta['etag']
+        if self.meta.get('last_modified'):
+            headers['If-Modified-Since'] = self.meta['last_modified']
+        return headers
+
+    @property
+    def encoding(self):
+        return self.meta.get('encoding') or 'utf-8'
+
+    def body(self):
+        return self.cache.read_body(self.key)
+
+
+class HttpCache(object):
+    """
+       On-disk cache of GET response bodies together with their ETag and
+       Last-Modified validators. Entries are kept as <key>.body and
+       <key>.meta files and the least recently used ones are evicted once
+       bodies take more than max_size bytes.
+    """
+    def __init__(self, dirpath, max_age=DEFAULT_MAX_AGE,
+                 max_size=DEFAULT_MAX_SIZE):
+        self.dirpath = dirpath
+        self.max_age = max_age
+        self.max_size = max_size
+
+    def key(self, url, identity=None):
+        digest = hashlib.sha256(url.encode('utf-8'))
+        if identity:
+            digest.update(b'\0' + identity.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path(self, key, ext):
+        return os.path.join(self.dirpath, '{}.{}'.format(key, ext))
+
+    def lookup(self, key):
+        try:
+            with open(self._path(key, 'meta')) as fp:
+                meta = json.load(fp)
+            if not os.path.exists(self._path(key, 'body')):
+                return None
+            return HttpCacheEntry(self, key, meta)
+
+        except (OSError, ValueError):
+            return None
+
+    def read_body(self, key):
+        path = self._path(key, 'body')
+        with open(path, 'rb') as fp:
+            body = fp.read()
+        # mark as recently used for eviction
+        os.utime(path)
+        return body
+
+    def store(self, key, body, headers, encoding=None):
+        cache_control = [directive.strip().lower() for directive in
+                         (headers.get('Cache-Control') or '').split(',')]
+        if 'no-store' in cache_control:
+            return
+
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if not etag and not last_modified and not self.max_age:
+            return
+
+        meta = {
+            'etag': etag,
+            'last_modified': last_modified,
+            'encoding': encoding,
+            'stored': time.time()
+        }
+        os.makedirs(self.dirpath, exist_ok=True)
+        atomic_write(self._path(key, 'body'), body)
+        atomic_write(self._path(key, 'meta'), json.dumps(meta).encode('utf-8'))
+        self.evict()
+
+    def refresh(self, entry):
+        entry.meta['stored'] = time.time()
+        atomic_write(self._path(entry.key, 'meta'),
+                     json.dumps(entry.meta).encode('utf-8'))
+
+    def evict(self):
+        bodies = list()
+        total = 0
+        for name in os.listdir(self.dirpath):
+            if name.endswith('.body'):
+                stat = os.stat(os.path.join(self.dirpath, name))
+                bodies.append((stat.st_mtime, stat.st_size, name[:-5]))
+                total += stat.st_size
+
+        for _, size, key in sorted(bodies):
+            if total <= self.max_size:
+                break
+            for ext in ('body', 'meta'):
+                try:
+                    os.remove(self._path(key, ext))
+                except OSError:
+                    pass
+            total -= size
+
+
+def build_http_cache(globopts):
+    if globopts.get('CacheHttp'.lower(), 'False') != 'True':
+        return None
+
+    return HttpCache(
+        os.path.join(globopts['InputStateSaveDir'.lower()], CACHE_DIR),
+        max_age=float(globopts.get('CacheHttpMaxAge'.lower(), DEFAULT_MAX_AGE)),
+        max_size=int(globopts.get('CacheHttpMaxSize'.lower(), DEFAULT_MAX_SIZE))
+    )
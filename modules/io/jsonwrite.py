@@ -1,30 +1,97 @@
 import json
 import gzip
+import os
+
+from argo_connectors.io.gzipwrite import ParallelGzipWriter, compress_threads
+from argo_connectors.records import json_default
+
+
+DEFAULT_COMPRESS_LEVEL = 6
+ENCODE_BATCH = 1000
+INDENT = 4
 
 
 class JsonWriter(object):
-    def __init__(self, data, filename, compress_json):
+    """
+       Write data as JSON document, optionally gzipped. Entries of list are
+       encoded and written out in batches so that whole document is never
+       kept in memory. Document is written into temporary file
+       that is renamed to the final name once complete.
+    """
+    def __init__(self, data, filename, compress_json, compact=False,
+                 compress_level=DEFAULT_COMPRESS_LEVEL, compress_threads=None):
         self.data = data
         self.filename = filename
         self.compress_json = compress_json
+        self.compact = compact
+        self.compress_level = compress_level
+        self.compress_threads = compress_threads
 
-    def write_json(self):
-        try:
-            if self.compress_json == str(True):
-                json_data = json.dumps(self.data, indent=4)
+    def _dumps(self, data):
+        if self.compact:
+            return json.dumps(data, separators=(',', ':'), default=json_default)
+        return json.dumps(data, indent=INDENT, default=json_default)
+
+    def _iterencode(self, data):
+        # output is the same as of json.dumps(data) with the same options
+        if not isinstance(data, list) or not data:
+            yield self._dumps(data)
+            return
 
-                with gzip.open(self.filename + '.gz', 'wb') as f:
-                    f.write(json_data.encode())
+        # entries are encoded in batches and brackets of every batch list
+        # are cut off, with indent its closing one is preceded by newline
+        end = -1 if self.compact else -2
+        yield '['
+        for i in range(0, len(data), ENCODE_BATCH):
+            if i:
+                yield ','
+            yield self._dumps(data[i:i + ENCODE_BATCH])[1:end]
+        yield ']' if self.compact else '\n]'
 
-                return True, None
-            
-            else:
-                json_data = json.dumps(self.data, indent=4)
+    def _write(self, fp):
+        for piece in self._iterencode(self.data):
+            fp.write(piece.encode('utf-8'))
 
-                with open(self.filename, 'w') as f:
-                    f.write(json_data)
+    def write(self):
+        compress = self.compress_json == str(True)
+        path = self.filename + '.gz' if compress else self.filename
+        tmp = '{}.{}.tmp'.format(path, os.getpid())
 
-                return True, None
+        try:
+            try:
+                with open(tmp, 'wb') as fp:
+                    # name stored in gzip header is the one of final file
+                    if compress and compress_threads(self.compress_threads) > 1:
+                        with ParallelGzipWriter(fp, filename=path,
+                                                compresslevel=self.compress_level,
+                                                threads=self.compress_threads) as gz:
+                            self._write(gz)
+                    elif compress:
+                        with gzip.GzipFile(filename=path, mode='wb', fileobj=fp,
+                                           compresslevel=self.compress_level) as gz:
+                            self._write(gz)
+                    else:
+                        self._write(fp)
+                os.replace(tmp, path)
+
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+
+            return True, None
 
         except Exception as e:
             return False, e
+
+    write_json = write
+
+
+def build_json_opts(globopts):
+    """
+       JsonWriter keyword arguments for output layout and compression.
+    """
+    return dict(compact=globopts.get('JsonCompact'.lower(), 'False') == 'True',
+                compress_level=int(globopts.get('JsonCompressLevel'.lower(),
+                                                DEFAULT_COMPRESS_LEVEL)),
+                compress_threads=int(globopts.get('JsonCompressThreads'.lower(), 0)) or None)
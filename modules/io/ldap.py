@@ -6,41 +6,135 @@ from argo_connectors.utils import module_class_name
 from argo_connectors.exceptions import ConnectorHttpError
 
 
+LDAP_PAGE_SIZE = 1000
+
+
 class LDAPSessionWithRetry(object):
-    def __init__(self, logger, retry_attempts, retry_sleep, connection_timeout):
+    def __init__(self, logger, retry_attempts, retry_sleep, connection_timeout,
+                 page_size=LDAP_PAGE_SIZE):
         self.n_try = retry_attempts
         self.retry_sleep_list = [(i + 1) * retry_sleep for i in range(retry_attempts)]
         self.timeout = connection_timeout
         self.logger = logger
+        self.page_size = page_size
+        self._conn = None
+        self._url = None
+        self._users = dict()
+        self._lock = asyncio.Lock()
 
+    async def _acquire(self, host, port):
+        url = 'ldap://' + host + ':' + port + '/'
+        # concurrent searches of the session share one connection that is
+        # closed only once none of them is using it anymore
+        async with self._lock:
+            if self._conn is not None and (self._url != url or self._conn.closed):
+                self._detach()
 
-    async def search(self, host, port, base, filter, attributes):
-        raised_exc = None
-        n = 1
+            if self._conn is None:
+                client = bonsai.LDAPClient(url)
+                self._conn = await client.connect(True, timeout=float(self.timeout))
+                self._url = url
+                self._users[id(self._conn)] = [self._conn, 0]
+
+            self._users[id(self._conn)][1] += 1
+            return self._conn
+
+    def _release(self, conn, broken=False):
+        # broken connection is not handed to new searches, ones still
+        # reading from it finish or fail on their own
+        if broken and conn is self._conn:
+            self._detach()
+
+        users = self._users.get(id(conn))
+        if users is None:
+            return
+        users[1] -= 1
+        if users[1] <= 0 and conn is not self._conn:
+            del self._users[id(conn)]
+            self._close_conn(conn)
+
+    def _detach(self):
+        conn, self._conn = self._conn, None
+        if conn is not None and not self._users.get(id(conn), [None, 0])[1]:
+            self._users.pop(id(conn), None)
+            self._close_conn(conn)
 
+    def _close_conn(self, conn):
         try:
-            client = bonsai.LDAPClient('ldap://' + host + ':' + port + '/')
-            while n <= self.n_try:
-                try:
-                    conn = await client.connect(True, timeout=float(self.timeout))
-                    res = await conn.search(base,
-                        bonsai.LDAPSearchScope.SUB, filter, attributes,
-                        timeout=float(self.timeout))
+            conn.close()
+        except Exception:
+            pass
 
-                    return res
+    def close(self):
+        self._detach()
 
+    async def _first_page(self, conn, base, filter, attributes):
+        if self.page_size:
+            # RFC 2696 paged results, next pages are requested while
+            # iterating over the entries
+            return await conn.paged_search(base,
+                bonsai.LDAPSearchScope.SUB, filter, attributes,
+                timeout=float(self.timeout), page_size=self.page_size)
+        else:
+            return await conn.search(base,
+                bonsai.LDAPSearchScope.SUB, filter, attributes,
+                timeout=float(self.timeout))
 
-                except Exception as exc:
-                    self.logger.error('from {}.search() - {}'.format(module_class_name(self), repr(exc)))
-                    await asyncio.sleep(float(self.retry_sleep_list[n - 1]))
-                    raised_exc = exc
+    async def _entries(self, conn, base, filter, attributes):
+        entries = await self._first_page(conn, base, filter, attributes)
+        if hasattr(entries, '__aiter__'):
+            async for entry in entries:
+                yield entry
+        else:
+            for entry in entries:
+                yield entry
 
-                self.logger.info(f'LDAP Connection try - {n}')
-                n += 1
+    async def search_iter(self, host, port, base, filter, attributes):
+        """
+            Async iterator over entries found. Connection is kept and reused
+            between retries and searches until close(). Search failed
+            midway is retried as a whole on a new connection as paged
+            results cookie is bound to the old one, and entries already
+            handed over are skipped.
+        """
+        n = 1
+        seen = set()
+
+        while True:
+            conn, broken = None, False
+            try:
+                conn = await self._acquire(host, port)
+                async for entry in self._entries(conn, base, filter, attributes):
+                    dn = str(getattr(entry, 'dn', None) or entry.get('dn'))
+                    if dn in seen:
+                        continue
+                    seen.add(dn)
+                    yield entry
+                return
+
+            except Exception as exc:
+                broken = True
+                self.logger.error('from {}.search() - {}'.format(module_class_name(self), repr(exc)))
+
+            finally:
+                if conn is not None:
+                    self._release(conn, broken)
 
-            else:
+            if n >= self.n_try:
                 self.logger.error('LDAP Connection retry exhausted')
+                raise ConnectorHttpError('LDAP Connection retry exhausted')
+
+            await asyncio.sleep(float(self.retry_sleep_list[n - 1]))
+            n += 1
+            self.logger.info(f'LDAP Connection try - {n}')
+
+    async def search(self, host, port, base, filter, attributes):
+        res = list()
+        try:
+            async for entry in self.search_iter(host, port, base, filter,
+                                                attributes):
+                res.append(entry)
+        finally:
+            self.close()
 
-        except Exception as exc:
-            self.logger.error('from {}.search() - {}'.format(module_class_name(self), repr(exc)))
-            raise ConnectorHttpError()
+        return res
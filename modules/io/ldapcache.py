@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+import zlib
+
+import bonsai
+
+
+DEFAULT_TTL = 3600
+DEFAULT_MAX_STALE = 7 * 24 * 3600
+CACHE_DIR = 'ldapcache'
+SNAPSHOT_BATCH = 1000
+
+
+def entry_to_dict(entry):
+    res = dict()
+    for attr, value in entry.items():
+        res[attr] = str(value) if attr == 'dn' else value
+    return res
+
+
+def dict_to_entry(data):
+    entry = bonsai.LDAPEntry(data.pop('dn'))
+    for attr, value in data.items():
+        entry[attr] = value
+    return entry
+
+
+class SnapshotWriter(object):
+    """
+       Snapshot compressed and written out batch by batch as entries
+       stream in, moved in place of previous one only when complete.
+    """
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, self.tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        self.fp = os.fdopen(fd, 'wb')
+        self.compressor = zlib.compressobj(1)
+        self.written = 0
+        self.fp.write(self.compressor.compress(b'['))
+
+    def write(self, entries):
+        for entry in entries:
+            data = json.dumps(entry_to_dict(entry))
+            if self.written:
+                data = ',' + data
+            self.fp.write(self.compressor.compress(data.encode('utf-8')))
+            self.written += 1
+
+    def close(self):
+        try:
+            self.fp.write(self.compressor.compress(b']'))
+            self.fp.write(self.compressor.flush())
+            self.fp.close()
+            os.replace(self.tmp, self.path)
+        except OSError:
+            self.abort()
+            raise
+
+    def abort(self):
+        self.fp.close()
+        if os.path.exists(self.tmp):
+            os.remove(self.tmp)
+
+
+class LDAPSnapshotCache(object):
+    """
+       On-disk snapshots of LDAP search results keyed by host, base, filter
+       and attributes. Snapshot younger than ttl is used instead of query,
+       older one is still used up to max_stale seconds more while it's
+       refreshed in the background.
+    """
+    def __init__(self, dirpath, ttl=DEFAULT_TTL, max_stale=DEFAULT_MAX_STALE):
+        self.dirpath = dirpath
+        self.ttl = ttl
+        self.max_stale = max_stale
+
+    def key(self, host, port, base, filter, attributes):
+        digest = hashlib.sha256()
+        for part in [host, port, base, filter] + list(attributes):
+            digest.update(str(part).encode('utf-8') + b'\0')
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.dirpath, '{}.json.z'.format(key))
+
+    def lookup(self, key):
+        """
+           Returns tuple of entries and whether they are still fresh or None
+           if there is no usable snapshot
+        """
+        path = self._path(key)
+        try:
+            age = time.time() - os.stat(path).st_mtime
+            if age >= self.ttl + self.max_stale:
+                return None
+
+            with open(path, 'rb') as fp:
+                data = json.loads(zlib.decompress(fp.read()).decode('utf-8'))
+            return [dict_to_entry(entry) for entry in data], age < self.ttl
+
+        except (OSError, ValueError, KeyError, zlib.error):
+            return None
+
+    def writer(self, key):
+        return SnapshotWriter(self._path(key))
+
+    def store(self, key, entries):
+        writer = self.writer(key)
+        try:
+            writer.write(entries)
+        except Exception:
+            writer.abort()
+            raise
+        writer.close()
+
+
+def build_ldap_cache(globopts):
+    if globopts.get('CacheBdii'.lower(), 'False') != 'True':
+        return None
+
+    return LDAPSnapshotCache(
+        os.path.join(globopts['InputStateSaveDir'.lower()], CACHE_DIR),
+        ttl=float(globopts.get('CacheBdiiTTL'.lower(), DEFAULT_TTL)),
+        max_stale=float(globopts.get('CacheBdiiMaxStale'.lower(), DEFAULT_MAX_STALE))
+    )
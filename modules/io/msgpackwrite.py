@@ -0,0 +1,28 @@
+from argo_connectors.io.jsonwrite import JsonWriter, ENCODE_BATCH
+from argo_connectors.records import json_default
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class MsgpackWriter(JsonWriter):
+    """
+       Write data as MessagePack document, optionally gzipped. Entries of
+       list are packed one by one after the array header so the
+       document is streamed the same way JSON one is.
+    """
+    def _write(self, fp):
+        if msgpack is None:
+            raise ImportError('msgpack is needed for MessagePack output')
+
+        packer = msgpack.Packer(default=json_default)
+        if not isinstance(self.data, list):
+            fp.write(packer.pack(self.data))
+            return
+
+        fp.write(packer.pack_array_header(len(self.data)))
+        for i in range(0, len(self.data), ENCODE_BATCH):
+            fp.write(b''.join([packer.pack(entry)
+                               for entry in self.data[i:i + ENCODE_BATCH]]))
@@ -0,0 +1,54 @@
+import re
+
+from argo_connectors.io.avrowrite import AvroWriter
+from argo_connectors.io.jsonwrite import JsonWriter, build_json_opts
+from argo_connectors.io.msgpackwrite import MsgpackWriter
+
+
+FORMATS = ('json', 'avro', 'msgpack')
+
+
+def output_format(globopts):
+    fmt = globopts.get('JsonFormat'.lower(), 'json').strip().lower()
+    if fmt not in FORMATS:
+        raise ValueError('Unknown output format %s, one of %s expected' %
+                         (fmt, ', '.join(FORMATS)))
+
+    return fmt
+
+
+def output_filename(filename, fmt):
+    """
+       Output filename with .json extension replaced by the one of format
+    """
+    if fmt == 'json':
+        return filename
+    return re.sub(r'(\.json)?$', '.' + fmt, filename, count=1)
+
+
+def build_writer(data, filename, schema, globopts):
+    """
+       Writer of data into file of format set in configuration. schema
+       is the kind of data written, needed for Avro.
+    """
+    fmt = output_format(globopts)
+    compress = globopts['GeneralCompressJson'.lower()]
+    opts = build_json_opts(globopts)
+    filename = output_filename(filename, fmt)
+
+    if fmt == 'avro':
+        return AvroWriter(data, filename, compress, schema,
+                          compress_level=opts['compress_level'])
+    elif fmt == 'msgpack':
+        return MsgpackWriter(data, filename, compress, **opts)
+
+    return JsonWriter(data, filename, compress, **opts)
+
+
+def write_output(data, filename, schema, globopts):
+    try:
+        writer = build_writer(data, filename, schema, globopts)
+    except ValueError as exc:
+        return False, exc
+
+    return writer.write()
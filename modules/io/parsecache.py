@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import zlib
+
+from argo_connectors.io.httpcache import atomic_write
+from argo_connectors.parse.base import XML_CHUNK_SIZE
+from argo_connectors.records import GroupEndpoint, GroupGroup, json_default
+
+
+DEFAULT_MAX_ENTRIES = 32
+CACHE_DIR = 'parsecache'
+# bumped whenever layout of cached records changes
+FORMAT_VERSION = 2
+
+
+def _update_digest(digest, data):
+    if data is None:
+        digest.update(b'\0N')
+
+    elif isinstance(data, (str, bytes)):
+        # same document fetched as str or bytes gives the same key
+        length = 0
+        digest.update(b'\0B')
+        for i in range(0, len(data), XML_CHUNK_SIZE):
+            chunk = data[i:i + XML_CHUNK_SIZE]
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            digest.update(chunk)
+            length += len(chunk)
+        digest.update(b'\0' + str(length).encode())
+
+    elif isinstance(data, (list, tuple)):
+        digest.update(b'\0L' + str(len(data)).encode() + b'\0')
+        for item in data:
+            _update_digest(digest, item)
+
+    else:
+        digest.update(b'\0J')
+        digest.update(json.dumps(data, sort_keys=True).encode('utf-8'))
+
+
+class ParseCache(object):
+    """
+       Content addressed cache of parsed topology. Key is hash of raw feeds
+       together with options that affect parsing so unchanged feed costs
+       only hashing and reading back group of groups and group of endpoints
+       kept as compressed JSON. Only max_entries most recently used results
+       are kept.
+    """
+    def __init__(self, dirpath, max_entries=DEFAULT_MAX_ENTRIES):
+        self.dirpath = dirpath
+        self.max_entries = max_entries
+
+    def key(self, feeds, *options):
+        digest = hashlib.sha256()
+        _update_digest(digest, FORMAT_VERSION)
+        _update_digest(digest, list(feeds))
+        _update_digest(digest, repr(options))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.dirpath, '{}.json.z'.format(key))
+
+    def load(self, key):
+        """
+           Returns tuple of group of groups and group of endpoints or None
+           if there is no usable entry, unreadable one is just a miss
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as fp:
+                group_groups, group_endpoints = json.loads(
+                    zlib.decompress(fp.read()).decode('utf-8'))
+            data = ([GroupGroup(**entry) for entry in group_groups],
+                    [GroupEndpoint(**entry) for entry in group_endpoints])
+            os.utime(path)
+            return data
+
+        except Exception:
+            return None
+
+    def store(self, key, data):
+        group_groups, group_endpoints = data
+        content = json.dumps([group_groups, group_endpoints], default=json_default)
+        os.makedirs(self.dirpath, exist_ok=True)
+        atomic_write(self._path(key), zlib.compress(content.encode('utf-8'), 1))
+        self.evict()
+
+    def evict(self):
+        entries = list()
+        for name in os.listdir(self.dirpath):
+            if name.endswith('.json.z'):
+                path = os.path.join(self.dirpath, name)
+                entries.append((os.stat(path).st_mtime, path))
+
+        for _, path in sorted(entries, reverse=True)[self.max_entries:]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def build_parse_cache(globopts):
+    if globopts.get('CacheParsed'.lower(), 'False') != 'True':
+        return None
+
+    return ParseCache(
+        os.path.join(globopts['InputStateSaveDir'.lower()], CACHE_DIR),
+        max_entries=int(globopts.get('CacheParsedMaxEntries'.lower(),
+                                     DEFAULT_MAX_ENTRIES))
+    )
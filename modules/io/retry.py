@@ -0,0 +1,133 @@
+import datetime
+import random
+import time
+
+from email.utils import parsedate_to_datetime
+
+
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+DEFAULT_SLEEP_BASE = 5
+DEFAULT_SLEEP_MAX = 300
+DEFAULT_BREAKER_THRESHOLD = 5
+DEFAULT_BREAKER_COOLDOWN = 60
+
+_breakers = dict()
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+def parse_retry_after(value):
+    """
+       Retry-After is either number of seconds or HTTP date. Returns number
+       of seconds to wait or None if header is missing or malformed.
+    """
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+
+    except ValueError:
+        try:
+            when = parsedate_to_datetime(value)
+            now = datetime.datetime.now(datetime.timezone.utc)
+            return max((when - now).total_seconds(), 0.0)
+
+        except (TypeError, ValueError):
+            return None
+
+
+class RetryPolicy(object):
+    """
+       Exponential backoff capped with sleep_max. With jitter, delay before
+       retry is drawn uniformly from [0, backoff] (full jitter) so that
+       concurrent coroutines do not retry in lockstep.
+    """
+    def __init__(self, sleep, sleep_max=DEFAULT_SLEEP_MAX, jitter=False,
+                 statuses=RETRY_STATUSES,
+                 breaker_threshold=DEFAULT_BREAKER_THRESHOLD,
+                 breaker_cooldown=DEFAULT_BREAKER_COOLDOWN):
+        self.sleep = sleep
+        self.sleep_max = sleep_max
+        self.jitter = jitter
+        self.statuses = statuses
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+
+    def is_retryable(self, status):
+        return status in self.statuses
+
+    def delay(self, attempt, retry_after=None):
+        if retry_after is not None:
+            return min(retry_after, self.sleep_max)
+
+        backoff = min(self.sleep_max, self.sleep * 2 ** (attempt - 1))
+        if self.jitter:
+            return random.uniform(0, backoff)
+
+        return backoff
+
+    def breaker(self, host):
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(self.breaker_threshold,
+                                             self.breaker_cooldown)
+        return _breakers[host]
+
+
+class CircuitBreaker(object):
+    """
+       Per-host breaker shared by all coroutines. Opens after threshold
+       consecutive failures and rejects requests until cooldown passes.
+       Then a single probe request per cooldown is let through which either
+       closes the breaker or opens it again.
+    """
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def allow(self):
+        if self.opened_at is None:
+            return True
+
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            self.opened_at = time.monotonic()
+            self.probing = True
+            return True
+
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.probing or self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+            self.probing = False
+
+
+def build_retry_policy(globopts):
+    jitter = globopts['ConnectionRetryRandom'.lower()] == 'True'
+    # backoff grows from small base and no retry ever waits longer than
+    # before: up to SleepRandomRetryMax with jitter, SleepRetry without
+    if jitter:
+        sleep_max = float(globopts['ConnectionSleepRandomRetryMax'.lower()])
+    else:
+        sleep_max = float(globopts['ConnectionSleepRetry'.lower()])
+    sleep_max = min(sleep_max, float(globopts.get('ConnectionSleepRetryMax'.lower(), DEFAULT_SLEEP_MAX)))
+    sleep = min(DEFAULT_SLEEP_BASE, sleep_max)
+
+    return RetryPolicy(
+        sleep,
+        sleep_max=sleep_max,
+        jitter=jitter,
+        breaker_threshold=int(globopts.get('ConnectionBreakerThreshold'.lower(), DEFAULT_BREAKER_THRESHOLD)),
+        breaker_cooldown=float(globopts.get('ConnectionBreakerCooldown'.lower(), DEFAULT_BREAKER_COOLDOWN))
+    )
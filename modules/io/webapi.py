@@ -1,12 +1,152 @@
 import datetime
+import hashlib
 import os
 import json
+import time
+import zlib
+
+from functools import partial
 
 from argo_connectors.utils import module_class_name
 from argo_connectors.io.http import SessionWithRetry
+from argo_connectors.io.httpcache import atomic_write
+from argo_connectors.records import json_default
 from argo_connectors.exceptions import ConnectorHttpError
 
 
+JSON_CHUNK_SIZE = 64 * 1024
+COMPRESS_WBITS = {'gzip': 16 + zlib.MAX_WBITS, 'deflate': zlib.MAX_WBITS}
+DEFAULT_COMPRESS_LEVEL = 6
+SNAPSHOT_DIR = 'webapi'
+SNAPSHOT_KEEP_DAYS = 7
+
+
+def _iterencode(data, top=True):
+    # records in lists are encoded one by one with C encoder, output is the
+    # same as of json.dumps(data)
+    if isinstance(data, list):
+        yield '['
+        for i, item in enumerate(data):
+            if i:
+                yield ', '
+            yield json.dumps(item, default=json_default)
+        yield ']'
+
+    elif top and isinstance(data, dict):
+        yield '{'
+        for i, (key, value) in enumerate(data.items()):
+            if i:
+                yield ', '
+            yield json.dumps(str(key)) + ': '
+            yield from _iterencode(value, top=False)
+        yield '}'
+
+    else:
+        yield json.dumps(data, default=json_default)
+
+
+async def json_stream(data, chunk_size=JSON_CHUNK_SIZE):
+    """
+       Encode data to JSON incrementally and yield it in byte chunks so
+       that whole encoded document is never kept in memory.
+    """
+    buf, size = list(), 0
+    for piece in _iterencode(data):
+        buf.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield ''.join(buf).encode('utf-8')
+            buf, size = list(), 0
+
+    if buf:
+        yield ''.join(buf).encode('utf-8')
+
+
+async def compress_stream(stream, encoding, level=DEFAULT_COMPRESS_LEVEL):
+    """
+       Compress byte chunks of stream on the fly with gzip or deflate
+       Content-Encoding.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, COMPRESS_WBITS[encoding])
+    async for chunk in stream:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+
+    yield compressor.flush()
+
+
+def _record_hash(record):
+    return hashlib.sha1(json.dumps(record, sort_keys=True,
+                                   default=json_default).encode('utf-8')).hexdigest()
+
+
+class PublishSnapshot(object):
+    """
+       Hashes of records last successfully published to given WEB-API
+       resource. Used to find out what changed since the last publish.
+    """
+    def __init__(self, dirpath, api, token):
+        self.dirpath = dirpath
+        digest = hashlib.sha256('{}\0{}'.format(api, token).encode('utf-8'))
+        self.path = os.path.join(dirpath, '{}.json'.format(digest.hexdigest()))
+        self.hashes = None
+
+    def load(self):
+        try:
+            with open(self.path) as fp:
+                return set(json.load(fp))
+        except (OSError, ValueError):
+            return None
+
+    def diff(self, data):
+        """
+           Return number of records that are new or changed and number of
+           records that are gone since the last snapshot. Records not seen
+           before are all reported as new.
+        """
+        records = data if isinstance(data, list) else [data]
+        self.hashes = set([_record_hash(record) for record in records])
+        published = self.load()
+        if published is None:
+            return len(self.hashes), 0
+
+        return len(self.hashes - published), len(published - self.hashes)
+
+    def save(self):
+        os.makedirs(self.dirpath, exist_ok=True)
+        atomic_write(self.path, json.dumps(sorted(self.hashes)).encode('utf-8'))
+
+        expire = time.time() - SNAPSHOT_KEEP_DAYS * 24 * 3600
+        for name in os.listdir(self.dirpath):
+            path = os.path.join(self.dirpath, name)
+            try:
+                if os.stat(path).st_mtime < expire:
+                    os.remove(path)
+            except OSError:
+                pass
+
+
+def build_snapshot_dir(globopts):
+    if globopts.get('PublishDiff'.lower(), 'False') != 'True':
+        return None
+
+    return os.path.join(globopts['InputStateSaveDir'.lower()], SNAPSHOT_DIR)
+
+
+def build_compress_opts(globopts):
+    """
+       WebAPI keyword arguments for upload compression.
+    """
+    encoding = globopts.get('PublishCompress'.lower(), '').lower()
+    if encoding not in COMPRESS_WBITS:
+        return dict(compress=None)
+
+    return dict(compress=encoding,
+                compress_level=int(globopts.get('PublishCompressLevel'.lower(),
+                                                DEFAULT_COMPRESS_LEVEL)))
+
+
 class WebAPI(object):
     methods = {
         'downtimes-csv-connector.py': 'downtimes',
@@ -24,15 +164,23 @@ class WebAPI(object):
 
     def __init__(self, connector, host, token, logger, retry,
                  timeout=180, sleepretry=60, retryrandom=None, sleepretryrandom=None, report=None, endpoints_group=None,
-                 date=None):
+                 date=None, snapshot_dir=None, compress=None,
+                 compress_level=DEFAULT_COMPRESS_LEVEL):
         self.connector = os.path.basename(connector)
         self.webapi_method = self.methods[self.connector]
         self.host = host
         self.token = token
         self.headers = {
             'x-api-key': self.token,
-            'Accept': 'application/json'
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate'
         }
+        self.compress = compress
+        self.compress_level = compress_level
+        self.upload_headers = dict(self.headers)
+        self.upload_headers['Content-Type'] = 'application/json'
+        if self.compress:
+            self.upload_headers['Content-Encoding'] = self.compress
         self.report = report
         self.logger = logger
         self.retry = retry
@@ -49,9 +197,9 @@ class WebAPI(object):
         }
         self.endpoints_group = endpoints_group
         self.date = date or self._construct_datenow()
+        self.snapshot_dir = snapshot_dir
         self.session = SessionWithRetry(self.logger, module_class_name(self),
-                                        self.retry_options, verbose_ret=True,
-                                        handle_session_close=True)
+                                        self.retry_options, verbose_ret=True)
 
     def _construct_datenow(self):
         d = datetime.datetime.now()
@@ -82,11 +230,17 @@ class WebAPI(object):
 
         return formatted
 
+    def _payload(self, data_send):
+        if self.compress:
+            return compress_stream(json_stream(data_send), self.compress,
+                                   self.compress_level)
+        return json_stream(data_send)
+
     async def _send(self, api, data_send, connector):
         content, headers, status = await self.session.http_post(api,
-                                                                data=json.dumps(
-                                                                    data_send),
-                                                                headers=self.headers)
+                                                                data=partial(self._payload,
+                                                                             data_send),
+                                                                headers=self.upload_headers)
         if status != 201:
             if (connector.startswith('topology')
                 or connector.startswith('downtimes')
@@ -139,9 +293,9 @@ class WebAPI(object):
         loc = '{}://{}{}/{}?{}'.format(loc.scheme,
                                        loc.hostname, loc.path, id, loc.query)
         content, headers, status = await self.session.http_put(loc,
-                                                               data=json.dumps(
-                                                                   data_send),
-                                                               headers=self.headers)
+                                                               data=partial(self._payload,
+                                                                            data_send),
+                                                               headers=self.upload_headers)
         return content, status
 
     async def _update(self, api, data_send):
@@ -164,6 +318,7 @@ class WebAPI(object):
                                   (module_class_name(self), '_update',
                                    self.logger.customer, self.logger.job,
                                    content))
+            return status
 
     async def _delete_and_resend(self, api, data_send, topo_component, downtimes_component):
         id = None
@@ -172,8 +327,9 @@ class WebAPI(object):
             id = content['data'][0]['id']
         status = await self._delete(api, id, self.date)
         if status == 200:
-            await self._send(api, data_send, self.connector)
+            status = await self._send(api, data_send, self.connector)
             self.logger.info('Succesfully deleted and created new resource')
+        return status
 
     async def get(self, api_path, jsonret):
         if api_path:
@@ -223,14 +379,28 @@ class WebAPI(object):
         if self.connector.startswith('weights'):
             data_send = self._format_weights(data)
 
+        # WEB-API resources can only be replaced as a whole so data is sent
+        # only if something changed since the last publish
+        snapshot = None
+        if self.snapshot_dir:
+            snapshot = PublishSnapshot(self.snapshot_dir, api, self.token)
+            changed, removed = snapshot.diff(data_send)
+            if not changed and not removed:
+                self.logger.info('Data unchanged since last sent to WEB-API')
+                return
+            self.logger.info('Sending to WEB-API new or changed:%d removed:%d' % (changed, removed))
+
         try:
             status = await self._send(api, data_send, self.connector)
 
             # delete resource on WEB-API and resend
             if status == 409 and topo_component or downtimes_component:
-                await self._delete_and_resend(api, data_send, topo_component, downtimes_component)
+                status = await self._delete_and_resend(api, data_send, topo_component, downtimes_component)
             elif status == 409:
-                await self._update(api, data_send)
+                status = await self._update(api, data_send)
+
+            if snapshot and status in (200, 201):
+                snapshot.save()
 
             self.logger.info('Data succesfully sent to WEB-API')
 
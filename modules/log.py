@@ -16,6 +16,10 @@ class Logger:
         logging.basicConfig(format=lfs, level=logging.INFO, stream=sys.stdout)
         self.logger = logging.getLogger(connector)
 
+        # handlers are attached only once per connector name
+        if self.logger.handlers:
+            return
+
         try:
             sysloghandle = logging.handlers.SysLogHandler('/dev/log', logging.handlers.SysLogHandler.LOG_USER)
         except socket.error:
@@ -1,83 +1,84 @@
 def filter_dups_noemails(contact_list):
-    # does not preserve order needed for test
-    # no_dups = list(orderedset(contact_list))
     only_emails = list()
-    no_dups = list()
     visited = set()
     for contact in contact_list:
         if contact in visited:
             continue
-        else:
-            no_dups.append(contact)
         visited.add(contact)
 
-    for contact in no_dups:
         if '@' not in contact:
             continue
 
         if ',' in contact:
-            only_emails = only_emails + contact.split(',')
+            only_emails.extend(contact.split(','))
         elif ';' in contact:
-            only_emails = only_emails + contact.split(';')
+            only_emails.extend(contact.split(';'))
         else:
             only_emails.append(contact)
 
     return only_emails
 
 
+def normalise_group_contacts(contact_list):
+    """
+       Deduplicated emails of group contacts that are either plain strings
+       or dicts with email key. None if there are no emails.
+    """
+    found_emails = None
+    emails = list()
+    for contact in contact_list:
+        if isinstance(contact, str):
+            found_emails = filter_dups_noemails(contact_list)
+            break
+        else:
+            emails.append(contact['email'])
+
+    if emails:
+        filtered_emails = filter_dups_noemails(emails)
+        if filtered_emails:
+            return filtered_emails
+
+    return found_emails or None
+
+
 def attach_contacts_topodata(logger, contacts, topodata, notification_flag=None):
     updated_topodata = list()
-    found_contacts = None
+    entity = None
 
     if len(contacts) == 0:
         return topodata
 
+    # group contacts are normalised once per group name and endpoint
+    # contacts are plain dictionary lookups so join is linear
+    group_emails = dict()
+    lookup = contacts.get
+
     try:
         for entity in topodata:
             # group_groups topotype
             if 'subgroup' in entity:
-                if entity['subgroup'] in contacts:
-                    emails = list()
-                    for contact in contacts[entity['subgroup']]:
-                        if isinstance(contact, str):
-                            filtered_emails = filter_dups_noemails(contacts[entity['subgroup']])
-                            if filtered_emails:
-                                entity.update(notifications={
-                                    'contacts': filtered_emails,
-                                    'enabled': entity['notifications']['enabled'] \
-                                        if notification_flag else True
-                                })
-                                break
-                        else:
-                            emails.append(contact['email'])
-                    if emails:
-                        filtered_emails = filter_dups_noemails(emails)
-                        if filtered_emails:
-                            entity.update(notifications={
-                                'contacts': filtered_emails,
-                                'enabled': entity['notifications']['enabled'] \
-                                    if notification_flag else True
-                            })
+                name = entity['subgroup']
+                if name not in group_emails:
+                    contact_list = lookup(name)
+                    group_emails[name] = normalise_group_contacts(contact_list) \
+                        if contact_list is not None else None
+                found_contacts = group_emails[name]
+                if found_contacts is not None:
+                    found_contacts = list(found_contacts)
 
             # group_endpoints topotype
             else:
-                contact_key = None
-
-                lookup_key = entity['hostname'].replace('_', '+', 1)
-                if lookup_key in contacts:
-                    contact_key = lookup_key
-                else:
-                    lookup_key = '{}+{}'.format(entity['hostname'], entity['service'])
-                    if lookup_key in contacts:
-                        contact_key = lookup_key
-
-                if contact_key:
-                    contact = contacts[contact_key]
-                    entity.update(notifications={
-                        'contacts': contact,
-                        'enabled': entity['notifications']['enabled'] \
-                            if notification_flag else True
-                    })
+                hostname = entity['hostname']
+                found_contacts = lookup(hostname.replace('_', '+', 1))
+                if found_contacts is None:
+                    found_contacts = lookup(hostname + '+' + entity['service'])
+
+            if found_contacts is not None:
+                entity['notifications'] = {
+                    'contacts': found_contacts,
+                    'enabled': entity['notifications']['enabled'] \
+                        if notification_flag else True
+                }
 
             updated_topodata.append(entity)
 
@@ -85,7 +86,5 @@ def attach_contacts_topodata(logger, contacts, topodata, notification_flag=None)
         logger.warn('Error joining contacts and topology data: %s' % repr(exc))
         if entity:
             logger.warn('Topology entity: %s' % entity)
-        if found_contacts:
-            logger.warn('Found contacts: %s' % found_contacts)
 
     return updated_topodata
@@ -1,29 +1,46 @@
-def load_srm_port_map(logger, ldap_data, attribute_name):
+class SrmPortMap(object):
     """
-        Returnes a dictionary which maps hostnames to their respective ldap port if such exists
+        Map of hostnames to their respective ldap port built from LDAP
+        entries added one by one as they arrive
     """
-    port_dict = {}
-    for res in ldap_data:
+    def __init__(self, logger, attribute_name):
+        self.logger = logger
+        self.attribute_name = attribute_name
+        self.ports = dict()
+
+    def add(self, res):
         try:
-            attribute = res[attribute_name][0]
+            attribute = res[self.attribute_name][0]
             start_index = attribute.index('//')
             colon_index = attribute.index(':', start_index)
             end_index = attribute.index('/', colon_index)
             fqdn = attribute[start_index + 2:colon_index]
             port = attribute[colon_index + 1:end_index]
 
-            port_dict[fqdn] = port
+            self.ports[fqdn] = port
 
         except ValueError:
-            logger.error('Exception happened while retrieving port from: %s' % res)
+            self.logger.error('Exception happened while retrieving port from: %s' % res)
+
+
+def load_srm_port_map(logger, ldap_data, attribute_name):
+    """
+        Returnes a dictionary which maps hostnames to their respective ldap port if such exists
+    """
+    srm_ports = SrmPortMap(logger, attribute_name)
+    for res in ldap_data:
+        srm_ports.add(res)
 
-    return port_dict
+    return srm_ports.ports
 
 def attach_srmport_topodata(logger, attributes, topodata, group_endpoints):
     """
         Get SRM ports from LDAP and put them under tags -> info_srm_port
     """
-    srm_port_map = load_srm_port_map(logger, topodata, attributes)
+    if isinstance(topodata, SrmPortMap):
+        srm_port_map = topodata.ports
+    else:
+        srm_port_map = load_srm_port_map(logger, topodata, attributes)
     for endpoint in group_endpoints:
         if endpoint['service'] == 'SRM' and srm_port_map.get(endpoint['hostname'], False):
             endpoint['tags']['info_bdii_SRM2_PORT'] = srm_port_map[endpoint['hostname']]
@@ -1,3 +1,9 @@
+import re
+
+
+SEUNIQUEID_RE = re.compile(r'(?:^|,)\s*GlueSEUniqueID=([^,\\+]*)(?=,|$)')
+
+
 def extract_value(key, entry):
     if isinstance(entry, tuple):
         for e in entry:
@@ -8,77 +14,91 @@ def extract_value(key, entry):
         return entry.get(key, None)
 
 
-def update_map_entry(endpoint, mapping, sepath, voname):
-    if endpoint not in mapping:
-        mapping[endpoint] = list()
-        mapping[endpoint].append({
-            'voname': voname,
-            'GlueVOInfoPath': sepath
-        })
-    else:
-        mapping[endpoint].append({
-            'voname': voname,
-            'GlueVOInfoPath': sepath
-        })
+def extract_endpoint(dn):
+    """
+        GlueSEUniqueID from DN string with precompiled regex, falling back to
+        parsed RDNs only for DNs with escaped or multivalued components
+    """
+    match = SEUNIQUEID_RE.search(str(dn))
+    if match:
+        return match.group(1)
+    return extract_value('GlueSEUniqueID', dn.rdns)
 
 
-def ispath_already_added(endpoint, mapping, sepath):
-    target = None
+def extract_voname(rules):
+    if not isinstance(rules, list):
+        return rules
 
-    if endpoint in mapping:
-        target = mapping[endpoint]
-        sepaths = set()
+    for rule in rules:
+        if 'VO:' in rule:
+            return rule.split(':')[1]
 
-        for entry in target:
-            sepaths.add(entry['GlueVOInfoPath'])
+    return None
 
-        return sepath in sepaths
 
-    else:
-        return False
+class EndpointPathMap(object):
+    """
+        Map of storage endpoints to VO storage paths built in single pass
+        over LDAP entries. Paths already seen for every endpoint are kept in
+        a set so entries can be added one by one as they arrive.
+    """
+    def __init__(self, logger):
+        self.logger = logger
+        self.mapping = dict()
+        self._sepaths = dict()
+
+    def add(self, entry):
+        try:
+            voname = extract_voname(entry.get('GlueVOInfoAccessControlBaseRule'))
+            if not voname:
+                return
+
+            sepath = entry.get('GlueVOInfoPath')
+            sepath = sepath[0] if isinstance(sepath, list) else None
+            if not sepath:
+                return
 
+            endpoint = extract_endpoint(entry['dn'])
+            if not endpoint:
+                return
 
-def build_map_endpoint_path(logger, bdiidata):
-    mapping = dict()
-
-    try:
-        for entry in bdiidata:
-            voname = extract_value('GlueVOInfoAccessControlBaseRule', entry)
-            if isinstance(voname, list):
-                voname = list(filter(lambda e: 'VO:' in e, voname))
-                if voname:
-                    voname = voname[0].split(':')[1]
-                else:
-                    continue
-
-            sepath = extract_value('GlueVOInfoPath', entry)
-            sepath = sepath[0] if isinstance(sepath, list) else None
-            endpoint = extract_value('GlueSEUniqueID', entry['dn'].rdns)
+        except IndexError as exc:
+            self.logger.error('Error building map of endpoints and storage paths from BDII data: %s' % repr(exc))
+            self.logger.error('LDAP entry: %s' % entry)
+            return
 
-            if (voname and sepath and endpoint
-                and not ispath_already_added(endpoint, mapping, sepath)
-                and ' ' not in voname):
-                update_map_entry(endpoint, mapping, sepath, voname)
+        sepaths = self._sepaths.get(endpoint)
+        if sepaths is None:
+            sepaths = self._sepaths[endpoint] = set()
+            self.mapping[endpoint] = list()
+        elif sepath in sepaths:
+            return
+        sepaths.add(sepath)
 
-            elif (voname and sepath and endpoint
-                and not ispath_already_added(endpoint, mapping, sepath)
-                and ' ' in voname):
-                vonames = voname.split(' ')
-                for vo in vonames:
-                    update_map_entry(endpoint, mapping, sepath, vo)
+        for vo in voname.split(' ') if ' ' in voname else [voname]:
+            self.mapping[endpoint].append({
+                'voname': vo,
+                'GlueVOInfoPath': sepath
+            })
 
-    except IndexError as exc:
-        logger.error('Error building map of endpoints and storage paths from BDII data: %s' % repr(exc))
-        logger.error('LDAP entry: %s' % entry)
 
-    return mapping
+def build_map_endpoint_path(logger, bdiidata):
+    endpoint_paths = EndpointPathMap(logger)
+
+    for entry in bdiidata:
+        endpoint_paths.add(entry)
+
+    return endpoint_paths.mapping
 
 
 def attach_sepath_topodata(logger, bdii_opts, bdiidata, group_endpoints):
     """
         Get SRM ports from LDAP and put them under tags -> info_srm_port
     """
-    endpoint_sepaths = build_map_endpoint_path(logger, bdiidata)
+    if isinstance(bdiidata, EndpointPathMap):
+        endpoint_sepaths = bdiidata.mapping
+    else:
+        endpoint_sepaths = build_map_endpoint_path(logger, bdiidata)
 
     for endpoint in group_endpoints:
         if endpoint['hostname'] in endpoint_sepaths:
@@ -0,0 +1,154 @@
+import datetime
+import functools
+import json
+import os
+import re
+import time
+
+from contextlib import contextmanager
+
+from argo_connectors.io.httpcache import atomic_write
+
+
+METRIC_PREFIX = 'argo_connectors'
+
+
+def _size(data):
+    if isinstance(data, (str, bytes)):
+        return len(data)
+    elif isinstance(data, (list, tuple)):
+        return sum(_size(chunk) for chunk in data)
+    return 0
+
+
+def _label_value(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+class TaskMetrics(object):
+    """
+       Durations of phases of task run together with counters of fetched
+       bytes and produced records. Time spent in phase entered more than
+       once, or from concurrent coroutines, is summed.
+    """
+    def __init__(self):
+        self.started = time.time()
+        self.timings = dict()
+        self.records = dict()
+        self.counters = dict()
+
+    @contextmanager
+    def timer(self, phase):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(phase, time.perf_counter() - start)
+
+    def add_time(self, phase, seconds):
+        self.timings[phase] = self.timings.get(phase, 0.0) + seconds
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def fetched(self, data):
+        self.count('fetched_bytes', _size(data))
+        self.count('fetches')
+
+    def add_records(self, kind, number):
+        self.records[kind] = self.records.get(kind, 0) + number
+
+    def summary(self, connector, customer, success):
+        return {
+            'connector': connector,
+            'customer': customer,
+            'started': datetime.datetime.utcfromtimestamp(self.started).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'success': success,
+            'phases': dict((phase, round(seconds, 6)) for phase, seconds in self.timings.items()),
+            'records': self.records,
+            'counters': self.counters
+        }
+
+    def prometheus(self, connector, customer, success):
+        """
+           Metrics in Prometheus text exposition format
+        """
+        labels = 'connector="{}",customer="{}"'.format(_label_value(connector),
+                                                       _label_value(customer))
+        lines = list()
+
+        def metric(name, mtype, desc, samples):
+            name = '{}_{}'.format(METRIC_PREFIX, name)
+            lines.append('# HELP {} {}'.format(name, desc))
+            lines.append('# TYPE {} {}'.format(name, mtype))
+            for extra, value in samples:
+                lines.append('{}{{{}{}}} {}'.format(name, labels, extra, value))
+
+        metric('phase_seconds', 'gauge', 'Time spent in phase of the last run',
+               [(',phase="{}"'.format(_label_value(phase)), '%.6f' % seconds)
+                for phase, seconds in sorted(self.timings.items())])
+        metric('records', 'gauge', 'Number of records produced in the last run',
+               [(',kind="{}"'.format(_label_value(kind)), number)
+                for kind, number in sorted(self.records.items())])
+        for name, value in sorted(self.counters.items()):
+            metric(name, 'gauge', 'Number of {} in the last run'.format(name.replace('_', ' ')),
+                   [('', value)])
+        metric('last_run_success', 'gauge', 'Whether the last run completed',
+               [('', int(success))])
+        metric('last_run_timestamp_seconds', 'gauge', 'Start time of the last run',
+               [('', '%.3f' % self.started)])
+
+        return '\n'.join(lines) + '\n'
+
+
+def metrics_filename(connector, customer, ext):
+    name = '_'.join([os.path.basename(connector).replace('.py', ''), customer or ''])
+    return re.sub(r'[^\w.-]', '_', name.strip('_')) + ext
+
+
+def write_metrics(logger, metrics, connector, globopts, success=True):
+    """
+       Write task metrics into Prometheus textfile collector directory
+       and as JSON run summary, whichever is enabled. Failing to do so
+       is only logged.
+    """
+    customer = getattr(logger, 'customer', None) or ''
+    connector = os.path.basename(connector).replace('.py', '')
+    outputs = list()
+
+    if globopts.get('MetricsPrometheus'.lower(), 'False') == 'True':
+        outputs.append((globopts['MetricsPrometheusDir'.lower()], '.prom',
+                        metrics.prometheus(connector, customer, success)))
+    if globopts.get('MetricsSummary'.lower(), 'False') == 'True':
+        outputs.append((globopts['MetricsSummaryDir'.lower()], '.json',
+                        json.dumps(metrics.summary(connector, customer, success),
+                                   indent=4, sort_keys=True)))
+
+    for dirpath, ext, content in outputs:
+        try:
+            os.makedirs(dirpath, exist_ok=True)
+            atomic_write(os.path.join(dirpath, metrics_filename(connector, customer, ext)),
+                         content.encode('utf-8'))
+        except OSError as exc:
+            logger.warn('Customer:%s Writing metrics failed - %s' % (customer, repr(exc)))
+
+
+def instrumented(run):
+    """
+       Decorator of task run() coroutine timing it as a whole and writing
+       out task metrics once it's done, also when it raised
+    """
+    @functools.wraps(run)
+    async def wrapper(task, *args, **kwargs):
+        success = False
+        try:
+            with task.metrics.timer('run'):
+                ret = await run(task, *args, **kwargs)
+            success = not task.metrics.counters.get('failures')
+            return ret
+
+        finally:
+            write_metrics(task.logger, task.metrics, task.connector_name,
+                          task.globopts, success)
+
+    return wrapper
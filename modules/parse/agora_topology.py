@@ -1,4 +1,5 @@
 from argo_connectors.exceptions import ConnectorParseError
+from argo_connectors.records import GroupEndpoint, GroupGroup
 from argo_connectors.utils import module_class_name, remove_non_utf
 
 import json
@@ -24,17 +25,17 @@ class ParseAgoraTopo(object):
                 catalog_url = unidecode(f'https://catalogue.ni4os.eu/?_=/providers/{data["id"]}')
                 ext_name = unidecode(data['epp_bai_name'])
 
-                providers.append({
-                    'group': 'NI4OS Providers',
-                    'type': 'PROVIDERS',
-                    'subgroup': subgroup,
-                    'tags': {
+                providers.append(GroupGroup(
+                    group='NI4OS Providers',
+                    type='PROVIDERS',
+                    subgroup=subgroup,
+                    tags={
                         'info_ext_catalog_id': catalog_id,
                         'info_ext_catalog_type': 'provider',
                         'info_ext_catalog_url': catalog_url,
                         'info_ext_name': ext_name,
                     }
-                })
+                ))
 
             return providers
 
@@ -68,12 +69,12 @@ class ParseAgoraTopo(object):
 
                 if type(group_name) == list and group_name != []:
                     for i in range(len(group_name)):
-                        resources.append({
-                            'group': unidecode(group_name[i]),
-                            'type': 'SERVICEGROUPS',
-                            'service': 'catalog.service.entry',
-                            'hostname': rsc_hostname,
-                            'tags': {
+                        resources.append(GroupEndpoint(
+                            group=unidecode(group_name[i]),
+                            type='SERVICEGROUPS',
+                            service='catalog.service.entry',
+                            hostname=rsc_hostname,
+                            tags={
                                 'hostname': 'agora.ni4os.eu',
                                 'info_ID': rsc_info_id,
                                 'info_ext_catalog_id': rsc_catalog_id,
@@ -81,15 +82,15 @@ class ParseAgoraTopo(object):
                                 'info_ext_catalog_url': rsc_catalog_url,
                                 'info_ext_name': rsc_ext_name
                             }
-                        })
+                        ))
 
                 else:
-                    resources.append({
-                        'group': unidecode(group_name),
-                        'type': 'SERVICEGROUPS',
-                        'service': 'catalog.service.entry',
-                        'hostname': rsc_hostname,
-                        'tags': {
+                    resources.append(GroupEndpoint(
+                        group=unidecode(group_name),
+                        type='SERVICEGROUPS',
+                        service='catalog.service.entry',
+                        hostname=rsc_hostname,
+                        tags={
                             'hostname': 'agora.ni4os.eu',
                             'info_ID': rsc_info_id,
                             'info_ext_catalog_id': rsc_catalog_id,
@@ -97,7 +98,7 @@ class ParseAgoraTopo(object):
                             'info_ext_catalog_url': rsc_catalog_url,
                             'info_ext_name': rsc_ext_name
                         }
-                    })
+                    ))
 
             # constructed from provider entry and planted as artificial resource
             for pr_data in providers_data:
@@ -109,12 +110,12 @@ class ParseAgoraTopo(object):
                 prov_catalog_url = f'https://catalogue.ni4os.eu/?_=/providers/{unidecode(pr_data["id"])}'
                 prov_ext_name = unidecode(pr_data['epp_bai_name'])
 
-                resources.append({
-                    'group': prov_group,
-                    'type': 'SERVICEGROUPS',
-                    'service': 'catalog.provider.entry',
-                    'hostname': prov_hostname,
-                    'tags': {
+                resources.append(GroupEndpoint(
+                    group=prov_group,
+                    type='SERVICEGROUPS',
+                    service='catalog.provider.entry',
+                    hostname=prov_hostname,
+                    tags={
                         'hostname': 'agora.ni4os.eu',
                         'info_ID': prov_info_id,
                         'info_ext_catalog_id': prov_catalog_id,
@@ -122,7 +123,7 @@ class ParseAgoraTopo(object):
                         'info_ext_catalog_url': prov_catalog_url,
                         'info_ext_name': prov_ext_name
                     }
-                })
+                ))
 
             return resources
 
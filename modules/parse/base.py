@@ -1,16 +1,95 @@
 import csv
 import json
 from io import StringIO
+from lxml import etree
 from lxml.etree import XMLSyntaxError
 
 from argo_connectors.utils import module_class_name
 from argo_connectors.exceptions import ConnectorParseError
 
 
+XML_CHUNK_SIZE = 64 * 1024
+
+
+class XMLPages(list):
+    """
+        Paginated XML feed kept as a list of separate per-page documents
+        instead of a single rebuilt buffer.
+    """
+    pass
+
+
 class ParseHelpers(object):
     def __init__(self, logger, *args, **kwargs):
         self.logger = logger
 
+    def _xml_chunks(self, data):
+        if isinstance(data, (str, bytes)):
+            data = [data]
+
+        for chunk in data:
+            if isinstance(chunk, str):
+                # encode piece by piece so that whole UTF-8 copy of the
+                # document is never kept next to the str one
+                for i in range(0, len(chunk), XML_CHUNK_SIZE):
+                    yield chunk[i:i + XML_CHUNK_SIZE].encode('utf-8')
+            else:
+                yield chunk
+
+    def iterparse_xml(self, data):
+        """
+            Incrementally parse XML document given as str, bytes or an
+            iterable of str/bytes chunks and yield children of the root
+            element one by one. Yielded element is cleared and dropped from
+            the tree once the caller asks for the next one so only the
+            subtree of a single topology entity is kept in memory. For
+            XMLPages, children of root element of every page are yielded
+            in page order.
+        """
+        if isinstance(data, XMLPages):
+            for page in data:
+                yield from self._iterparse_document(page)
+        else:
+            yield from self._iterparse_document(data)
+
+    def _iterparse_document(self, data):
+        parser = etree.XMLPullParser(events=('start', 'end'))
+        depth = 0
+        chunks = self._xml_chunks(data)
+
+        while True:
+            chunk = next(chunks, None)
+            if chunk is None:
+                parser.close()
+            else:
+                parser.feed(chunk)
+
+            for event, element in parser.read_events():
+                if event == 'start':
+                    depth += 1
+                    continue
+
+                depth -= 1
+                if depth == 1:
+                    yield element
+                    element.clear()
+                    while element.getprevious() is not None:
+                        del element.getparent()[0]
+
+            if chunk is None:
+                break
+
+    def xml_root(self, data):
+        """
+            Build whole XML tree from str, bytes or an iterable of str/bytes
+            chunks feeding the parser chunk by chunk.
+        """
+        parser = etree.XMLParser()
+        for chunk in self._xml_chunks(data):
+            parser.feed(chunk)
+
+        return parser.close()
+
     def parse_extensions(self, extensions_node):
         extensions_dict = dict()
 
@@ -96,6 +175,9 @@ class ParseHelpers(object):
                     raise ConnectorParseError("{} Customer:{} : No JSON data fetched".format(
                         module_class_name(self), self.logger.customer))
 
+            if not isinstance(data, (str, bytes, bytearray)):
+                data = b''.join(self._xml_chunks(data))
+
             return json.loads(data)
 
         except ValueError as exc:
@@ -6,23 +6,27 @@ from xml.parsers.expat import ExpatError
 from argo_connectors.exceptions import ConnectorParseError
 from argo_connectors.parse.base import ParseHelpers
 from argo_connectors.utils import construct_fqdn
-from argo_connectors.utils import module_class_name
+from argo_connectors.utils import module_class_name, split_days, window_days
 
 
 class ParseDowntimes(ParseHelpers):
-    def __init__(self, logger, data, current_date, uid=False):
+    def __init__(self, logger, data, current_date, uid=False, end_date=None):
         self.logger = logger
         self.data = self.csv_to_json(data)
         self.start = current_date
-        self.end = current_date.replace(hour=23, minute=59, second=59)
+        self.end = (end_date or current_date).replace(hour=23, minute=59, second=59)
         self.uid = uid
 
-    def get_data(self):
-        downtimes = list()
+    def _downtime(self, hostname, service_type, start_time, end_time):
+        entry = dict()
+        entry['hostname'] = hostname
+        entry['service'] = service_type
+        entry['start_time'] = start_time.strftime('%Y-%m-%dT%H:%M:00Z')
+        entry['end_time'] = end_time.strftime('%Y-%m-%dT%H:%M:00Z')
+        return entry
 
+    def _parse(self):
         for downtime in self.data:
-            entry = dict()
-
             service_id = downtime['unique_id']
             classification = downtime['Severity']
             if not service_id or classification != 'OUTAGE':
@@ -34,22 +38,39 @@ class ParseDowntimes(ParseHelpers):
             end_time = datetime.datetime.strptime(downtime['end_time'], "%m/%d/%Y %H:%M")
 
             if self.uid:
-                entry['hostname'] = '{0}_{1}'.format(hostname, service_id)
-            else:
-                entry['hostname'] = hostname
+                hostname = '{0}_{1}'.format(hostname, service_id)
 
+            yield hostname, service_type, start_time, end_time
+
+    def get_data(self):
+        downtimes = list()
+        day_end = self.start.replace(hour=23, minute=59, second=59)
+
+        for hostname, service_type, start_time, end_time in self._parse():
             start_date = start_time.replace(hour=0, minute=0, second=0)
             end_date = end_time.replace(hour=0, minute=0, second=0)
             if self.start >= start_date and self.start <= end_date:
                 if start_time < self.start:
                     start_time = self.start
-                if end_time > self.end:
-                    end_time = self.end
-
-                entry['service'] = service_type
-                entry['start_time'] = start_time.strftime('%Y-%m-%dT%H:%M:00Z')
-                entry['end_time'] = end_time.strftime('%Y-%m-%dT%H:%M:00Z')
+                if end_time > day_end:
+                    end_time = day_end
 
-                downtimes.append(entry)
+                downtimes.append(self._downtime(hostname, service_type,
+                                                start_time, end_time))
 
         return downtimes
+
+    def get_data_per_day(self):
+        """
+            Downtimes of every day from current_date to end_date with each
+            one clipped to the bounds of its day
+        """
+        days = window_days(self.start, self.end)
+
+        for hostname, service_type, start_time, end_time in self._parse():
+            for day, day_start, day_end in split_days(start_time, end_time,
+                                                      self.start, self.end):
+                days[day].append(self._downtime(hostname, service_type,
+                                                day_start, day_end))
+
+        return days
@@ -1,5 +1,6 @@
 from argo_connectors.exceptions import ConnectorParseError
 from argo_connectors.parse.base import ParseHelpers
+from argo_connectors.records import GroupEndpoint, GroupGroup
 from argo_connectors.utils import  construct_fqdn
 
 
@@ -27,7 +28,7 @@ class ParseFlatEndpoints(ParseHelpers):
             already_added = list()
 
             for entity in self.data:
-                tmp_dict = dict()
+                tmp_dict = GroupGroup()
 
                 tmp_dict['type'] = 'PROJECT'
                 tmp_dict['group'] = self.project
@@ -52,7 +53,7 @@ class ParseFlatEndpoints(ParseHelpers):
             groups = list()
 
             for entity in self.data:
-                tmp_dict = dict()
+                tmp_dict = GroupEndpoint()
 
                 tmp_dict['type'] = self.fetchtype.upper()
                 tmp_dict['group'] = entity['SITENAME-SERVICEGROUP']
@@ -1,4 +1,3 @@
-from lxml import etree
 from lxml.etree import XMLSyntaxError
 
 from argo_connectors.parse.base import ParseHelpers
@@ -20,31 +19,67 @@ class ParseContacts(ParseHelpers):
                 values.append('')
         return values
 
+    def parse_site_contact(self, element, sites_contacts):
+        sitename, contact = None, None
+        for child in element:
+            if child.tag == 'CONTACT_EMAIL':
+                contact = child.text
+            if child.tag == 'SHORT_NAME':
+                sitename = child.text
+
+        if contact:
+            if ';' in contact:
+                lcontacts = list()
+                for single_contact in contact.split(';'):
+                    lcontacts.append(single_contact)
+                sites_contacts[sitename] = lcontacts
+            else:
+                sites_contacts[sitename] = [contact]
+
+    def parse_servicegroup_contact(self, element, endpoints_contacts):
+        name, contact = None, None
+        for child in element:
+            if child.tag == 'NAME':
+                name = child.text
+
+            if child.tag == 'CONTACT_EMAIL':
+                contact = child.text
+
+        if contact and name:
+            endpoints_contacts[name] = [contact]
+
+    def parse_serviceendpoint_contact(self, element, endpoints_contacts):
+        fqdn, contact, servtype = None, None, None
+
+        for child in element:
+            if child.tag == 'HOSTNAME':
+                fqdn = child.text
+
+            if child.tag == 'CONTACT_EMAIL':
+                contact = child.text
+
+            if child.tag == 'SERVICE_TYPE':
+                servtype = child.text
+
+        if contact != None:
+            if ';' in contact:
+                lcontacts = list()
+                for single_contact in contact.split(';'):
+                    lcontacts.append(single_contact)
+                endpoints_contacts['{}+{}'.format(
+                    fqdn, servtype)] = lcontacts
+            else:
+                endpoints_contacts['{}+{}'.format(fqdn, servtype)] = [
+                    contact]
+
     def parse_sites_with_contacts(self, data):
         try:
             sites_contacts = dict()
 
             doc = self.parse_xml(data)
-            xml_bytes = doc.encode("utf-8")
-            elements = etree.fromstring(xml_bytes)
-
-            for element in elements:
-                sitename, contact = None, None
-                for child in element:
-                    if child.tag == 'CONTACT_EMAIL':
-                        contact = child.text
-                    if child.tag == 'SHORT_NAME':
-                        sitename = child.text
-
-                if contact:
-                    if ';' in contact:
-                        lcontacts = list()
-                        for single_contact in contact.split(';'):
-                            lcontacts.append(single_contact)
-                        sites_contacts[sitename] = lcontacts
-                    else:
-                        sites_contacts[sitename] = [contact]
 
+            for element in self.iterparse_xml(doc):
+                self.parse_site_contact(element, sites_contacts)
 
             return sites_contacts
 
@@ -61,20 +96,9 @@ class ParseContacts(ParseHelpers):
             endpoints_contacts = dict()
 
             doc = self.parse_xml(data)
-            xml_bytes = doc.encode("utf-8")
-            elements = etree.fromstring(xml_bytes)
-
-            for element in elements:
-                name, contact = None, None
-                for child in element:
-                    if child.tag == 'NAME':
-                        name = child.text
 
-                    if child.tag == 'CONTACT_EMAIL':
-                        contact = child.text
-
-                if contact and name:
-                    endpoints_contacts[name] = [contact]
+            for element in self.iterparse_xml(doc):
+                self.parse_servicegroup_contact(element, endpoints_contacts)
 
             return endpoints_contacts
 
@@ -88,33 +112,9 @@ class ParseContacts(ParseHelpers):
             endpoints_contacts = dict()
 
             doc = self.parse_xml(data)
-            xml_bytes = doc.encode("utf-8")
-            elements = etree.fromstring(xml_bytes)
-
-            for element in elements:
-
-                fqdn, contact, servtype = None, None, None
-
-                for child in element:
-                    if child.tag == 'HOSTNAME':
-                        fqdn = child.text
-
-                    if child.tag == 'CONTACT_EMAIL':
-                        contact = child.text
-
-                    if child.tag == 'SERVICE_TYPE':
-                        servtype = child.text
 
-                if contact != None:
-                    if ';' in contact:
-                        lcontacts = list()
-                        for single_contact in contact.split(';'):
-                            lcontacts.append(single_contact)
-                        endpoints_contacts['{}+{}'.format(
-                            fqdn, servtype)] = lcontacts
-                    else:
-                        endpoints_contacts['{}+{}'.format(fqdn, servtype)] = [
-                            contact]
+            for element in self.iterparse_xml(doc):
+                self.parse_serviceendpoint_contact(element, endpoints_contacts)
 
             return endpoints_contacts
 
@@ -1,8 +1,7 @@
 import datetime
-from lxml import etree
 from lxml.etree import XMLSyntaxError
 
-from argo_connectors.utils import module_class_name
+from argo_connectors.utils import module_class_name, split_days, window_days
 from argo_connectors.exceptions import ConnectorParseError
 from argo_connectors.parse.base import ParseHelpers
 
@@ -16,13 +15,20 @@ class ParseDowntimes(ParseHelpers):
         self.end = end
         self.uid = uid
 
-    def get_data(self):
-        filtered_downtimes = list()
+    def _downtime(self, hostname, service_type, start_time, end_time):
+        downtime = dict()
+        downtime['hostname'] = hostname
+        downtime['service'] = service_type
+        downtime['start_time'] = start_time.strftime('%Y-%m-%dT%H:%M:00Z')
+        downtime['end_time'] = end_time.strftime('%Y-%m-%dT%H:%M:00Z')
+        return downtime
+
+    def _parse(self):
+        scheduled = list()
 
         try:
             doc = self.parse_xml(self.data)
-            xml_bytes = doc.encode("utf-8")
-            root = etree.fromstring(xml_bytes)
+            root = self.xml_root(doc)
 
             for downtimes in root:
                 classification = downtimes.attrib['CLASSIFICATION']
@@ -53,26 +59,13 @@ class ParseDowntimes(ParseHelpers):
                 end_time = datetime.datetime.strptime(
                     end_str, "%Y-%m-%d %H:%M")
 
-                if start_time < self.start:
-                    start_time = self.start
-                if end_time > self.end:
-                    end_time = self.end
-
                 if classification == 'SCHEDULED' and severity == 'OUTAGE':
-                    downtime = dict()
                     if self.uid:
-                        downtime['hostname'] = '{0}_{1}'.format(
-                            hostname, service_id)
-                    else:
-                        downtime['hostname'] = hostname
-                    downtime['service'] = service_type
-                    downtime['start_time'] = start_time.strftime(
-                        '%Y-%m-%dT%H:%M:00Z')
-                    downtime['end_time'] = end_time.strftime(
-                        '%Y-%m-%dT%H:%M:00Z')
-                    filtered_downtimes.append(downtime)
-
-            return filtered_downtimes
+                        hostname = '{0}_{1}'.format(hostname, service_id)
+                    scheduled.append((hostname, service_type, start_time,
+                                      end_time))
+
+            return scheduled
 
         except (KeyError, IndexError, AttributeError, TypeError, AssertionError, XMLSyntaxError) as exc:
             msg = '{} Customer:{} : Error parsing downtimes feed - {}'.format(
@@ -81,3 +74,32 @@ class ParseDowntimes(ParseHelpers):
 
         except ConnectorParseError as exc:
             raise exc
+
+    def get_data(self):
+        filtered_downtimes = list()
+
+        for hostname, service_type, start_time, end_time in self._parse():
+            if start_time < self.start:
+                start_time = self.start
+            if end_time > self.end:
+                end_time = self.end
+
+            filtered_downtimes.append(self._downtime(hostname, service_type,
+                                                     start_time, end_time))
+
+        return filtered_downtimes
+
+    def get_data_per_day(self):
+        """
+            Downtimes of the whole window split into days with each one
+            clipped to the bounds of its day
+        """
+        days = window_days(self.start, self.end)
+
+        for hostname, service_type, start_time, end_time in self._parse():
+            for day, day_start, day_end in split_days(start_time, end_time,
+                                                      self.start, self.end):
+                days[day].append(self._downtime(hostname, service_type,
+                                                day_start, day_end))
+
+        return days
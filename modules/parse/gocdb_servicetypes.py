@@ -1,4 +1,3 @@
-from lxml import etree
 from lxml.etree import XMLSyntaxError
 
 from argo_connectors.utils import module_class_name
@@ -16,8 +15,7 @@ class ParseGocdbServiceTypes(ParseHelpers):
 
         try:
             doc = self.parse_xml(self.data)
-            xml_bytes = doc.encode("utf-8")
-            service_types = etree.fromstring(xml_bytes)
+            service_types = self.xml_root(doc)
 
             for service in service_types:
                 name, desc = None, None
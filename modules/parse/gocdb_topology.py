@@ -1,12 +1,12 @@
-from lxml import etree
 from lxml.etree import XMLSyntaxError
 
-from argo_connectors.parse.base import ParseHelpers
+from argo_connectors.parse.gocdb_contacts import ParseContacts
+from argo_connectors.records import GroupEndpoint, GroupGroup
 from argo_connectors.utils import module_class_name
 from argo_connectors.exceptions import ConnectorParseError
 
 
-class ParseSites(ParseHelpers):
+class ParseSites(ParseContacts):
     def __init__(self, logger, data, custname, uid=False,
                  pass_extensions=False, notification_flag=False):
         super().__init__(logger)
@@ -16,17 +16,18 @@ class ParseSites(ParseHelpers):
         self.custname = custname
         self.pass_extensions = pass_extensions
         self._sites = dict()
+        self._contacts = dict()
         self.notification_flag = notification_flag
         self._parse_data()
 
     def _parse_data(self):
         try:
             doc = self.parse_xml(self.data)
-            xml_bytes = doc.encode("utf-8")
-            sites = etree.fromstring(xml_bytes)
 
-            for site in sites:
+            for site in self.iterparse_xml(doc):
                 if site.tag != 'meta':
+                    self.parse_site_contact(site, self._contacts)
+
                     site_name = site.attrib["NAME"]
                     if site_name not in self._sites:
                         self._sites[site_name] = {'site': site_name}
@@ -90,7 +91,7 @@ class ParseSites(ParseHelpers):
                    key=lambda s: s['ngi'])
 
         for group in group_list:
-            tmpg = dict()
+            tmpg = GroupGroup()
             tmpg['type'] = 'NGI'
             tmpg['group'] = group['ngi']
             tmpg['subgroup'] = group['site']
@@ -109,8 +110,11 @@ class ParseSites(ParseHelpers):
 
         return groupofgroups
 
+    def get_contacts(self):
+        return self._contacts
+
 
-class ParseServiceEndpoints(ParseHelpers):
+class ParseServiceEndpoints(ParseContacts):
     def __init__(self, logger, data=None, custname=None, uid=False,
                  pass_extensions=False, notification_flag=False):
         super().__init__(logger)
@@ -120,17 +124,18 @@ class ParseServiceEndpoints(ParseHelpers):
         self.pass_extensions = pass_extensions
         self.notification_flag = notification_flag
         self._service_endpoints = dict()
+        self._contacts = dict()
         self._parse_data()
         self.maxDiff = None
 
     def _parse_data(self):
         try:
             doc = self.parse_xml(self.data)
-            xml_bytes = doc.encode("utf-8")
-            services = etree.fromstring(xml_bytes)
 
-            for service in services:
+            for service in self.iterparse_xml(doc):
                 if service.tag != 'meta':
+                    self.parse_serviceendpoint_contact(service, self._contacts)
+
                     service_id = service.attrib["PRIMARY_KEY"]
                     if service_id not in self._service_endpoints:
                         self._service_endpoints[service_id] = {}
@@ -206,7 +211,7 @@ class ParseServiceEndpoints(ParseHelpers):
                    key=lambda s: s['site'])
 
         for group in group_list:
-            tmpg = dict()
+            tmpg = GroupEndpoint()
             tmpg['type'] = 'SITES'
             tmpg['group'] = group['site']
             tmpg['service'] = group['type']
@@ -248,8 +253,11 @@ class ParseServiceEndpoints(ParseHelpers):
 
         return groupofendpoints
 
+    def get_contacts(self):
+        return self._contacts
+
 
-class ParseServiceGroups(ParseHelpers):
+class ParseServiceGroups(ParseContacts):
     def __init__(self, logger, data, custname, uid=False,
                  pass_extensions=False, notification_flag=False):
         super().__init__(logger)
@@ -260,15 +268,17 @@ class ParseServiceGroups(ParseHelpers):
         self.notification_flag = notification_flag
         # group_groups and group_endpoints components for ServiceGroup topology
         self._service_groups = dict()
+        self._contacts = dict()
         self._parse_data()
 
     def _parse_data(self):
         try:
             doc = self.parse_xml(self.data)
-            xml_bytes = doc.encode("utf-8")
-            groups = etree.fromstring(xml_bytes)
-            for group in groups:
+
+            for group in self.iterparse_xml(doc):
                 if group.tag != 'meta':
+                    self.parse_servicegroup_contact(group, self._contacts)
+
                     group_id = group.attrib["PRIMARY_KEY"]
                     if group_id not in self._service_groups:
                         self._service_groups[group_id] = {}
@@ -344,7 +354,7 @@ class ParseServiceGroups(ParseHelpers):
 
         for group in group_list:
             for service in group['services']:
-                tmpg = dict()
+                tmpg = GroupEndpoint()
                 tmpg['type'] = 'SERVICEGROUPS'
                 tmpg['group'] = group['name']
                 tmpg['service'] = service['type']
@@ -387,7 +397,7 @@ class ParseServiceGroups(ParseHelpers):
                                    value in self._service_groups.items()]
 
         for group in group_list:
-            tmpg = dict()
+            tmpg = GroupGroup()
             tmpg['type'] = 'PROJECT'
             tmpg['group'] = self.custname
             if self.notification_flag:
@@ -399,3 +409,6 @@ class ParseServiceGroups(ParseHelpers):
             groupofgroups.append(tmpg)
 
         return groupofgroups
+
+    def get_contacts(self):
+        return self._contacts
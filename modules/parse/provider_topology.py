@@ -1,6 +1,7 @@
 from urllib.parse import urlparse
 from argo_connectors.exceptions import ConnectorParseError
 from argo_connectors.parse.base import ParseHelpers
+from argo_connectors.records import GroupEndpoint, GroupGroup
 from argo_connectors.utils import filename_date, module_class_name, construct_fqdn, remove_non_utf
 
 import uuid
@@ -139,7 +140,7 @@ class ParseExtensions(ParseHelpers):
                     continue
 
                 for group in extension['monitoringGroups']:
-                    gee = dict()
+                    gee = GroupEndpoint()
                     gee['type'] = 'SERVICEGROUPS'
                     gee['service'] = group['serviceType']
                     gee['group'] = extension['serviceId']
@@ -202,7 +203,7 @@ class ParseTopo(object):
                 self.resources.data
             ))
             for resource in resource_from_provider:
-                gge = dict()
+                gge = GroupGroup()
                 if (providers_added.get(provider['id'], False) and
                         providers_added[provider['id']] == resource['id']):
                     continue
@@ -229,7 +230,7 @@ class ParseTopo(object):
         for resource in self.resources.data:
             if resource['provider'] not in unique_providers:
                 continue
-            gee = dict()
+            gee = GroupEndpoint()
             gee['type'] = 'SERVICEGROUPS'
             gee['service'] = resource['hardcoded_service']
             gee['group'] = resource['id']
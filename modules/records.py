@@ -0,0 +1,78 @@
+import sys
+
+from collections.abc import MutableMapping
+
+
+class TopoRecord(MutableMapping):
+    """
+       Topology entity kept in __slots__ instead of per entity dictionary.
+       It behaves as mapping of fields that are set so parsers and mesh
+       keep using item access, and it's turned into dictionary only when
+       encoded to JSON with json_default().
+    """
+    __slots__ = ()
+    _fields = ()
+    # few distinct values repeated over all entities
+    _interned = frozenset(['type', 'group', 'service', 'subgroup'])
+
+    def __init__(self, **kwargs):
+        for key, value in kwargs.items():
+            self[key] = value
+
+    def __getitem__(self, key):
+        if key in self._fields:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                pass
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in self._fields:
+            raise KeyError(key)
+        if key in self._interned and isinstance(value, str):
+            value = sys.intern(str(value))
+        setattr(self, key, value)
+
+    def __delitem__(self, key):
+        try:
+            delattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self._fields and hasattr(self, key)
+
+    def __iter__(self):
+        for field in self._fields:
+            if hasattr(self, field):
+                yield field
+
+    def __len__(self):
+        return len(list(iter(self)))
+
+    def __repr__(self):
+        return repr(self.to_dict())
+
+    def to_dict(self):
+        return dict([(field, getattr(self, field)) for field in self])
+
+
+class GroupEndpoint(TopoRecord):
+    __slots__ = ('type', 'group', 'service', 'notifications', 'hostname',
+                 'tags')
+    _fields = __slots__
+
+
+class GroupGroup(TopoRecord):
+    __slots__ = ('type', 'group', 'subgroup', 'notifications', 'tags')
+    _fields = __slots__
+
+
+def json_default(obj):
+    """
+       default hook for json.dumps() encoding records as dictionaries
+    """
+    if isinstance(obj, TopoRecord):
+        return obj.to_dict()
+    raise TypeError('Object of type %s is not JSON serializable' % type(obj).__name__)
@@ -2,9 +2,10 @@ import asyncio
 from urllib.parse import urlparse
 
 from argo_connectors.io.http import SessionWithRetry
-from argo_connectors.io.webapi import WebAPI
+from argo_connectors.io.webapi import WebAPI, build_snapshot_dir, build_compress_opts
+from argo_connectors.metrics import TaskMetrics, instrumented
 from argo_connectors.parse.agora_topology import ParseAgoraTopo
-from argo_connectors.tasks.common import write_topo_json as write_json, write_state
+from argo_connectors.tasks.common import SinkPipeline, write_topo_json as write_json, write_state
 from argo_connectors.exceptions import ConnectorError, ConnectorHttpError
 
 
@@ -28,6 +29,7 @@ class TaskProviderTopology(object):
         self.uidservendp = uidservendp
         self.fixed_date = fixed_date
         self.fetchtype = fetchtype
+        self.metrics = TaskMetrics()
 
 
     def parse_source_topo(self, resources, providers):
@@ -44,14 +46,17 @@ class TaskProviderTopology(object):
                         int(self.globopts['ConnectionSleepRetry'.lower()]),
                         self.globopts['ConnectionRetryRandom'.lower()],
                         int(self.globopts['ConnectionSleepRandomRetryMax'.lower()]),
-                        date=fixed_date)
+                        date=fixed_date,
+                        snapshot_dir=build_snapshot_dir(self.globopts),
+                        **build_compress_opts(self.globopts))
 
         await webapi.send(data, topotype)
 
 
     async def fetch_data(self, feed):
         remote_topo = urlparse(feed)
-        session = SessionWithRetry(self.logger, self.logger.customer, self.globopts, handle_session_close=True)
+        session = SessionWithRetry(self.logger, self.logger.customer, self.globopts,
+                                   use_cache=True)
         headers = {
             "Accept": "application/json",
         }
@@ -63,6 +68,7 @@ class TaskProviderTopology(object):
                                                             headers=headers)
 
             await session.close()
+            self.metrics.fetched(res)
             return res
 
         except ConnectorHttpError as exc:
@@ -70,6 +76,7 @@ class TaskProviderTopology(object):
             raise exc
 
 
+    @instrumented
     async def run(self):
         topofeedproviders = self.confcust.get_topofeedservicegroups()
         topofeedresources = self.confcust.get_topofeedendpoints()
@@ -80,7 +87,8 @@ class TaskProviderTopology(object):
         ]
 
         # fetch topology data concurrently in coroutines
-        fetched_data = await asyncio.gather(*coros, return_exceptions=True)
+        with self.metrics.timer('fetch'):
+            fetched_data = await asyncio.gather(*coros, return_exceptions=True)
 
         exc_raised, exc = contains_exception(fetched_data)
         if exc_raised:
@@ -88,22 +96,26 @@ class TaskProviderTopology(object):
 
         fetched_resources, fetched_providers = fetched_data
         if fetched_resources and fetched_providers:
-            group_providers, group_resources = self.parse_source_topo(fetched_resources, fetched_providers)
-
-            await write_state(self.connector_name, self.globopts, self.confcust, self.fixed_date, True)
+            with self.metrics.timer('parse'):
+                group_providers, group_resources = self.parse_source_topo(fetched_resources, fetched_providers)
 
             numgg = len(group_providers)
             numge = len(group_resources)
+            self.metrics.add_records('group_endpoints', numge)
+            self.metrics.add_records('group_groups', numgg)
 
-            # send concurrently to WEB-API in coroutines
+            # state, WEB-API and JSON sinks consume topology concurrently
+            sinks = SinkPipeline(self.logger, self.loop, self.metrics)
+            sinks.add('state', write_state, self.connector_name, self.globopts,
+                      self.confcust, self.fixed_date, True)
             if eval(self.globopts['GeneralPublishWebAPI'.lower()]):
-                await asyncio.gather(
-                        self.send_webapi(self.webapi_opts, group_resources, 'endpoints', self.fixed_date),
-                        self.send_webapi(self.webapi_opts, group_providers, 'groups', self.fixed_date),
-                        loop=self.loop
-                )
-
+                sinks.add('webapi-endpoints', self.send_webapi, self.webapi_opts,
+                          group_resources, 'endpoints', self.fixed_date)
+                sinks.add('webapi-groups', self.send_webapi, self.webapi_opts,
+                          group_providers, 'groups', self.fixed_date)
             if eval(self.globopts['GeneralWriteJson'.lower()]):
-                write_json(self.logger, self.globopts, self.confcust, group_providers, group_resources, self.fixed_date)
+                sinks.add('json', write_json, self.logger, self.globopts, self.confcust,
+                          group_providers, group_resources, self.fixed_date, blocking=True)
+            await sinks.run()
 
             self.logger.info('Customer:' + self.logger.customer + ' Fetched Endpoints:%d' % (numge) + ' Groups(%s):%d' % (self.fetchtype, numgg))
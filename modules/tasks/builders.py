@@ -0,0 +1,111 @@
+from argo_connectors.exceptions import ConnectorError
+from argo_connectors.tasks.gocdb_downtimes import TaskGocdbDowntimes
+from argo_connectors.tasks.gocdb_servicetypes import TaskGocdbServiceTypes
+from argo_connectors.tasks.gocdb_topology import TaskGocdbTopology
+from argo_connectors.tasks.vapor_weights import TaskVaporWeights
+
+
+def get_auth_opts(cglob, confcust, feed=None, jobcust=None):
+    auth_custopts = confcust.get_authopts(feed, jobcust)
+    auth_opts = cglob.merge_opts(auth_custopts, 'authentication')
+    auth_complete, missing = cglob.is_complete(auth_opts, 'authentication')
+    if not auth_complete:
+        raise ConnectorError('%s options incomplete, missing %s' %
+                             ('authentication', ' '.join(missing)))
+    return auth_opts
+
+
+def get_webapi_opts(cglob, confcust):
+    webapi_custopts = confcust.get_webapiopts()
+    webapi_opts = cglob.merge_opts(webapi_custopts, 'webapi')
+    webapi_complete, missopt = cglob.is_complete(webapi_opts, 'webapi')
+    if not webapi_complete:
+        raise ConnectorError('%s options incomplete, missing %s' %
+                             ('webapi', ' '.join(missopt)))
+    return webapi_opts
+
+
+def get_bdii_opts(confcust):
+    bdii_custopts = confcust.get_bdiiopts()
+    if bdii_custopts:
+        bdii_complete, missing = confcust.is_complete_bdii(bdii_custopts)
+        if not bdii_complete:
+            raise ConnectorError('%s options incomplete, missing %s' %
+                                 ('bdii', ' '.join(missing)))
+        return bdii_custopts
+    else:
+        return None
+
+
+def get_topology_feeds(confcust):
+    """
+       Service endpoints, service groups and sites feeds with scope
+       appended. GOCDB explicitly says &scope='' for all scopes.
+    """
+    toposcope = confcust.get_toposcope()
+    feeds = [confcust.get_topofeedendpoints(),
+             confcust.get_topofeedservicegroups(),
+             confcust.get_topofeedsites()]
+    if toposcope:
+        feeds = [feed + toposcope for feed in feeds]
+    return feeds
+
+
+def build_topology_gocdb_task(loop, logger, connector, cglob, globopts,
+                              confcust, date, worker_pool):
+    auth_opts = get_auth_opts(cglob, confcust)
+    bdii_opts = get_bdii_opts(confcust)
+    webapi_opts = get_webapi_opts(cglob, confcust)
+    pass_extensions = eval(globopts['GeneralPassExtensions'.lower()])
+    SERVICE_ENDPOINTS_PI, SERVICE_GROUPS_PI, SITES_PI = get_topology_feeds(confcust)
+
+    return TaskGocdbTopology(
+        loop, logger, connector, SERVICE_ENDPOINTS_PI, SERVICE_GROUPS_PI,
+        SITES_PI, globopts, auth_opts, webapi_opts, bdii_opts, confcust,
+        confcust.get_custname(), confcust.get_topofeed(),
+        confcust.get_topofetchtype(), date, confcust.get_uidserviceendpoints(),
+        pass_extensions, confcust.get_topofeedpaging(),
+        confcust.get_notif_flag(), worker_pool
+    )
+
+
+def build_downtimes_gocdb_task(loop, logger, connector, cglob, globopts,
+                               confcust, start, end, date, timestamp):
+    auth_opts = get_auth_opts(cglob, confcust)
+    webapi_opts = get_webapi_opts(cglob, confcust)
+
+    return TaskGocdbDowntimes(
+        loop, logger, connector, globopts, auth_opts, webapi_opts, confcust,
+        confcust.get_custname(), confcust.get_downfeed(), start, end,
+        confcust.get_uidserviceendpoints(), date, timestamp
+    )
+
+
+def build_servicetypes_gocdb_task(loop, logger, connector, cglob, globopts,
+                                  confcust, date, initsync=False):
+    auth_opts = get_auth_opts(cglob, confcust)
+    webapi_opts = get_webapi_opts(cglob, confcust)
+
+    return TaskGocdbServiceTypes(
+        loop, logger, connector, globopts, auth_opts, webapi_opts, confcust,
+        confcust.get_custname(), confcust.get_servicesfeed(), date, initsync
+    )
+
+
+def get_feed_labels(confcust, jobcust):
+    """
+       Jobs and customers sharing one weights feed as labels for logger
+    """
+    customers = set(map(lambda jc: confcust.get_custname(jc[1]), jobcust))
+    customers = customers.pop() if len(
+        customers) == 1 else '({0})'.format(','.join(customers))
+    sjobs = set(map(lambda jc: jc[0], jobcust))
+    jobs = list(sjobs)[0] if len(
+        sjobs) == 1 else '({0})'.format(','.join(sjobs))
+    return jobs, customers
+
+
+def build_weights_vapor_task(loop, logger, connector, cglob, globopts,
+                             confcust, jobcust, date):
+    return TaskVaporWeights(loop, logger, connector, globopts, confcust,
+                            confcust.get_vaporpi(), jobcust, cglob, date)
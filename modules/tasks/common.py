@@ -1,6 +1,62 @@
+import asyncio
+import time
+
+from functools import partial
+
 from argo_connectors.io.statewrite import state_write
 from argo_connectors.utils import filename_date, datestamp, date_check
-from argo_connectors.io.jsonwrite import JsonWriter
+from argo_connectors.io.outputwrite import write_output
+
+
+class SinkPipeline(object):
+    """
+       Sinks consuming finished data of a task concurrently. Blocking sinks
+       like JSON writers run in a thread so they don't stall the event
+       loop. Failed sink doesn't stop the others, first failure is raised
+       once all of them are done. Time spent in every sink is also added
+       to task metrics if they are given.
+    """
+    def __init__(self, logger, loop=None, metrics=None):
+        self.logger = logger
+        self.loop = loop
+        self.metrics = metrics
+        self.sinks = list()
+        self.timings = dict()
+
+    def add(self, name, func, *args, blocking=False):
+        self.sinks.append((name, func, args, blocking))
+
+    async def _run_sink(self, name, func, args, blocking):
+        start = time.perf_counter()
+        try:
+            if blocking:
+                loop = self.loop or asyncio.get_event_loop()
+                await loop.run_in_executor(None, partial(func, *args))
+            else:
+                await func(*args)
+
+        # JSON writers exit on failure
+        except (Exception, SystemExit) as exc:
+            self.logger.error('Customer:%s Sink %s failed - %s' %
+                              (self.logger.customer, name, repr(exc)))
+            return exc
+
+        finally:
+            self.timings[name] = time.perf_counter() - start
+            if self.metrics:
+                self.metrics.add_time(name, self.timings[name])
+
+    async def run(self):
+        if not self.sinks:
+            return
+
+        results = await asyncio.gather(*[self._run_sink(*sink) for sink in self.sinks])
+        self.logger.info('Customer:%s Sinks %s' % (self.logger.customer, ' '.join(
+            ['%s:%.3fs' % (name, self.timings[name]) for name, _, _, _ in self.sinks])))
+
+        for exc in results:
+            if exc is not None:
+                raise exc
 
 
 async def write_state(connector_name, globopts, confcust, fixed_date, state):
@@ -36,8 +92,7 @@ def write_metricprofile_json(logger, globopts, cust, job, confcust, fixed_date,
     else:
         filename = filename_date(
             logger, globopts['OutputMetricProfile'.lower()], jobdir)
-    json_writer = JsonWriter(fetched_profiles, filename, globopts['generalcompressjson'])
-    ret, excep = json_writer.write_json()
+    ret, excep = write_output(fetched_profiles, filename, 'metric_profiles', globopts)
     if not ret:
         logger.error('Customer:%s Job:%s %s' %
                      (logger.customer, logger.job, repr(excep)))
@@ -48,8 +103,7 @@ def write_downtimes_json(logger, globopts, confcust, dts, timestamp):
     custdir = confcust.get_custdir()
     filename = filename_date(
         logger, globopts['OutputDowntimes'.lower()], custdir, stamp=timestamp)
-    json_writer = JsonWriter(dts, filename, globopts['generalcompressjson'])
-    ret, excep = json_writer.write_json()
+    ret, excep = write_output(dts, filename, 'downtimes', globopts)
     if not ret:
         logger.error('Customer:{} {}'.format(logger.customer, repr(excep)))
         raise SystemExit(1)
@@ -64,8 +118,7 @@ def write_weights_json(logger, globopts, cust, job, confcust, fixed_date, weight
         filename = filename_date(
             logger, globopts['OutputWeights'.lower()], jobdir)
 
-    json_writer = JsonWriter(weights, filename, globopts['generalcompressjson'])
-    ret, excep = json_writer.write_json()
+    ret, excep = write_output(weights, filename, 'weights', globopts)
     if not ret:
         logger.error('Customer:%s Job:%s %s' %
                      (logger.customer, logger.job, repr(excep)))
@@ -80,8 +133,7 @@ def write_topo_json(logger, globopts, confcust, group_groups, group_endpoints, f
     else:
         filename = filename_date(
             logger, globopts['OutputTopologyGroupOfGroups'.lower()], custdir)
-    json_writer = JsonWriter(group_groups, filename, globopts['generalcompressjson'])
-    ret, excep = json_writer.write_json()
+    ret, excep = write_output(group_groups, filename, 'group_groups', globopts)
     if not ret:
         logger.error('Customer:%s : %s' % (logger.customer, repr(excep)))
         raise SystemExit(1)
@@ -92,8 +144,7 @@ def write_topo_json(logger, globopts, confcust, group_groups, group_endpoints, f
     else:
         filename = filename_date(
             logger, globopts['OutputTopologyGroupOfEndpoints'.lower()], custdir)
-    json_writer = JsonWriter(group_endpoints, filename, globopts['generalcompressjson'])
-    ret, excep = json_writer.write_json()
+    ret, excep = write_output(group_endpoints, filename, 'group_endpoints', globopts)
     if not ret:
         logger.error('Customer:%s : %s' % (logger.customer, repr(excep)))
         raise SystemExit(1)
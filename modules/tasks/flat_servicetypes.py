@@ -6,8 +6,9 @@ from urllib.parse import urlparse
 from argo_connectors.io.http import SessionWithRetry
 from argo_connectors.parse.flat_servicetypes import ParseFlatServiceTypes
 from argo_connectors.parse.webapi_servicetypes import ParseWebApiServiceTypes
-from argo_connectors.io.webapi import WebAPI
-from argo_connectors.tasks.common import write_state, write_downtimes_json as write_json
+from argo_connectors.io.webapi import WebAPI, build_snapshot_dir, build_compress_opts
+from argo_connectors.metrics import TaskMetrics, instrumented
+from argo_connectors.tasks.common import SinkPipeline, write_state, write_downtimes_json as write_json
 from argo_connectors.exceptions import ConnectorHttpError, ConnectorParseError, ConnectorError
 
 
@@ -35,17 +36,20 @@ class TaskFlatServiceTypes(object):
         self.timestamp = timestamp
         self.is_csv = is_csv
         self.initsync = initsync
+        self.metrics = TaskMetrics()
 
     async def fetch_data(self):
         feed_parts = urlparse(self.feed)
         session = SessionWithRetry(self.logger,
                                    os.path.basename(self.connector_name),
-                                   self.globopts, custauth=self.auth_opts)
+                                   self.globopts, custauth=self.auth_opts,
+                                   use_cache=True)
         res = await session.http_get('{}://{}{}?{}'.format(feed_parts.scheme,
                                                            feed_parts.netloc,
                                                            feed_parts.path,
                                                            feed_parts.query))
 
+        self.metrics.fetched(res)
         return res
 
     async def fetch_webapi(self):
@@ -67,7 +71,9 @@ class TaskFlatServiceTypes(object):
                         int(self.globopts['ConnectionSleepRetry'.lower()]),
                         self.globopts['ConnectionRetryRandom'.lower()],
                         int(self.globopts['ConnectionSleepRandomRetryMax'.lower()]),
-                        date=self.timestamp)
+                        date=self.timestamp,
+                        snapshot_dir=build_snapshot_dir(self.globopts),
+                        **build_compress_opts(self.globopts))
         await webapi.send(data, 'service-types')
 
     def parse_webapi_poem(self, res):
@@ -78,6 +84,7 @@ class TaskFlatServiceTypes(object):
         flat_servtypes = ParseFlatServiceTypes(self.logger, res, self.is_csv)
         return flat_servtypes.get_data()
 
+    @instrumented
     async def run(self):
         try:
             coros = [self.fetch_data()]
@@ -85,7 +92,8 @@ class TaskFlatServiceTypes(object):
             if not self.initsync:
                 coros.append(self.fetch_webapi())
 
-            fetched_data = await asyncio.gather(*coros, loop=self.loop, return_exceptions=True)
+            with self.metrics.timer('fetch'):
+                fetched_data = await asyncio.gather(*coros, loop=self.loop, return_exceptions=True)
 
             exc_raised, exc = contains_exception(fetched_data)
             if exc_raised:
@@ -97,19 +105,24 @@ class TaskFlatServiceTypes(object):
                 res = fetched_data[0]
 
             # small set data, parsing sequentially
-            service_types = self.parse_source(res)
-            if not self.initsync:
-                service_types_poem = self.parse_webapi_poem(res_webapi)
-                service_types = service_types + service_types_poem
-                service_types = sorted(service_types,  key=lambda s: s['name'].lower())
-
-            await write_state(self.connector_name, self.globopts, self.confcust, self.timestamp, True)
-
+            with self.metrics.timer('parse'):
+                service_types = self.parse_source(res)
+                if not self.initsync:
+                    service_types_poem = self.parse_webapi_poem(res_webapi)
+                    service_types = service_types + service_types_poem
+                    service_types = sorted(service_types,  key=lambda s: s['name'].lower())
+            self.metrics.add_records('service_types', len(service_types))
+
+            sinks = SinkPipeline(self.logger, self.loop, self.metrics)
+            sinks.add('state', write_state, self.connector_name, self.globopts,
+                      self.confcust, self.timestamp, True)
             if eval(self.globopts['GeneralPublishWebAPI'.lower()]):
-                await self.send_webapi(service_types)
+                sinks.add('webapi', self.send_webapi, service_types)
+            await sinks.run()
 
             self.logger.info('Customer:' + self.custname + ' Fetched Flat ServiceTypes:%d' % (len(service_types)))
 
         except (ConnectorError, ConnectorHttpError, ConnectorParseError, KeyboardInterrupt) as exc:
             self.logger.error(repr(exc))
+            self.metrics.count('failures')
             await write_state(self.connector_name, self.globopts, self.confcust, self.timestamp, False)
@@ -4,11 +4,13 @@ import asyncio
 from urllib.parse import urlparse
 
 from argo_connectors.io.http import SessionWithRetry
+from argo_connectors.io.parsecache import build_parse_cache
 from argo_connectors.parse.flat_topology import ParseFlatEndpoints
 from argo_connectors.parse.flat_contacts import ParseContacts
-from argo_connectors.io.webapi import WebAPI
+from argo_connectors.io.webapi import WebAPI, build_snapshot_dir, build_compress_opts
 from argo_connectors.mesh.contacts import attach_contacts_topodata
-from argo_connectors.tasks.common import write_state, write_topo_json as write_json
+from argo_connectors.metrics import TaskMetrics, instrumented
+from argo_connectors.tasks.common import SinkPipeline, write_state, write_topo_json as write_json
 
 
 class TaskFlatTopology(object):
@@ -27,6 +29,7 @@ class TaskFlatTopology(object):
         self.fixed_date = fixed_date
         self.uidservendp = uidservendp
         self.is_csv = is_csv
+        self.metrics = TaskMetrics()
 
     def _is_feed(self, feed):
         data = urlparse(feed)
@@ -38,7 +41,8 @@ class TaskFlatTopology(object):
 
     async def fetch_data(self):
         remote_topo = urlparse(self.topofeed)
-        session = SessionWithRetry(self.logger, self.custname, self.globopts)
+        session = SessionWithRetry(self.logger, self.custname, self.globopts,
+                                   use_cache=True)
         if remote_topo.query:
             res = await \
             session.http_get('{}://{}{}?{}'.format(remote_topo.scheme,
@@ -49,6 +53,7 @@ class TaskFlatTopology(object):
             res = await session.http_get('{}://{}{}'.format(remote_topo.scheme,
                                                             remote_topo.netloc,
                                                             remote_topo.path))
+        self.metrics.fetched(res)
         return res
 
     def parse_source_topo(self, res):
@@ -68,37 +73,61 @@ class TaskFlatTopology(object):
                         int(self.globopts['ConnectionSleepRetry'.lower()]),
                         self.globopts['ConnectionRetryRandom'.lower()],
                         int(self.globopts['ConnectionSleepRandomRetryMax'.lower()]),
-                        date=self.fixed_date)
+                        date=self.fixed_date,
+                        snapshot_dir=build_snapshot_dir(self.globopts),
+                        **build_compress_opts(self.globopts))
         await webapi.send(data, topotype)
 
+    @instrumented
     async def run(self):
         if self._is_feed(self.topofeed):
-            res = await self.fetch_data()
-            group_groups, group_endpoints = self.parse_source_topo(res)
-            contacts = ParseContacts(self.logger, res, self.uidservendp, self.is_csv).get_contacts()
-            attach_contacts_topodata(self.logger, contacts, group_endpoints)
+            with self.metrics.timer('fetch'):
+                res = await self.fetch_data()
+            parse_cache = build_parse_cache(self.globopts)
+            parsed = None
+            if parse_cache:
+                cache_key = parse_cache.key([res], self.custname,
+                                            self.uidservendp, self.fetchtype,
+                                            self.is_csv)
+                parsed = parse_cache.load(cache_key)
+
+            if parsed:
+                group_groups, group_endpoints = parsed
+                self.metrics.count('parse_cache_hits')
+            else:
+                with self.metrics.timer('parse'):
+                    group_groups, group_endpoints = self.parse_source_topo(res)
+                    contacts = ParseContacts(self.logger, res, self.uidservendp, self.is_csv).get_contacts()
+                with self.metrics.timer('mesh'):
+                    attach_contacts_topodata(self.logger, contacts, group_endpoints)
+                if parse_cache:
+                    parse_cache.store(cache_key, (group_groups, group_endpoints))
 
         elif not self._is_feed(self.topofeed) and not self.is_csv:
             try:
                 with open(self.topofeed) as fp:
                     js = json.load(fp)
-                    group_groups, group_endpoints = self.parse_source_topo(js)
+                    with self.metrics.timer('parse'):
+                        group_groups, group_endpoints = self.parse_source_topo(js)
             except IOError as exc:
                 self.logger.error('Customer:%s : Problem opening %s - %s' % (self.logger.customer, self.topofeed, repr(exc)))
-
-        await write_state(self.connector_name, self.globopts, self.confcust, self.fixed_date, True)
+                self.metrics.count('failures')
 
         numge = len(group_endpoints)
         numgg = len(group_groups)
+        self.metrics.add_records('group_endpoints', numge)
+        self.metrics.add_records('group_groups', numgg)
 
-        # send concurrently to WEB-API in coroutines
+        # state, WEB-API and JSON sinks consume topology concurrently
+        sinks = SinkPipeline(self.logger, metrics=self.metrics)
+        sinks.add('state', write_state, self.connector_name, self.globopts,
+                  self.confcust, self.fixed_date, True)
         if eval(self.globopts['GeneralPublishWebAPI'.lower()]):
-            await asyncio.gather(
-                self.send_webapi(group_groups, 'groups'),
-                self.send_webapi(group_endpoints,'endpoints')
-            )
-
+            sinks.add('webapi-groups', self.send_webapi, group_groups, 'groups')
+            sinks.add('webapi-endpoints', self.send_webapi, group_endpoints, 'endpoints')
         if eval(self.globopts['GeneralWriteJson'.lower()]):
-            write_json(self.logger, self.globopts, self.confcust, group_groups, group_endpoints, self.fixed_date)
+            sinks.add('json', write_json, self.logger, self.globopts, self.confcust,
+                      group_groups, group_endpoints, self.fixed_date, blocking=True)
+        await sinks.run()
 
         self.logger.info('Customer:' + self.custname + ' Fetched Endpoints:%d' % (numge) + ' Groups(%s):%d' % (self.fetchtype, numgg))
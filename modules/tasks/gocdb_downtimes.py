@@ -1,11 +1,14 @@
+import asyncio
 import os
 
 from urllib.parse import urlparse
 
 from argo_connectors.io.http import SessionWithRetry
 from argo_connectors.parse.gocdb_downtimes import ParseDowntimes
-from argo_connectors.io.webapi import WebAPI
-from argo_connectors.tasks.common import write_state, write_downtimes_json as write_json
+from argo_connectors.io.webapi import WebAPI, build_snapshot_dir, build_compress_opts
+from argo_connectors.metrics import TaskMetrics, instrumented
+from argo_connectors.tasks.common import SinkPipeline, write_state, write_downtimes_json as write_json
+from argo_connectors.utils import window_days
 
 
 class TaskGocdbDowntimes(object):
@@ -26,6 +29,7 @@ class TaskGocdbDowntimes(object):
         self.uidservtype = uidservtype
         self.targetdate = targetdate
         self.timestamp = timestamp
+        self.metrics = TaskMetrics()
 
     async def fetch_data(self):
         feed_parts = urlparse(self.feed)
@@ -49,16 +53,25 @@ class TaskGocdbDowntimes(object):
                                                            feed_parts.netloc,
                                                            feed_parts.path,
                                                            start_fmt, end_fmt)
-        res = await session.http_get(query_url)
+        # body is kept as received chunks that parser is fed with
+        res = list()
+        async for chunk in session.http_get_stream(query_url):
+            res.append(chunk)
+        self.metrics.fetched(res)
 
-        return res
+        return res or None
+
+    def is_backfill(self):
+        return self.start.date() != self.end.date()
 
     def parse_source(self, res):
         gocdb = ParseDowntimes(self.logger, res, self.start, self.end,
                                self.uidservtype)
+        if self.is_backfill():
+            return gocdb.get_data_per_day()
         return gocdb.get_data()
 
-    async def send_webapi(self, dts):
+    async def send_webapi(self, dts, targetdate=None):
         webapi = WebAPI(self.connector_name, self.webapi_opts['webapihost'],
                         self.webapi_opts['webapitoken'], self.logger,
                         int(self.globopts['ConnectionRetry'.lower()]),
@@ -66,28 +79,73 @@ class TaskGocdbDowntimes(object):
                         int(self.globopts['ConnectionSleepRetry'.lower()]),
                         self.globopts['ConnectionRetryRandom'.lower()],
                         int(self.globopts['ConnectionSleepRandomRetryMax'.lower()]),
-                        date=self.targetdate)
+                        date=targetdate or self.targetdate,
+                        snapshot_dir=build_snapshot_dir(self.globopts),
+                        **build_compress_opts(self.globopts))
         await webapi.send(dts, downtimes_component=True)
 
+    async def publish(self, dts, targetdate, timestamp, write_empty, state=True):
+        self.metrics.add_records('downtimes', len(dts))
+        sinks = SinkPipeline(self.logger, metrics=self.metrics)
+        if state:
+            sinks.add('state', write_state, self.connector_name, self.globopts,
+                      self.confcust, timestamp, True)
+        if eval(self.globopts['GeneralPublishWebAPI'.lower()]):
+            sinks.add('webapi', self.send_webapi, dts, targetdate)
+        if eval(self.globopts['GeneralWriteJson'.lower()]):
+            sinks.add('json', write_json, self.logger, self.globopts,
+                      self.confcust, dts, timestamp, blocking=True)
+        await sinks.run()
+
+        if dts or write_empty:
+            cust = list(self.confcust.get_customers())[0]
+            self.logger.info('Customer:%s Fetched Date:%s Endpoints:%d' %
+                        (self.confcust.get_custname(cust), targetdate, len(dts)))
+
+    async def publish_day(self, dts, day, write_empty):
+        """
+           Publish one day of backfill window and write its state from
+           the outcome of that day only. Failure is returned, not raised,
+           so the other days are not cut short.
+        """
+        timestamp = day.replace('-', '_')
+        try:
+            await self.publish(dts, day, timestamp, write_empty, state=False)
+            exc = None
+
+        # JSON writers exit on failure
+        except (Exception, SystemExit) as e:
+            exc = e
+
+        with self.metrics.timer('state'):
+            await write_state(self.connector_name, self.globopts,
+                              self.confcust, timestamp, exc is None)
+        return exc
+
+    @instrumented
     async def run(self):
         # we don't have multiple tenant definitions in one
         # customer file so we can safely assume one tenant/customer
         write_empty = self.confcust.send_empty(self.connector_name)
         if not write_empty:
-            res = await self.fetch_data()
-            dts = self.parse_source(res)
+            with self.metrics.timer('fetch'):
+                res = await self.fetch_data()
+            with self.metrics.timer('parse'):
+                dts = self.parse_source(res)
+        elif self.is_backfill():
+            dts = window_days(self.start, self.end)
         else:
             dts = []
 
-        await write_state(self.connector_name, self.globopts, self.confcust, self.timestamp, True)
-
-        if eval(self.globopts['GeneralPublishWebAPI'.lower()]):
-            await self.send_webapi(dts)
-
-        if dts or write_empty:
-            cust = list(self.confcust.get_customers())[0]
-            self.logger.info('Customer:%s Fetched Date:%s Endpoints:%d' %
-                        (self.confcust.get_custname(cust), self.targetdate, len(dts)))
-
-        if eval(self.globopts['GeneralWriteJson'.lower()]):
-            write_json(self.logger, self.globopts, self.confcust, dts, self.timestamp)
+        if self.is_backfill():
+            # whole window is fetched once and every day is written and
+            # sent on its own
+            results = await asyncio.gather(*[
+                self.publish_day(day_dts, day, write_empty)
+                for day, day_dts in dts.items()
+            ], return_exceptions=True)
+            for exc in results:
+                if exc is not None:
+                    raise exc
+        else:
+            await self.publish(dts, self.targetdate, self.timestamp, write_empty)
@@ -5,21 +5,24 @@ from lxml import etree
 from collections import Callable
 from urllib.parse import urlparse
 
-from concurrent.futures import ProcessPoolExecutor
 from functools import partial
 
 from argo_connectors.parse.gocdb_topology import ParseServiceGroups, ParseServiceEndpoints, ParseSites
-from argo_connectors.parse.gocdb_contacts import ParseServiceEndpointContacts, ParseSitesWithContacts, ParseServiceGroupWithContacts
+from argo_connectors.parse.gocdb_contacts import ParseServiceEndpointContacts
 from argo_connectors.exceptions import ConnectorError, ConnectorParseError, ConnectorHttpError
 from argo_connectors.io.http import SessionWithRetry
 from argo_connectors.io.ldap import LDAPSessionWithRetry
+from argo_connectors.io.ldapcache import SNAPSHOT_BATCH, build_ldap_cache
+from argo_connectors.io.parsecache import build_parse_cache
 from argo_connectors.io.statewrite import state_write
-from argo_connectors.io.webapi import WebAPI
+from argo_connectors.io.webapi import WebAPI, build_snapshot_dir, build_compress_opts
 from argo_connectors.mesh.contacts import attach_contacts_topodata
-from argo_connectors.mesh.srm_port import attach_srmport_topodata
-from argo_connectors.mesh.storage_element_path import attach_sepath_topodata
-from argo_connectors.tasks.common import write_state, write_topo_json as write_json
-from argo_connectors.parse.base import ParseHelpers
+from argo_connectors.mesh.srm_port import SrmPortMap, attach_srmport_topodata
+from argo_connectors.mesh.storage_element_path import EndpointPathMap, attach_sepath_topodata
+from argo_connectors.metrics import TaskMetrics, instrumented
+from argo_connectors.tasks.common import SinkPipeline, write_state, write_topo_json as write_json
+from argo_connectors.parse.base import ParseHelpers, XMLPages
+from argo_connectors.workers import SpooledPages, build_worker_pool, worker_logger
 
 
 def contains_exception(list):
@@ -30,33 +33,10 @@ def contains_exception(list):
     return (False, None)
 
 
-def filter_multiple_tags(data):
-    """
-        Paginated content is represented with multiple XML enclosing tags
-        in a single buffer:
-
-        <?xml version="1.0" encoding="UTF-8"?>
-        <results>
-            topology entities
-        </results>
-        <?xml version="1.0" encoding="UTF-8"?>
-        <results>
-            topology entities
-        </results>
-        ...
-
-        Remove them and leave only one enclosing.
-    """
-    data_lines = data.split('\n')
-    data_lines = list(filter(lambda line:
-                             '</results>' not in line
-                             and '<results>' not in line
-                             and '<?xml' not in line,
-                             data_lines))
-    data_lines.insert(0, '<?xml version="1.0" encoding="UTF-8"?>')
-    data_lines.insert(1, '<results>')
-    data_lines.append('</results>')
-    return '\n'.join(data_lines)
+def discard_spooled(*fetched):
+    for data in fetched:
+        if isinstance(data, SpooledPages):
+            data.discard()
 
 
 class find_next_paging_cursor_count(ParseHelpers, Callable):
@@ -69,26 +49,39 @@ class find_next_paging_cursor_count(ParseHelpers, Callable):
             return self._parse()
         except ConnectorParseError as exc:
             self.logger.error(repr(exc))
+            res = self.res
+            if isinstance(res, bytes):
+                res = res.decode('utf-8', 'replace')
             self.logger.error("Tried to parse (512 chars): %.512s" % ''.join(
-                self.res.replace('\r\n', '').replace('\n', '')))
+                res.replace('\r\n', '').replace('\n', '')))
             raise ConnectorParseError(exc)
 
     def _parse(self):
+        """
+            Paging information is placed in <meta> at the top of the page so
+            scan the page only until <meta> is closed and skip the rest.
+        """
         cursor, count = None, None
 
         doc = self.parse_xml(self.res)
-        xml_bytes = doc.encode("utf-8")
-        sites = etree.fromstring(xml_bytes)
+        parser = etree.XMLPullParser(events=('end',), tag=('count', 'link', 'meta'))
 
-        for cnt in sites.xpath('.//count'):
-            count = int(cnt.text)
+        for chunk in self._xml_chunks(doc):
+            parser.feed(chunk)
+            for _, element in parser.read_events():
+                if element.tag == 'count':
+                    count = int(element.text)
 
-        for lnk in sites.xpath('.//link'):
-            if lnk.attrib["rel"] == "next":
-                href = lnk.attrib["href"]
-                for query in href.split('&'):
-                    if 'next_cursor' in query:
-                        cursor = query.split('=')[1]
+                elif element.tag == 'link' and element.attrib["rel"] == "next":
+                    href = element.attrib["href"]
+                    for query in href.split('&'):
+                        if 'next_cursor' in query:
+                            cursor = query.split('=')[1]
+
+                elif element.tag == 'meta':
+                    return count, cursor
+
+        parser.close()
 
         return count, cursor
 
@@ -103,82 +96,66 @@ class TaskParseTopology(object):
         self.notification_flag = notiflag
 
     def parse_source_servicegroups(self, res):
-        group_groups = ParseServiceGroups(self.logger, res, self.custname,
-                                          self.uidservendp,
-                                          self.pass_extensions,
-                                          self.notification_flag).get_group_groups()
-        group_endpoints = ParseServiceGroups(self.logger, res, self.custname,
-                                             self.uidservendp,
-                                             self.pass_extensions,
-                                             self.notification_flag).get_group_endpoints()
+        servicegroups = ParseServiceGroups(self.logger, res, self.custname,
+                                           self.uidservendp,
+                                           self.pass_extensions,
+                                           self.notification_flag)
 
-        return group_groups, group_endpoints
+        return servicegroups.get_group_groups(), servicegroups.get_group_endpoints(), servicegroups.get_contacts()
 
     def parse_source_endpoints(self, res):
-        group_endpoints = ParseServiceEndpoints(self.logger, res, self.custname, self.uidservendp,
-                                                self.pass_extensions,
-                                                self.notification_flag).get_group_endpoints()
+        endpoints = ParseServiceEndpoints(self.logger, res, self.custname,
+                                          self.uidservendp,
+                                          self.pass_extensions,
+                                          self.notification_flag)
 
-        return group_endpoints
+        return endpoints.get_group_endpoints(), endpoints.get_contacts()
 
     def parse_source_sites(self, res):
-        group_groups = ParseSites(self.logger, res, self.custname,
-                                  self.uidservendp,
-                                  self.pass_extensions,
-                                  self.notification_flag).get_group_groups()
+        sites = ParseSites(self.logger, res, self.custname,
+                           self.uidservendp,
+                           self.pass_extensions,
+                           self.notification_flag)
 
-        return group_groups
+        return sites.get_group_groups(), sites.get_contacts()
 
 
 # basic function wrappers used because to avoid class TaskParseTopology pickle
-# in ProcessPoolExecutor
-def parse_endpoints(logger, custname, uidservendp, pass_extensions,
+# in worker pool. only plain values are pickled, logger is built in worker
+def parse_endpoints(connector, customer, custname, uidservendp, pass_extensions,
                     notification_flag, data):
-    task = TaskParseTopology(logger, custname, uidservendp, pass_extensions,
-                             notification_flag)
+    task = TaskParseTopology(worker_logger(connector, customer), custname,
+                             uidservendp, pass_extensions, notification_flag)
     return task.parse_source_endpoints(data)
 
 
-def parse_sites(logger, custname, uidservendp, pass_extensions,
+def parse_sites(connector, customer, custname, uidservendp, pass_extensions,
                 notification_flag, data):
-    task = TaskParseTopology(
-        logger, custname, uidservendp, pass_extensions, notification_flag)
+    task = TaskParseTopology(worker_logger(connector, customer), custname,
+                             uidservendp, pass_extensions, notification_flag)
     return task.parse_source_sites(data)
 
 
-def parse_servicegroups(logger, custname, uidservendp, pass_extensions,
-                        notification_flag, data):
-    task = TaskParseTopology(logger, custname, uidservendp, pass_extensions,
-                             notification_flag)
+def parse_servicegroups(connector, customer, custname, uidservendp,
+                        pass_extensions, notification_flag, data):
+    task = TaskParseTopology(worker_logger(connector, customer), custname,
+                             uidservendp, pass_extensions, notification_flag)
     return task.parse_source_servicegroups(data)
 
 
-class TaskParseContacts(object):
-    def __init__(self, logger):
-        self.logger = logger
-
-    def parse_siteswith_contacts(self, res):
-        contacts = ParseSitesWithContacts(self.logger, res)
-        return contacts.get_contacts()
-
-    def parse_servicegroups_contacts(self, res):
-        contacts = ParseServiceGroupWithContacts(self.logger, res)
-        return contacts.get_contacts()
+def parse_endpoint_contacts(connector, customer, data):
+    return ParseServiceEndpointContacts(worker_logger(connector, customer),
+                                        data).get_contacts()
 
-    def parse_serviceendpoints_contacts(self, res):
-        contacts = ParseServiceEndpointContacts(self.logger, res)
-        return contacts.get_contacts()
 
-
-class TaskGocdbTopology(TaskParseContacts, TaskParseTopology):
+class TaskGocdbTopology(TaskParseTopology):
     def __init__(self, loop, logger, connector_name, SERVICE_ENDPOINTS_PI,
                  SERVICE_GROUPS_PI, SITES_PI, globopts, auth_opts, webapi_opts,
                  bdii_opts, confcust, custname, topofeed, topofetchtype,
                  fixed_date, uidservendp, pass_extensions, topofeedpaging,
-                 notiflag):
+                 notiflag, worker_pool=None):
         TaskParseTopology.__init__(self, logger, custname, uidservendp,
                                    pass_extensions, notiflag)
-        super(TaskGocdbTopology, self).__init__(logger)
         self.loop = loop
         self.logger = logger
         self.connector_name = connector_name
@@ -198,46 +175,215 @@ class TaskGocdbTopology(TaskParseContacts, TaskParseTopology):
         self.pass_extensions = pass_extensions
         self.topofeedpaging = topofeedpaging
         self.notification_flag = notiflag
+        self.worker_pool = worker_pool
+        self.bdii_refresh = None
+        self.metrics = TaskMetrics()
+
+    def ldap_session(self):
+        return LDAPSessionWithRetry(self.logger, int(self.globopts['ConnectionRetry'.lower()]),
+                                    int(self.globopts['ConnectionSleepRetry'.lower()]), int(self.globopts['ConnectionTimeout'.lower()]))
+
+    async def fetch_ldap_data(self, ldap_session, host, port, base, filter,
+                              attributes, ldapmap, ldap_cache=None):
+        """
+            Entries are mapped as they stream in and with snapshot cache
+            also written out in batches in executor, so neither snapshot
+            encoding nor write blocks the loop
+        """
+        writer, batch, pending = None, list(), None
+        if ldap_cache:
+            writer = await self.loop.run_in_executor(
+                None, ldap_cache.writer,
+                ldap_cache.key(host, port, base, filter, attributes))
+
+        try:
+            async for entry in ldap_session.search_iter(host, port, base, filter,
+                                                        attributes):
+                self.metrics.count('bdii_entries')
+                if ldapmap is not None:
+                    ldapmap.add(entry)
+                if writer:
+                    batch.append(entry)
+                    if len(batch) >= SNAPSHOT_BATCH:
+                        if pending:
+                            await pending
+                        pending = self.loop.run_in_executor(None, writer.write, batch)
+                        batch = list()
+
+            if writer:
+                if pending:
+                    await pending
+                await self.loop.run_in_executor(None, writer.write, batch)
+                await self.loop.run_in_executor(None, writer.close)
+
+        except BaseException:
+            if writer:
+                if pending:
+                    await asyncio.wait([pending])
+                writer.abort()
+            raise
+
+        return ldapmap
+
+    async def refresh_bdii(self, queries, ldap_cache):
+        """
+            Refresh stale BDII snapshots, on failure old ones are kept
+        """
+        ldap_session = self.ldap_session()
+        try:
+            refreshed = await asyncio.gather(
+                *[self.fetch_ldap_data(ldap_session, *query, None, ldap_cache)
+                  for query in queries],
+                loop=self.loop, return_exceptions=True
+            )
+        finally:
+            ldap_session.close()
 
-    async def fetch_ldap_data(self, host, port, base, filter, attributes):
-        ldap_session = LDAPSessionWithRetry(self.logger, int(self.globopts['ConnectionRetry'.lower()]),
-                                            int(self.globopts['ConnectionSleepRetry'.lower()]), int(self.globopts['ConnectionTimeout'.lower()]))
+        exc_raised, exc = contains_exception(refreshed)
+        if exc_raised:
+            self.logger.warn('Customer:%s BDII snapshot refresh failed: %s' %
+                             (self.logger.customer, repr(exc)))
+
+    async def finish_bdii_refresh(self, cancel=False):
+        """
+            Give refresh of stale BDII snapshots at most connection timeout
+            to complete, cancel it right away if run failed
+        """
+        refresh, self.bdii_refresh = self.bdii_refresh, None
+        if not refresh:
+            return
+
+        if cancel:
+            refresh.cancel()
+        done, pending = await asyncio.wait([refresh],
+            timeout=int(self.globopts['ConnectionTimeout'.lower()]))
+        if pending:
+            self.logger.warn('Customer:%s BDII snapshot refresh timed out' %
+                             self.logger.customer)
+            refresh.cancel()
+            await asyncio.wait([refresh])
+        if not refresh.cancelled() and refresh.exception():
+            self.logger.warn('Customer:%s BDII snapshot refresh failed: %s' %
+                             (self.logger.customer, repr(refresh.exception())))
+
+    async def fetch_bdii(self):
+        """
+            SRM ports and SE paths queried over one LDAP connection with
+            entries mapped as they stream in or replayed from snapshot
+        """
+        host = self.bdii_opts['bdiihost']
+        port = self.bdii_opts['bdiiport']
+        base = self.bdii_opts['bdiiquerybase']
+        attrs_srm = self.bdii_opts['bdiiqueryattributessrm'].split(' ')
+        attrs_sepath = self.bdii_opts['bdiiqueryattributessepath'].split(' ')
+        queries = [
+            (host, port, base, self.bdii_opts['bdiiqueryfiltersrm'], attrs_srm),
+            (host, port, base, self.bdii_opts['bdiiqueryfiltersepath'], attrs_sepath)
+        ]
+        ldapmaps = [SrmPortMap(self.logger, attrs_srm[0]),
+                    EndpointPathMap(self.logger)]
+
+        ldap_cache = build_ldap_cache(self.globopts)
+        coros, stale = list(), list()
+        ldap_session = self.ldap_session()
+        for query, ldapmap in zip(queries, ldapmaps):
+            snapshot = None
+            if ldap_cache:
+                snapshot = await self.loop.run_in_executor(
+                    None, ldap_cache.lookup, ldap_cache.key(*query))
+            if snapshot:
+                entries, fresh = snapshot
+                for entry in entries:
+                    ldapmap.add(entry)
+                if not fresh:
+                    stale.append(query)
+                coros.append(asyncio.sleep(0, result=ldapmap))
+            else:
+                coros.append(self.fetch_ldap_data(ldap_session, *query, ldapmap,
+                                                  ldap_cache))
+
+        # stale snapshot is used right away and refreshed while the rest
+        # of topology is processed
+        if stale:
+            self.logger.info('Customer:%s Refreshing %d stale BDII snapshots' %
+                             (self.logger.customer, len(stale)))
+            self.bdii_refresh = asyncio.ensure_future(
+                self.refresh_bdii(stale, ldap_cache), loop=self.loop)
 
-        res = await ldap_session.search(host, port, base, filter, attributes)
-        return res
+        try:
+            with self.metrics.timer('bdii'):
+                return await asyncio.gather(*coros, loop=self.loop,
+                                            return_exceptions=True)
+        finally:
+            ldap_session.close()
+
+    def spools_feed(self, api):
+        """
+            Whether paginated feed is handed over to worker pool page by page
+            while fetched. Not if parse cache is enabled as feed might not
+            need to be parsed then, or if feed is not parsed at all.
+        """
+        if build_parse_cache(self.globopts):
+            return False
+
+        if api == self.SERVICE_ENDPOINTS_PI:
+            return 'sites' in self.topofetchtype
+        return api in (self.SERVICE_GROUPS_PI, self.SITES_PI)
+
+    async def fetch_pages(self, session, api, worker_pool=None):
+        """
+            Fetch pages one after another. With worker pool, pages of large
+            feed are written out for worker process as they arrive.
+        """
+        fetched_data = SpooledPages() if worker_pool else XMLPages()
+        count, cursor = 1, 0
+        fetch = asyncio.ensure_future(
+            session.http_get_bytes('{}&next_cursor={}'.format(api, cursor))
+        )
 
-    async def fetch_data(self, api):
-        feed_parts = urlparse(api)
-        fetched_data = list()
-        if self.topofeedpaging:
-            count, cursor = 1, 0
-            while count != 0:
-                session = SessionWithRetry(self.logger,
-                                           os.path.basename(
-                                               self.connector_name),
-                                           self.globopts,
-                                           custauth=self.auth_opts)
-                res = await session.http_get('{}&next_cursor={}'.format(api,
-                                                                        cursor))
-
-                try:
-                    next_cursor = find_next_paging_cursor_count(
-                        self.logger, res)
-                    count, cursor = next_cursor()
+        try:
+            while fetch:
+                res = await fetch
+                self.metrics.fetched(res)
+                next_cursor = find_next_paging_cursor_count(self.logger, res)
+                count, cursor = next_cursor()
+
+                # request for the next page is in flight while the current
+                # one is handed over
+                fetch = None
+                if count != 0:
+                    fetch = asyncio.ensure_future(
+                        session.http_get_bytes('{}&next_cursor={}'.format(api, cursor))
+                    )
+                if worker_pool:
+                    await worker_pool.spool(self.loop, fetched_data, res)
+                else:
                     fetched_data.append(res)
 
-                except ConnectorParseError as exc:
-                    await session.close()
-                    raise exc
+        except BaseException:
+            if fetch and not fetch.done():
+                fetch.cancel()
+            discard_spooled(fetched_data)
+            raise
 
-            return filter_multiple_tags(''.join(fetched_data))
+        return fetched_data
 
-        else:
-            session = SessionWithRetry(self.logger,
-                                       os.path.basename(self.connector_name),
-                                       self.globopts, custauth=self.auth_opts)
-            res = await session.http_get(api)
+    async def fetch_data(self, api):
+        session = SessionWithRetry(self.logger,
+                                   os.path.basename(self.connector_name),
+                                   self.globopts, custauth=self.auth_opts,
+                                   use_cache=True)
+        if self.topofeedpaging:
+            worker_pool = None
+            if self.spools_feed(api):
+                # only threshold of pool is needed here, its processes
+                # are not started
+                worker_pool = self.worker_pool or build_worker_pool(self.globopts)
+            return await self.fetch_pages(session, api, worker_pool)
 
+        else:
+            res = await session.http_get_bytes(api)
+            self.metrics.fetched(res)
             return res
 
     async def send_webapi(self, data, topotype):
@@ -248,167 +394,202 @@ class TaskGocdbTopology(TaskParseContacts, TaskParseTopology):
                         int(self.globopts['ConnectionSleepRetry'.lower()]),
                         self.globopts['ConnectionRetryRandom'.lower()],
                         int(self.globopts['ConnectionSleepRandomRetryMax'.lower()]),
-                        date=self.fixed_date)
+                        date=self.fixed_date,
+                        snapshot_dir=build_snapshot_dir(self.globopts),
+                        **build_compress_opts(self.globopts))
         await webapi.send(data, topotype)
 
-    async def run(self):
-        fetched_sites, fetched_servicegroups, fetched_endpoints = None, None, None
-        fetched_bdii = None
-
+    async def parse_topology(self, fetched_endpoints, fetched_servicegroups,
+                             fetched_sites):
         group_endpoints, group_groups = list(), list()
         parsed_site_contacts, parsed_servicegroups_contacts, parsed_serviceendpoint_contacts = None, None, None
 
-        coros = [self.fetch_data(self.SERVICE_ENDPOINTS_PI)]
-        if 'servicegroups' in self.topofetchtype:
-            coros.append(self.fetch_data(self.SERVICE_GROUPS_PI))
-        if 'sites' in self.topofetchtype:
-            coros.append(self.fetch_data(self.SITES_PI))
-
-        if self.bdii_opts and eval(self.bdii_opts['bdii']):
-            host = self.bdii_opts['bdiihost']
-            port = self.bdii_opts['bdiiport']
-            base = self.bdii_opts['bdiiquerybase']
-
-            coros.append(
-                self.fetch_ldap_data(host, port, base,
-                                     self.bdii_opts['bdiiqueryfiltersrm'],
-                                     self.bdii_opts['bdiiqueryattributessrm'].split(' '))
-            )
-
-            coros.append(
-                self.fetch_ldap_data(host, port, base,
-                                     self.bdii_opts['bdiiqueryfiltersepath'],
-                                     self.bdii_opts['bdiiqueryattributessepath'].split(' '))
-            )
-
-        # fetch topology data concurrently in coroutines
-        fetched_topology = await asyncio.gather(*coros, loop=self.loop, return_exceptions=True)
-
-        fetched_endpoints = fetched_topology[0]
-        if self.bdii_opts and eval(self.bdii_opts['bdii']):
-            fetched_bdii = list()
-            fetched_bdii.append(fetched_topology[-2])
-            fetched_bdii.append(fetched_topology[-1])
-        if 'sites' in self.topofetchtype and 'servicegroups' in self.topofetchtype:
-            fetched_servicegroups, fetched_sites = (
-                fetched_topology[1], fetched_topology[2])
-        elif 'sites' in self.topofetchtype:
-            fetched_sites = fetched_topology[1]
-        elif 'servicegroups' in self.topofetchtype:
-            fetched_servicegroups = fetched_topology[1]
-
-        exc_raised, exc = contains_exception(fetched_topology)
-        if exc_raised:
-            raise ConnectorError(repr(exc))
-
-        # proces data in parallel using multiprocessing
-        executor = ProcessPoolExecutor(max_workers=3)
+        # proces data in parallel using multiprocessing. pool is either
+        # shared by the caller or lives only for this run
+        worker_pool = self.worker_pool
+        if worker_pool is None:
+            worker_pool = build_worker_pool(self.globopts)
         parse_workers = list()
-        exe_parse_source_endpoints = partial(parse_endpoints, self.logger,
-                                             self.custname, self.uidservendp,
-                                             self.pass_extensions,
-                                             self.notification_flag,
-                                             fetched_endpoints)
-        exe_parse_source_servicegroups = partial(parse_servicegroups,
-                                                 self.logger, self.custname,
-                                                 self.uidservendp,
-                                                 self.pass_extensions,
-                                                 self.notification_flag,
-                                                 fetched_servicegroups)
-        exe_parse_source_sites = partial(parse_sites, self.logger,
-                                         self.custname, self.uidservendp,
-                                         self.pass_extensions,
-                                         self.notification_flag, fetched_sites)
+        parse_opts = (self.logger.connector, self.logger.customer, self.custname,
+                      self.uidservendp, self.pass_extensions,
+                      self.notification_flag)
+        exe_parse_source_endpoints = partial(parse_endpoints, *parse_opts)
+        exe_parse_source_servicegroups = partial(parse_servicegroups, *parse_opts)
+        exe_parse_source_sites = partial(parse_sites, *parse_opts)
 
         # parse topology depend on configured components fetch. we can fetch
         # only sites, only servicegroups or both.
         if fetched_servicegroups and fetched_sites:
             parse_workers.append(
-                self.loop.run_in_executor(executor, exe_parse_source_endpoints)
+                worker_pool.submit(self.loop, exe_parse_source_endpoints,
+                                   fetched_endpoints)
             )
             parse_workers.append(
-                self.loop.run_in_executor(
-                    executor, exe_parse_source_servicegroups)
+                worker_pool.submit(self.loop, exe_parse_source_servicegroups,
+                                   fetched_servicegroups)
             )
             parse_workers.append(
-                self.loop.run_in_executor(executor, exe_parse_source_sites)
+                worker_pool.submit(self.loop, exe_parse_source_sites,
+                                   fetched_sites)
             )
         elif fetched_servicegroups and not fetched_sites:
             parse_workers.append(
-                self.loop.run_in_executor(
-                    executor, exe_parse_source_servicegroups)
+                worker_pool.submit(self.loop, exe_parse_source_servicegroups,
+                                   fetched_servicegroups)
+            )
+            # service endpoints feed is not needed for topology so it's
+            # walked only for contacts
+            parse_workers.append(
+                worker_pool.submit(self.loop,
+                                   partial(parse_endpoint_contacts,
+                                           self.logger.connector,
+                                           self.logger.customer),
+                                   fetched_endpoints)
             )
         elif fetched_sites and not fetched_servicegroups:
             parse_workers.append(
-                self.loop.run_in_executor(executor, exe_parse_source_endpoints)
+                worker_pool.submit(self.loop, exe_parse_source_endpoints,
+                                   fetched_endpoints)
             )
             parse_workers.append(
-                self.loop.run_in_executor(executor, exe_parse_source_sites)
+                worker_pool.submit(self.loop, exe_parse_source_sites,
+                                   fetched_sites)
             )
 
-        parsed_topology = await asyncio.gather(*parse_workers, loop=self.loop)
+        try:
+            with self.metrics.timer('parse'):
+                parsed_topology = await asyncio.gather(*parse_workers, loop=self.loop)
+        finally:
+            if self.worker_pool is None:
+                worker_pool.shutdown()
 
+        # contacts are collected in the same pass over feed as topology
         if fetched_servicegroups and fetched_sites:
-            group_endpoints = parsed_topology[0]
-            group_groups, group_endpoints_sg = parsed_topology[1]
+            group_endpoints, parsed_serviceendpoint_contacts = parsed_topology[0]
+            group_groups, group_endpoints_sg, parsed_servicegroups_contacts = parsed_topology[1]
             group_endpoints += group_endpoints_sg
-            group_groups += parsed_topology[2]
+            group_groups_sites, parsed_site_contacts = parsed_topology[2]
+            group_groups += group_groups_sites
         elif fetched_servicegroups and not fetched_sites:
-            group_groups, group_endpoints = parsed_topology[0]
+            group_groups, group_endpoints, parsed_servicegroups_contacts = parsed_topology[0]
+            parsed_serviceendpoint_contacts = parsed_topology[1]
         elif fetched_sites and not fetched_servicegroups:
-            group_endpoints = parsed_topology[0]
-            group_groups = parsed_topology[1]
+            group_endpoints, parsed_serviceendpoint_contacts = parsed_topology[0]
+            group_groups, parsed_site_contacts = parsed_topology[1]
+
+        # contacts join is a dictionary lookup per entity so it's cheaper
+        # to do it here than to pickle topology to worker and back
+        with self.metrics.timer('mesh'):
+            group_groups = attach_contacts_topodata(self.logger,
+                                                    parsed_site_contacts,
+                                                    group_groups,
+                                                    self.notification_flag)
+            group_endpoints = attach_contacts_topodata(self.logger,
+                                                       parsed_serviceendpoint_contacts,
+                                                       group_endpoints,
+                                                       self.notification_flag)
+
+            if fetched_servicegroups:
+                attach_contacts_topodata(self.logger,
+                                         parsed_servicegroups_contacts,
+                                         group_groups, self.notification_flag)
 
-        # check if we fetched SRM port info and attach it appropriate endpoint
-        # data
-        if self.bdii_opts and eval(self.bdii_opts['bdii']):
-            attach_srmport_topodata(self.logger, self.bdii_opts['bdiiqueryattributessrm'].split(
-                ' ')[0], fetched_bdii[0], group_endpoints)
-            attach_sepath_topodata(self.logger, self.bdii_opts['bdiiqueryattributessepath'].split(
-                ' ')[0], fetched_bdii[1], group_endpoints)
-
-        # parse contacts from fetched service endpoints topology, if there are
-        # any
-        parsed_serviceendpoint_contacts = self.parse_serviceendpoints_contacts(fetched_endpoints)
-
-        if fetched_sites:
-            parsed_site_contacts = self.parse_siteswith_contacts(fetched_sites)
-
-        attach_contacts_workers = [
-            self.loop.run_in_executor(executor,
-                                      partial(attach_contacts_topodata, self.logger,
-                                              parsed_site_contacts,
-                                              group_groups, self.notification_flag)),
-            self.loop.run_in_executor(executor,
-                                      partial(attach_contacts_topodata, self.logger,
-                                              parsed_serviceendpoint_contacts,
-                                              group_endpoints, self.notification_flag))
-        ]
-
-        executor = ProcessPoolExecutor(max_workers=2)
-        group_groups, group_endpoints = await asyncio.gather(*attach_contacts_workers, loop=self.loop)
-
-        if fetched_servicegroups:
-            parsed_servicegroups_contacts = self.parse_servicegroups_contacts(fetched_servicegroups)
-            attach_contacts_topodata(self.logger,
-                                     parsed_servicegroups_contacts,
-                                     group_groups, self.notification_flag)
-
-        await write_state(self.connector_name, self.globopts, self.confcust, self.fixed_date, True)
+        return group_groups, group_endpoints
 
-        numge = len(group_endpoints)
-        numgg = len(group_groups)
+    @instrumented
+    async def run(self):
+        fetched_sites, fetched_servicegroups, fetched_endpoints = None, None, None
+        fetch_bdii = None
 
-        # send concurrently to WEB-API in coroutines
-        if eval(self.globopts['GeneralPublishWebAPI'.lower()]):
-            await asyncio.gather(
-                self.send_webapi(group_groups, 'groups'),
-                self.send_webapi(group_endpoints, 'endpoints')
-            )
+        coros = [self.fetch_data(self.SERVICE_ENDPOINTS_PI)]
+        if 'servicegroups' in self.topofetchtype:
+            coros.append(self.fetch_data(self.SERVICE_GROUPS_PI))
+        if 'sites' in self.topofetchtype:
+            coros.append(self.fetch_data(self.SITES_PI))
 
-        if eval(self.globopts['GeneralWriteJson'.lower()]):
-            write_json(self.logger, self.globopts, self.confcust,
-                       group_groups, group_endpoints, self.fixed_date)
+        # BDII entries are streamed and mapped while topology is fetched
+        # and parsed
+        if self.bdii_opts and eval(self.bdii_opts['bdii']):
+            fetch_bdii = asyncio.ensure_future(self.fetch_bdii(), loop=self.loop)
 
-        self.logger.info('Customer:' + self.custname + ' Type:%s ' % (','.join(
-            self.topofetchtype)) + 'Fetched Endpoints:%d' % (numge) + ' Groups:%d' % (numgg))
+        published = False
+        try:
+            # fetch topology data concurrently in coroutines
+            with self.metrics.timer('fetch'):
+                fetched_topology = await asyncio.gather(*coros, loop=self.loop, return_exceptions=True)
+
+            fetched_endpoints = fetched_topology[0]
+            if 'sites' in self.topofetchtype and 'servicegroups' in self.topofetchtype:
+                fetched_servicegroups, fetched_sites = (
+                    fetched_topology[1], fetched_topology[2])
+            elif 'sites' in self.topofetchtype:
+                fetched_sites = fetched_topology[1]
+            elif 'servicegroups' in self.topofetchtype:
+                fetched_servicegroups = fetched_topology[1]
+
+            exc_raised, exc = contains_exception(fetched_topology)
+            if exc_raised:
+                raise ConnectorError(repr(exc))
+
+            # unchanged feeds are parsed and joined with contacts only once
+            parse_cache = build_parse_cache(self.globopts)
+            parsed = None
+            if parse_cache:
+                cache_key = parse_cache.key([fetched_endpoints, fetched_servicegroups,
+                                             fetched_sites], self.custname,
+                                            self.uidservendp, self.pass_extensions,
+                                            self.notification_flag,
+                                            sorted(self.topofetchtype))
+                parsed = parse_cache.load(cache_key)
+
+            if parsed:
+                group_groups, group_endpoints = parsed
+                self.metrics.count('parse_cache_hits')
+            else:
+                group_groups, group_endpoints = await self.parse_topology(
+                    fetched_endpoints, fetched_servicegroups, fetched_sites)
+                if parse_cache:
+                    parse_cache.store(cache_key, (group_groups, group_endpoints))
+
+            # check if we fetched SRM port info and attach it appropriate endpoint
+            # data. BDII is queried on every run so it's kept out of parse cache
+            if fetch_bdii:
+                fetched_bdii = await fetch_bdii
+                exc_raised, exc = contains_exception(fetched_bdii)
+                if exc_raised:
+                    raise ConnectorError(repr(exc))
+
+                with self.metrics.timer('mesh'):
+                    attach_srmport_topodata(self.logger, self.bdii_opts['bdiiqueryattributessrm'].split(
+                        ' ')[0], fetched_bdii[0], group_endpoints)
+                    attach_sepath_topodata(self.logger, self.bdii_opts['bdiiqueryattributessepath'].split(
+                        ' ')[0], fetched_bdii[1], group_endpoints)
+
+            numge = len(group_endpoints)
+            numgg = len(group_groups)
+            self.metrics.add_records('group_endpoints', numge)
+            self.metrics.add_records('group_groups', numgg)
+
+            # state, WEB-API and JSON sinks consume topology concurrently
+            sinks = SinkPipeline(self.logger, self.loop, self.metrics)
+            sinks.add('state', write_state, self.connector_name, self.globopts,
+                      self.confcust, self.fixed_date, True)
+            if eval(self.globopts['GeneralPublishWebAPI'.lower()]):
+                sinks.add('webapi-groups', self.send_webapi, group_groups, 'groups')
+                sinks.add('webapi-endpoints', self.send_webapi, group_endpoints, 'endpoints')
+            if eval(self.globopts['GeneralWriteJson'.lower()]):
+                sinks.add('json', write_json, self.logger, self.globopts, self.confcust,
+                          group_groups, group_endpoints, self.fixed_date, blocking=True)
+            await sinks.run()
+
+            self.logger.info('Customer:' + self.custname + ' Type:%s ' % (','.join(
+                self.topofetchtype)) + 'Fetched Endpoints:%d' % (numge) + ' Groups:%d' % (numgg))
+            published = True
+
+        finally:
+            if fetch_bdii and not fetch_bdii.done():
+                fetch_bdii.cancel()
+            discard_spooled(fetched_endpoints, fetched_servicegroups, fetched_sites)
+            # stale BDII snapshots are refreshed in the background and not
+            # waited on before topology is published
+            await self.finish_bdii_refresh(cancel=not published)
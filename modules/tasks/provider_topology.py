@@ -5,12 +5,14 @@ from collections import Callable
 from urllib.parse import urlparse
 
 from argo_connectors.io.http import SessionWithRetry
-from argo_connectors.io.webapi import WebAPI
+from argo_connectors.io.parsecache import build_parse_cache
+from argo_connectors.io.webapi import WebAPI, build_snapshot_dir, build_compress_opts
 from argo_connectors.mesh.contacts import attach_contacts_topodata
+from argo_connectors.metrics import TaskMetrics, instrumented
 from argo_connectors.parse.base import ParseHelpers
 from argo_connectors.parse.provider_contacts import ParseResourcesContacts
 from argo_connectors.parse.provider_topology import ParseTopo, ParseExtensions, buildmap_id2groupname
-from argo_connectors.tasks.common import write_topo_json as write_json, write_state
+from argo_connectors.tasks.common import SinkPipeline, write_topo_json as write_json, write_state
 from argo_connectors.exceptions import ConnectorError, ConnectorParseError, ConnectorHttpError
 
 
@@ -83,6 +85,7 @@ class TaskProviderTopology(object):
         self.uidservendp = uidservendp
         self.fixed_date = fixed_date
         self.fetchtype = fetchtype
+        self.metrics = TaskMetrics()
 
     def parse_source_extensions(self, extensions, groupnames):
         resources_extended = ParseExtensions(self.logger, extensions, groupnames, self.uidservendp, self.logger.customer)
@@ -94,6 +97,23 @@ class TaskProviderTopology(object):
 
         return topo.get_group_groups(), topo.get_group_endpoints()
 
+    def parse_topology(self, fetched_resources, fetched_providers,
+                       fetched_extensions):
+        with self.metrics.timer('parse'):
+            group_groups, group_endpoints = self.parse_source_topo(fetched_resources, fetched_providers)
+            endpoints_contacts = ParseResourcesContacts(self.logger, fetched_resources).get_contacts()
+
+            if fetched_extensions is not None:
+                group_endpoints_extended = self.parse_source_extensions(
+                    fetched_extensions, buildmap_id2groupname(group_endpoints)
+                )
+                group_endpoints = group_endpoints + group_endpoints_extended
+
+        with self.metrics.timer('mesh'):
+            attach_contacts_topodata(self.logger, endpoints_contacts, group_endpoints)
+
+        return group_groups, group_endpoints
+
     async def send_webapi(self, webapi_opts, data, topotype, fixed_date=None):
         webapi = WebAPI(self.connector_name, webapi_opts['webapihost'],
                         webapi_opts['webapitoken'], self.logger,
@@ -102,13 +122,16 @@ class TaskProviderTopology(object):
                         int(self.globopts['ConnectionSleepRetry'.lower()]),
                         self.globopts['ConnectionRetryRandom'.lower()],
                         int(self.globopts['ConnectionSleepRandomRetryMax'.lower()]),
-                        date=fixed_date)
+                        date=fixed_date,
+                        snapshot_dir=build_snapshot_dir(self.globopts),
+                        **build_compress_opts(self.globopts))
         await webapi.send(data, topotype)
 
     async def fetch_data(self, feed, access_token, paginated):
         fetched_data = list()
         remote_topo = urlparse(feed)
-        session = SessionWithRetry(self.logger, self.logger.customer, self.globopts, handle_session_close=True)
+        session = SessionWithRetry(self.logger, self.logger.customer, self.globopts,
+                                   use_cache=True)
 
         headers = {
             "Accept": "application/json",
@@ -120,6 +143,7 @@ class TaskProviderTopology(object):
                                                             remote_topo.netloc,
                                                             remote_topo.path),
                                                             headers=headers)
+            self.metrics.fetched(res)
 
         except ConnectorHttpError as exc:
             await session.close()
@@ -141,6 +165,7 @@ class TaskProviderTopology(object):
                                                                                 from_index,
                                                                                 num),
                                                                                 headers=headers)
+                    self.metrics.fetched(res)
                     fetched_results = fetched_results + filter_out_results(res)
                     next_cursor = find_next_paging_cursor_count(self.logger, res)
                     total, from_index, to_index = next_cursor()
@@ -168,6 +193,7 @@ class TaskProviderTopology(object):
                                                                             from_index,
                                                                             num),
                                                                             headers=headers)
+                self.metrics.fetched(res)
                 await session.close()
                 return res
 
@@ -177,7 +203,7 @@ class TaskProviderTopology(object):
 
     async def token_fetch(self, oidcclientid, oidctoken, oidcapi):
         token_endpoint = urlparse(oidcapi)
-        session = SessionWithRetry(self.logger, self.logger.customer, self.globopts, handle_session_close=True)
+        session = SessionWithRetry(self.logger, self.logger.customer, self.globopts)
 
         data = 'grant_type=refresh_token&refresh_token={0}'.format(oidctoken)
         data += '&client_id={0}&scope=openid%20email%20profile'.format(oidcclientid)
@@ -204,6 +230,7 @@ class TaskProviderTopology(object):
 
         return access_token
 
+    @instrumented
     async def run(self):
         topofeedextensions = self.confcust.get_topofeedendpointsextensions()
         topofeedproviders = self.confcust.get_topofeedservicegroups()
@@ -226,43 +253,55 @@ class TaskProviderTopology(object):
             coros.append(self.fetch_data(topofeedextensions, access_token, self.topofeedpaging))
 
         # fetch topology data concurrently in coroutines
-        fetched_data = await asyncio.gather(*coros, return_exceptions=True)
+        with self.metrics.timer('fetch'):
+            fetched_data = await asyncio.gather(*coros, return_exceptions=True)
 
         exc_raised, exc = contains_exception(fetched_data)
         if exc_raised:
             raise ConnectorError(repr(exc))
 
+        fetched_extensions = None
         if topofeedextensions:
             fetched_resources, fetched_providers, fetched_extensions = fetched_data
         else:
             fetched_resources, fetched_providers = fetched_data
 
         if fetched_resources and fetched_providers:
-            group_groups, group_endpoints = self.parse_source_topo(fetched_resources, fetched_providers)
-            endpoints_contacts = ParseResourcesContacts(self.logger, fetched_resources).get_contacts()
-
-            if topofeedextensions:
-                group_endpoints_extended = self.parse_source_extensions(
-                    fetched_extensions, buildmap_id2groupname(group_endpoints)
-                )
-                group_endpoints = group_endpoints + group_endpoints_extended
-
-            attach_contacts_topodata(self.logger, endpoints_contacts, group_endpoints)
-
-            await write_state(self.connector_name, self.globopts, self.confcust, self.fixed_date, True)
+            parse_cache = build_parse_cache(self.globopts)
+            parsed = None
+            if parse_cache:
+                cache_key = parse_cache.key([fetched_resources, fetched_providers,
+                                             fetched_extensions],
+                                            self.logger.customer, self.uidservendp,
+                                            self.fetchtype)
+                parsed = parse_cache.load(cache_key)
+
+            if parsed:
+                group_groups, group_endpoints = parsed
+                self.metrics.count('parse_cache_hits')
+            else:
+                group_groups, group_endpoints = self.parse_topology(
+                    fetched_resources, fetched_providers, fetched_extensions)
+                if parse_cache:
+                    parse_cache.store(cache_key, (group_groups, group_endpoints))
 
             numge = len(group_endpoints)
             numgg = len(group_groups)
+            self.metrics.add_records('group_endpoints', numge)
+            self.metrics.add_records('group_groups', numgg)
 
-            # send concurrently to WEB-API in coroutines
+            # state, WEB-API and JSON sinks consume topology concurrently
+            sinks = SinkPipeline(self.logger, self.loop, self.metrics)
+            sinks.add('state', write_state, self.connector_name, self.globopts,
+                      self.confcust, self.fixed_date, True)
             if eval(self.globopts['GeneralPublishWebAPI'.lower()]):
-                await asyncio.gather(
-                        self.send_webapi(self.webapi_opts, group_groups, 'groups', self.fixed_date),
-                        self.send_webapi(self.webapi_opts, group_endpoints,'endpoints', self.fixed_date),
-                        loop=self.loop
-                )
-
+                sinks.add('webapi-groups', self.send_webapi, self.webapi_opts,
+                          group_groups, 'groups', self.fixed_date)
+                sinks.add('webapi-endpoints', self.send_webapi, self.webapi_opts,
+                          group_endpoints, 'endpoints', self.fixed_date)
             if eval(self.globopts['GeneralWriteJson'.lower()]):
-                write_json(self.logger, self.globopts, self.confcust, group_groups, group_endpoints, self.fixed_date)
+                sinks.add('json', write_json, self.logger, self.globopts, self.confcust,
+                          group_groups, group_endpoints, self.fixed_date, blocking=True)
+            await sinks.run()
 
             self.logger.info('Customer:' + self.logger.customer + ' Fetched Endpoints:%d' % (numge) + ' Groups(%s):%d' % (self.fetchtype, numgg))
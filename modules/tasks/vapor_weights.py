@@ -3,9 +3,10 @@ import os
 from urllib.parse import urlparse
 
 from argo_connectors.io.http import SessionWithRetry
-from argo_connectors.io.webapi import WebAPI
+from argo_connectors.io.webapi import WebAPI, build_snapshot_dir, build_compress_opts
+from argo_connectors.metrics import TaskMetrics, instrumented
 from argo_connectors.parse.vapor import ParseWeights
-from argo_connectors.tasks.common import write_weights_metricprofile_state as write_state, write_weights_json as write_json
+from argo_connectors.tasks.common import SinkPipeline, write_weights_metricprofile_state as write_state, write_weights_json as write_json
 
 
 class TaskVaporWeights(object):
@@ -20,14 +21,16 @@ class TaskVaporWeights(object):
         self.jobcust = jobcust
         self.cglob = cglob
         self.fixed_date = fixed_date
+        self.metrics = TaskMetrics()
 
     async def fetch_data(self):
         feed_parts = urlparse(self.feed)
         session = SessionWithRetry(self.logger, os.path.basename(
-            self.connector_name), self.globopts)
+            self.connector_name), self.globopts, use_cache=True)
         res = await session.http_get('{}://{}{}'.format(feed_parts.scheme,
                                                         feed_parts.netloc,
                                                         feed_parts.path))
+        self.metrics.fetched(res)
         return res
 
     def get_webapi_opts(self, cust, job):
@@ -53,9 +56,12 @@ class TaskVaporWeights(object):
                         self.globopts['ConnectionRetryRandom'.lower()],
                         int(self.globopts['ConnectionSleepRandomRetryMax'.lower()]),
                         report=self.confcust.get_jobdir(job), endpoints_group='SITES',
-                        date=self.fixed_date)
+                        date=self.fixed_date,
+                        snapshot_dir=build_snapshot_dir(self.globopts),
+                        **build_compress_opts(self.globopts))
         await webapi.send(weights)
 
+    @instrumented
     async def run(self):
         for job, cust in self.jobcust:
             self.logger.customer = self.confcust.get_custname(cust)
@@ -66,19 +72,23 @@ class TaskVaporWeights(object):
             if write_empty:
                 weights = []
             else:
-                res = await self.fetch_data()
-                weights = self.parse_source(res)
+                with self.metrics.timer('fetch'):
+                    res = await self.fetch_data()
+                with self.metrics.timer('parse'):
+                    weights = self.parse_source(res)
+            self.metrics.add_records('weights', len(weights))
 
             webapi_opts = self.get_webapi_opts(cust, job)
 
+            sinks = SinkPipeline(self.logger, metrics=self.metrics)
             if eval(self.globopts['GeneralPublishWebAPI'.lower()]):
-                await self.send_webapi(weights, webapi_opts, job)
-
+                sinks.add('webapi', self.send_webapi, weights, webapi_opts, job)
             if eval(self.globopts['GeneralWriteJson'.lower()]):
-                write_json(self.logger, self.globopts, cust, job,
-                           self.confcust, self.fixed_date, weights)
-
-            await write_state(self.connector_name, self.globopts, cust, job, self.confcust, self.fixed_date, True)
+                sinks.add('json', write_json, self.logger, self.globopts, cust, job,
+                          self.confcust, self.fixed_date, weights, blocking=True)
+            sinks.add('state', write_state, self.connector_name, self.globopts,
+                      cust, job, self.confcust, self.fixed_date, True)
+            await sinks.run()
 
         if weights or write_empty:
             custs = set([cust for job, cust in self.jobcust])
@@ -2,7 +2,8 @@ import os
 
 from argo_connectors.exceptions import ConnectorHttpError, ConnectorParseError
 from argo_connectors.io.http import SessionWithRetry
-from argo_connectors.tasks.common import write_weights_metricprofile_state as write_state, write_metricprofile_json as write_json
+from argo_connectors.metrics import TaskMetrics, instrumented
+from argo_connectors.tasks.common import SinkPipeline, write_weights_metricprofile_state as write_state, write_metricprofile_json as write_json
 from argo_connectors.parse.webapi_metricprofile import ParseMetricProfiles
 
 API_PATH = '/api/v2/metric_profiles'
@@ -19,18 +20,21 @@ class TaskWebApiMetricProfile(object):
         self.confcust = confcust
         self.cglob = cglob
         self.fixed_date = fixed_date
+        self.metrics = TaskMetrics()
 
     async def fetch_data(self, host, token):
         session = SessionWithRetry(self.logger,
                                    os.path.basename(self.connector_name),
                                    self.globopts, token=token)
         res = await session.http_get('{}://{}{}'.format('https', host, API_PATH))
+        self.metrics.fetched(res)
         return res
 
     def parse_source(self, res, profiles):
         metric_profiles = ParseMetricProfiles(self.logger, res, profiles).get_data()
         return metric_profiles
 
+    @instrumented
     async def run(self):
         for job in self.confcust.get_jobs(self.cust):
             self.logger.customer = self.confcust.get_custname(self.cust)
@@ -46,17 +50,24 @@ class TaskWebApiMetricProfile(object):
                 continue
 
             try:
-                res = await self.fetch_data(webapi_opts['webapihost'], webapi_opts['webapitoken'])
+                with self.metrics.timer('fetch'):
+                    res = await self.fetch_data(webapi_opts['webapihost'], webapi_opts['webapitoken'])
 
-                fetched_profiles = self.parse_source(res, profiles)
-
-                await write_state(self.connector_name, self.globopts, self.cust, job, self.confcust, self.fixed_date, True)
+                with self.metrics.timer('parse'):
+                    fetched_profiles = self.parse_source(res, profiles)
+                self.metrics.add_records('metric_profiles', len(fetched_profiles))
 
+                sinks = SinkPipeline(self.logger, self.loop, self.metrics)
+                sinks.add('state', write_state, self.connector_name, self.globopts,
+                          self.cust, job, self.confcust, self.fixed_date, True)
                 if eval(self.globopts['GeneralWriteJson'.lower()]):
-                    write_json(self.logger, self.globopts, self.cust, job, self.confcust, self.fixed_date, fetched_profiles)
+                    sinks.add('json', write_json, self.logger, self.globopts, self.cust, job,
+                              self.confcust, self.fixed_date, fetched_profiles, blocking=True)
+                await sinks.run()
 
                 self.logger.info('Customer:' + self.logger.customer + ' Job:' + job + ' Profiles:%s Tuples:%d' % (', '.join(profiles), len(fetched_profiles)))
 
             except (ConnectorHttpError, KeyboardInterrupt, ConnectorParseError) as exc:
                 self.logger.error(repr(exc))
+                self.metrics.count('failures')
                 await write_state(self.connector_name, self.globopts, self.cust, job, self.confcust, self.fixed_date, False)
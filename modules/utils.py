@@ -40,6 +40,33 @@ def filename_date(logger, option, path, stamp=None):
     return filename
 
 
+def window_days(start, end):
+    """
+       Empty list for every YEAR-MONTH-DAY from start to end
+    """
+    days = dict()
+    day = start.replace(hour=0, minute=0, second=0)
+    while day <= end:
+        days[day.strftime('%Y-%m-%d')] = list()
+        day += datetime.timedelta(days=1)
+
+    return days
+
+
+def split_days(start_time, end_time, start, end):
+    """
+       Yield YEAR-MONTH-DAY of every day from start to end that interval
+       overlaps together with the interval clipped to that day
+    """
+    day = max(start_time, start).replace(hour=0, minute=0, second=0)
+    last = min(end_time, end)
+    while day <= last:
+        day_end = day.replace(hour=23, minute=59, second=59)
+        yield (day.strftime('%Y-%m-%d'), max(start_time, day),
+               min(end_time, day_end))
+        day += datetime.timedelta(days=1)
+
+
 def module_class_name(obj):
     name = repr(obj.__class__.__name__)
 
@@ -0,0 +1,171 @@
+import os
+import tempfile
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from argo_connectors.log import Logger
+from argo_connectors.parse.base import XMLPages, XML_CHUNK_SIZE
+
+
+DEFAULT_POOL_SIZE = 3
+DEFAULT_INPROCESS_THRESHOLD = 512 * 1024
+
+
+def feed_size(data):
+    if isinstance(data, XMLPages):
+        return sum([len(page) for page in data])
+    elif data:
+        return len(data)
+    else:
+        return 0
+
+
+def _read_chunks(path, offset, length):
+    with open(path, 'rb') as fp:
+        fp.seek(offset)
+        while length > 0:
+            chunk = fp.read(min(XML_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def worker_logger(connector, customer):
+    """
+       Logger of connector rebuilt in worker from its name instead of
+       being pickled with every submitted feed
+    """
+    logger = Logger(connector)
+    logger.customer = customer
+    return logger
+
+
+def _run_handoff(func, handoff):
+    return func(handoff.load())
+
+
+class FeedHandoff(object):
+    """
+       Feed written to a temporary file so that only the file path and page
+       offsets are pickled to the worker process. Worker reads the feed back
+       as stream of byte chunks. Pages of paginated feed can also be added
+       one by one as they are fetched.
+    """
+    def __init__(self, data=None, dirname=None):
+        self.paginated = data is None or isinstance(data, XMLPages)
+        self.pages = list()
+
+        fd, self.path = tempfile.mkstemp(prefix='argo-connectors-',
+                                         suffix='.feed', dir=dirname)
+        os.close(fd)
+        if data is not None:
+            self.extend(data if self.paginated else [data])
+
+    def extend(self, pages):
+        with open(self.path, 'ab') as fp:
+            for page in pages:
+                start = fp.tell()
+                if isinstance(page, str):
+                    for i in range(0, len(page), XML_CHUNK_SIZE):
+                        fp.write(page[i:i + XML_CHUNK_SIZE].encode('utf-8'))
+                else:
+                    fp.write(page)
+                self.pages.append((start, fp.tell() - start))
+
+    def load(self):
+        pages = [_read_chunks(self.path, offset, length)
+                 for offset, length in self.pages]
+        if self.paginated:
+            return XMLPages(pages)
+        else:
+            return pages[0]
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class SpooledPages(XMLPages):
+    """
+       Paginated feed that is also written to FeedHandoff page by page
+       once it outgrows in-process threshold of worker pool
+    """
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.handoff = None
+        self.size = 0
+
+    def discard(self):
+        if self.handoff is not None:
+            self.handoff.remove()
+            self.handoff = None
+
+
+class WorkerPool(object):
+    """
+       Process pool kept for the whole lifetime of connector and shared
+       between tasks. Feeds smaller than inprocess_threshold are parsed
+       in the calling process, on a thread of default executor.
+    """
+    def __init__(self, size=DEFAULT_POOL_SIZE,
+                 inprocess_threshold=DEFAULT_INPROCESS_THRESHOLD):
+        self.size = size
+        self.inprocess_threshold = inprocess_threshold
+        self._executor = None
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.size)
+        return self._executor
+
+    async def spool(self, loop, pages, page):
+        """
+           Add fetched page to SpooledPages. Once feed is too large to be
+           parsed in process, its pages are written out to handoff file
+           while the next ones are fetched, so that the feed is ready for
+           the worker process when the last page arrives.
+        """
+        pages.append(page)
+        pages.size += len(page)
+        if pages.handoff is None:
+            if pages.size < self.inprocess_threshold:
+                return
+            pages.handoff = await loop.run_in_executor(None, FeedHandoff)
+            pending = list(pages)
+        else:
+            pending = [page]
+        await loop.run_in_executor(None, pages.handoff.extend, pending)
+
+    async def submit(self, loop, func, data):
+        # neither parsing of small feed nor writing out of large one is
+        # done on the event loop thread
+        if feed_size(data) < self.inprocess_threshold:
+            return await loop.run_in_executor(None, func, data)
+
+        handoff = getattr(data, 'handoff', None)
+        if handoff is None:
+            handoff = await loop.run_in_executor(None, FeedHandoff, data)
+        try:
+            return await loop.run_in_executor(self.executor,
+                                              partial(_run_handoff, func,
+                                                      handoff))
+        finally:
+            handoff.remove()
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+def build_worker_pool(globopts):
+    size = int(globopts.get('WorkersPoolSize'.lower(), DEFAULT_POOL_SIZE))
+    threshold = int(globopts.get('WorkersInProcessThreshold'.lower(),
+                                 DEFAULT_INPROCESS_THRESHOLD))
+
+    return WorkerPool(size, threshold)
@@ -49,5 +49,6 @@ setup(name=NAME,
                       'exec/topology-provider-connector.py',
                       'exec/topology-agora-connector.py',
                       'exec/weights-vapor-connector.py',
+                      'exec/batch-connector.py',
                   ])
                 ])
@@ -3,6 +3,7 @@ import unittest
 import unittest
 import asyncio
 import datetime
+import os
 
 import mock
 
@@ -13,6 +14,7 @@ from argo_connectors.tasks.gocdb_servicetypes import TaskGocdbServiceTypes
 from argo_connectors.tasks.gocdb_topology import TaskGocdbTopology, find_next_paging_cursor_count
 from argo_connectors.tasks.provider_topology import TaskProviderTopology
 from argo_connectors.parse.base import ParseHelpers
+from argo_connectors.workers import WorkerPool
 
 
 CUSTOMER_NAME = 'CUSTOMERFOO'
@@ -74,7 +76,7 @@ class TopologyGocdb(unittest.TestCase):
     @mock.patch('argo_connectors.io.http.build_connection_retry_settings')
     @mock.patch('argo_connectors.io.http.build_ssl_settings')
     @mock.patch('argo_connectors.tasks.gocdb_topology.TaskGocdbTopology.fetch_ldap_data')
-    @mock.patch('argo_connectors.tasks.gocdb_topology.SessionWithRetry.http_get')
+    @mock.patch('argo_connectors.tasks.gocdb_topology.SessionWithRetry.http_get_bytes')
     @async_test
     async def test_failedNextCursor(self, mock_httpget, mock_fetchldap,
                                     mock_buildsslsettings,
@@ -94,6 +96,183 @@ class TopologyGocdb(unittest.TestCase):
         self.assertTrue('failed GOCDB' in excep.msg)
 
 
+    def test_fetchPages(self):
+        page = """<?xml version="1.0" encoding="UTF-8"?>
+<results>
+  <meta>
+    {}
+    <count>{}</count>
+  </meta>
+  {}
+</results>"""
+        next_link = '<link rel="next" href="https://gocdb.com/?method=get_site&amp;next_cursor={}"/>'
+        pages = [
+            page.format(next_link.format(10), 2, '<SITE NAME="A"/>\n  <SITE NAME="B"/>'),
+            page.format(next_link.format(20), 1, '<SITE NAME="C"/>'),
+            page.format('', 0, '')
+        ]
+        mock_httpget = mock.AsyncMock(side_effect=pages)
+        session = mock.Mock(http_get_bytes=mock_httpget)
+        res = self.loop.run_until_complete(
+            self.topo_gocdb.fetch_pages(session, 'https://gocdb.com/sites_api'))
+        self.assertEqual(res, pages)
+        self.assertEqual(mock_httpget.call_count, 3)
+        self.assertEqual([call[0][0] for call in mock_httpget.call_args_list],
+                         ['https://gocdb.com/sites_api&next_cursor=0',
+                          'https://gocdb.com/sites_api&next_cursor=10',
+                          'https://gocdb.com/sites_api&next_cursor=20'])
+
+    def test_fetchPagesSpooled(self):
+        page = """<?xml version="1.0" encoding="UTF-8"?>
+<results>
+  <meta>
+    {}
+    <count>{}</count>
+  </meta>
+  {}
+</results>"""
+        next_link = '<link rel="next" href="https://gocdb.com/?method=get_site&amp;next_cursor={}"/>'
+        pages = [
+            page.format(next_link.format(10), 1, '<SITE NAME="A"/>').encode(),
+            page.format(next_link.format(20), 1, '<SITE NAME="B"/>').encode(),
+            page.format('', 0, '').encode()
+        ]
+
+        def fetch(pool):
+            session = mock.Mock(http_get_bytes=mock.AsyncMock(side_effect=pages))
+            return self.loop.run_until_complete(
+                self.topo_gocdb.fetch_pages(session, 'https://gocdb.com/sites_api', pool))
+
+        # feed outgrowing threshold is written out page by page as fetched
+        res = fetch(WorkerPool(1, len(pages[0]) + 1))
+        self.assertEqual(res, pages)
+        handoff = res.handoff
+        self.assertEqual([b''.join(page) for page in handoff.load()], pages)
+        self.assertTrue(os.path.exists(handoff.path))
+        res.discard()
+        self.assertFalse(os.path.exists(handoff.path))
+
+        res = fetch(WorkerPool(1, sum(len(page) for page in pages) + 1))
+        self.assertEqual(res, pages)
+        self.assertIsNone(res.handoff)
+
+        self.topo_gocdb.topofetchtype = ['servicegroups']
+        self.assertFalse(self.topo_gocdb.spools_feed(self.topo_gocdb.SERVICE_ENDPOINTS_PI))
+        self.assertTrue(self.topo_gocdb.spools_feed(self.topo_gocdb.SERVICE_GROUPS_PI))
+        self.topo_gocdb.globopts = {'cacheparsed': 'True', 'inputstatesavedir': '/tmp'}
+        self.assertFalse(self.topo_gocdb.spools_feed(self.topo_gocdb.SITES_PI))
+
+    @mock.patch('argo_connectors.tasks.gocdb_topology.attach_contacts_topodata',
+                side_effect=lambda logger, contacts, topodata, flag: topodata)
+    def test_parseSubmitsPlainValues(self, mock_attachcontacts):
+        self.topo_gocdb.logger.connector = 'topology-gocdb-connector.py'
+        self.topo_gocdb.worker_pool = mock.Mock()
+        self.topo_gocdb.worker_pool.submit = mock.AsyncMock(side_effect=[
+            ([], [], {}), {}
+        ])
+        group_groups, group_endpoints = self.loop.run_until_complete(
+            self.topo_gocdb.parse_topology(b'<results/>', b'<results/>', None))
+        self.assertEqual((group_groups, group_endpoints), ([], []))
+        calls = self.topo_gocdb.worker_pool.submit.call_args_list
+        # endpoints feed walked for contacts only goes through pool as well
+        self.assertEqual(len(calls), 2)
+        for call in calls:
+            self.assertEqual(call[0][1].args[:2],
+                             ('topology-gocdb-connector.py', CUSTOMER_NAME))
+            self.assertFalse(any(isinstance(arg, mock.Mock) for arg in call[0][1].args))
+        self.assertEqual(calls[1][0][2], b'<results/>')
+
+    @mock.patch('argo_connectors.tasks.gocdb_topology.LDAPSessionWithRetry')
+    @mock.patch('argo_connectors.tasks.gocdb_topology.build_ldap_cache')
+    def test_fetchBdiiStaleSnapshot(self, mock_buildldapcache, mock_ldapsession):
+        srm = {'dn': 'GlueServiceUniqueID=httpg://se.foo:8446/srm/managerv2,o=grid',
+               'GlueServiceEndpoint': ['httpg://se.foo:8446/srm/managerv2']}
+        sepath = {'dn': 'GlueVOInfoLocalID=ops,GlueSEUniqueID=se.foo,o=grid',
+                  'GlueVOInfoAccessControlBaseRule': ['VO:ops'],
+                  'GlueVOInfoPath': ['/dpm/ops']}
+        self.topo_gocdb.bdii_opts = {
+            'bdiihost': 'bdii.foo', 'bdiiport': '2170', 'bdiiquerybase': 'o=grid',
+            'bdiiqueryfiltersrm': '(objectClass=GlueService)',
+            'bdiiqueryattributessrm': 'GlueServiceEndpoint',
+            'bdiiqueryfiltersepath': '(objectClass=GlueSATop)',
+            'bdiiqueryattributessepath': 'GlueVOInfoAccessControlBaseRule GlueVOInfoPath'
+        }
+        ldap_cache = mock.Mock()
+        ldap_cache.lookup.side_effect = [([srm], False), ([sepath], True)]
+        mock_buildldapcache.return_value = ldap_cache
+        self.topo_gocdb.fetch_ldap_data = mock.AsyncMock(side_effect=ConnectorHttpError('LDAP down'))
+
+        srmports, sepaths = self.loop.run_until_complete(self.topo_gocdb.fetch_bdii())
+        self.assertEqual(srmports.ports, {'se.foo': '8446'})
+        self.assertEqual(sepaths.mapping, {'se.foo': [{'voname': 'ops', 'GlueVOInfoPath': '/dpm/ops'}]})
+
+        # only stale snapshot is refreshed and its failure is just logged
+        self.loop.run_until_complete(self.topo_gocdb.finish_bdii_refresh())
+        self.assertEqual(self.topo_gocdb.fetch_ldap_data.call_count, 1)
+        self.assertEqual(self.topo_gocdb.fetch_ldap_data.call_args[0][4], '(objectClass=GlueService)')
+        self.assertTrue(self.topo_gocdb.logger.warn.called)
+        self.assertTrue(mock_ldapsession.return_value.close.called)
+        self.assertIsNone(self.topo_gocdb.bdii_refresh)
+
+    @mock.patch('argo_connectors.tasks.gocdb_topology.SNAPSHOT_BATCH', 2)
+    def test_fetchLdapDataSnapshot(self):
+        entries = [{'dn': 'GlueServiceUniqueID=%d,o=grid' % i} for i in range(5)]
+
+        async def search_iter(*args):
+            for entry in entries:
+                yield entry
+
+        ldap_session = mock.Mock()
+        ldap_session.search_iter = search_iter
+        ldapmap = mock.Mock()
+        ldap_cache = mock.Mock()
+        writer = ldap_cache.writer.return_value
+        batches = list()
+        writer.write.side_effect = lambda batch: batches.append(list(batch))
+
+        res = self.loop.run_until_complete(self.topo_gocdb.fetch_ldap_data(
+            ldap_session, 'bdii.foo', '2170', 'o=grid', '(objectClass=GlueService)',
+            ['GlueServiceEndpoint'], ldapmap, ldap_cache))
+        self.assertEqual(res, ldapmap)
+        self.assertEqual(ldapmap.add.call_count, 5)
+        self.assertEqual(batches, [entries[:2], entries[2:4], entries[4:]])
+        writer.close.assert_called_once_with()
+        self.assertFalse(writer.abort.called)
+
+        # snapshot of failed search is dropped
+        async def failing_iter(*args):
+            yield entries[0]
+            raise ConnectorHttpError('LDAP down')
+
+        ldap_session.search_iter = failing_iter
+        writer.reset_mock()
+        with self.assertRaises(ConnectorHttpError):
+            self.loop.run_until_complete(self.topo_gocdb.fetch_ldap_data(
+                ldap_session, 'bdii.foo', '2170', 'o=grid', '(objectClass=GlueService)',
+                ['GlueServiceEndpoint'], None, ldap_cache))
+        writer.abort.assert_called_once_with()
+        self.assertFalse(writer.close.called)
+
+    def test_finishBdiiRefresh(self):
+        self.topo_gocdb.globopts = {'connectiontimeout': '0'}
+        self.topo_gocdb.logger = mock.Mock(customer=CUSTOMER_NAME)
+
+        # refresh not done in time is cancelled and awaited
+        refresh = asyncio.ensure_future(asyncio.sleep(10))
+        self.topo_gocdb.bdii_refresh = refresh
+        self.loop.run_until_complete(self.topo_gocdb.finish_bdii_refresh())
+        self.assertTrue(refresh.cancelled())
+        self.assertIn('timed out', self.topo_gocdb.logger.warn.call_args[0][0])
+
+        # failed run cancels refresh right away
+        self.topo_gocdb.globopts = {'connectiontimeout': '10'}
+        refresh = asyncio.ensure_future(asyncio.sleep(10))
+        self.topo_gocdb.bdii_refresh = refresh
+        self.loop.run_until_complete(self.topo_gocdb.finish_bdii_refresh(cancel=True))
+        self.assertTrue(refresh.cancelled())
+        self.assertIsNone(self.topo_gocdb.bdii_refresh)
+
+
 class TestFindNextPagingCursorCount(unittest.TestCase):
     def setUp(self):
         self.logger = mock.MagicMock()
@@ -504,3 +683,50 @@ class DowntimesCsv(unittest.TestCase):
         self.assertTrue(self.downtimes_flat.logger.error.call_args[0][0], repr(
             ConnectorHttpError('fetch_data failed')))
         self.assertFalse(self.downtimes_flat.send_webapi.called)
+
+    @mock.patch('argo_connectors.tasks.flat_downtimes.write_json')
+    @mock.patch('argo_connectors.tasks.flat_downtimes.write_state')
+    @async_test
+    async def test_StepsBackfillRun(self, mock_writestate, mock_writejson):
+        self.downtimes_flat.current_date = datetime.datetime(2022, 2, 20)
+        self.downtimes_flat.end_date = datetime.datetime(2022, 2, 22)
+        with open('tests/sample-downtimes.csv', encoding='utf-8') as feed_file:
+            downtimes = feed_file.read()
+        self.downtimes_flat.fetch_data = mock.AsyncMock(return_value=downtimes)
+        self.downtimes_flat.send_webapi = mock.AsyncMock()
+        await self.downtimes_flat.run()
+        self.assertEqual(self.downtimes_flat.fetch_data.call_count, 1)
+        self.assertEqual([call[0][3] for call in mock_writestate.call_args_list],
+                         ['2022_02_20', '2022_02_21', '2022_02_22'])
+        self.assertEqual([call[0][4] for call in mock_writejson.call_args_list],
+                         ['2022_02_20', '2022_02_21', '2022_02_22'])
+        sent = dict((call[0][1], call[0][0]) for call in
+                    self.downtimes_flat.send_webapi.call_args_list)
+        self.assertEqual(sent['2022-02-20'], [])
+        self.assertEqual(len(sent['2022-02-21']), 16)
+        self.assertEqual(sent['2022-02-22'][0]['end_time'], '2022-02-22T19:00:00Z')
+        metrics = self.downtimes_flat.metrics
+        self.assertEqual(metrics.records, {'downtimes': 16 + len(sent['2022-02-22'])})
+        self.assertEqual(sorted(metrics.timings.keys()),
+                         ['fetch', 'json', 'parse', 'run', 'state', 'webapi'])
+
+    @mock.patch('argo_connectors.tasks.flat_downtimes.write_json')
+    @mock.patch('argo_connectors.tasks.flat_downtimes.write_state')
+    @async_test
+    async def test_StepsBackfillDayFailed(self, mock_writestate, mock_writejson):
+        self.downtimes_flat.current_date = datetime.datetime(2022, 2, 20)
+        self.downtimes_flat.end_date = datetime.datetime(2022, 2, 22)
+        with open('tests/sample-downtimes.csv', encoding='utf-8') as feed_file:
+            downtimes = feed_file.read()
+        self.downtimes_flat.fetch_data = mock.AsyncMock(return_value=downtimes)
+
+        async def send_webapi(dts, targetdate):
+            if targetdate == '2022-02-21':
+                raise ConnectorHttpError('webapi failed')
+        self.downtimes_flat.send_webapi = mock.AsyncMock(side_effect=send_webapi)
+        with self.assertRaises(ConnectorHttpError):
+            await self.downtimes_flat.run()
+        states = dict((call[0][3], call[0][4]) for call in mock_writestate.call_args_list)
+        self.assertEqual(states, {'2022_02_20': True, '2022_02_21': False,
+                                  '2022_02_22': True})
+        self.assertEqual(mock_writejson.call_count, 3)
@@ -0,0 +1,146 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+
+from argo_connectors.batch import BatchRunner, BatchJob, date_range, downtimes_window
+from argo_connectors.config import CustomerConf
+from argo_connectors.exceptions import ConnectorError, ConnectorHttpError
+from argo_connectors.log import Logger
+from argo_connectors.tasks.builders import get_bdii_opts, get_feed_labels, get_topology_feeds
+
+logger = Logger('test_batch.py')
+
+CUSTOMER_CONF = """[CUSTOMER_{name}]
+Name = {name}
+OutputDir = {outputdir}
+Jobs = JOB_Critical
+TopoFetchType = Sites
+TopoType = GOCDB
+
+[JOB_Critical]
+Dirname = Critical
+Profiles = ARGO_MON_CRITICAL
+"""
+
+
+class FakeTask(object):
+    def __init__(self, stats, exc=None):
+        self.stats = stats
+        self.exc = exc
+
+    async def run(self):
+        self.stats['running'] += 1
+        self.stats['max'] = max(self.stats['max'], self.stats['running'])
+        await asyncio.sleep(0.01)
+        self.stats['running'] -= 1
+        if self.exc:
+            raise self.exc
+
+
+class BatchRunnerTest(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.dirpath = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(asyncio.new_event_loop())
+        shutil.rmtree(self.dirpath)
+
+    def test_dateRange(self):
+        self.assertEqual(date_range('2023-02-27', '2023-03-01'),
+                         ['2023-02-27', '2023-02-28', '2023-03-01'])
+        self.assertEqual(date_range('2023-01-01', '2023-01-01'), ['2023-01-01'])
+        self.assertRaises(ValueError, date_range, '2023-01-02', '2023-01-01')
+
+    def test_downtimesWindow(self):
+        start, end, timestamp = downtimes_window('2023-01-15')
+        self.assertEqual(start.isoformat(), '2023-01-15T00:00:00')
+        self.assertEqual(end.isoformat(), '2023-01-15T23:59:59')
+        self.assertEqual(timestamp, '2023_01_15')
+
+    def test_customerConfPerInstance(self):
+        confs = list()
+        for name in ['CUSTFOO', 'CUSTBAR']:
+            path = os.path.join(self.dirpath, '{}.conf'.format(name))
+            with open(path, 'w') as fp:
+                fp.write(CUSTOMER_CONF.format(name=name, outputdir=self.dirpath))
+            confcust = CustomerConf('downtimes-gocdb-connector.py', path)
+            confcust.parse()
+            confs.append(confcust)
+        self.assertEqual([confcust.get_custname() for confcust in confs],
+                         ['CUSTFOO', 'CUSTBAR'])
+        self.assertEqual(list(confs[0].get_customers()), ['CUSTOMER_CUSTFOO'])
+
+    def test_runConcurrencyLimit(self):
+        stats = {'running': 0, 'max': 0}
+        failed = list()
+
+        def fail(i):
+            async def write_failed():
+                failed.append(i)
+            return write_failed
+
+        runner = BatchRunner(self.loop, concurrency=3)
+        for i in range(10):
+            exc = None
+            if i == 4:
+                exc = ConnectorHttpError()
+            elif i == 7:
+                exc = SystemExit(1)
+            runner.jobs.append(BatchJob(logger, FakeTask(stats, exc), fail(i)))
+
+        self.assertEqual(self.loop.run_until_complete(runner.run()), 2)
+        self.assertEqual(stats['max'], 3)
+        self.assertEqual(sorted(failed), [4, 7])
+
+
+class TaskBuilders(unittest.TestCase):
+    def setUp(self):
+        self.dirpath = tempfile.mkdtemp()
+        self.path = os.path.join(self.dirpath, 'customer.conf')
+
+    def tearDown(self):
+        shutil.rmtree(self.dirpath)
+
+    def confcust(self, extra=''):
+        with open(self.path, 'w') as fp:
+            fp.write(CUSTOMER_CONF.format(name='CUSTFOO', outputdir=self.dirpath)
+                     .replace('TopoType = GOCDB', 'TopoType = GOCDB\n' + extra))
+        confcust = CustomerConf('topology-gocdb-connector.py', self.path)
+        confcust.parse()
+        return confcust
+
+    def test_bdiiOpts(self):
+        self.assertIsNone(get_bdii_opts(self.confcust()))
+        confcust = self.confcust('BDII = True\nBDIIHost = bdii.foo\n')
+        self.assertRaises(ConnectorError, get_bdii_opts, confcust)
+
+    def test_topologyFeeds(self):
+        confcust = self.confcust('TopoFeedServiceEndpoints = https://goc.foo/endpoints\n'
+                                 'TopoFeedServiceGroups = https://goc.foo/groups\n'
+                                 'TopoFeedSites = https://goc.foo/sites\n')
+        self.assertEqual(get_topology_feeds(confcust)[2], 'https://goc.foo/sites')
+        confcust = self.confcust('TopoFeedServiceEndpoints = https://goc.foo/endpoints\n'
+                                 'TopoFeedServiceGroups = https://goc.foo/groups\n'
+                                 'TopoFeedSites = https://goc.foo/sites\n'
+                                 'TopoScope = &scope=EGI\n')
+        self.assertEqual(get_topology_feeds(confcust),
+                         ['https://goc.foo/endpoints&scope=EGI',
+                          'https://goc.foo/groups&scope=EGI',
+                          'https://goc.foo/sites&scope=EGI'])
+
+    def test_feedLabels(self):
+        confcust = self.confcust()
+        jobcust = [('JOB_Critical', 'CUSTOMER_CUSTFOO'),
+                   ('JOB_Other', 'CUSTOMER_CUSTFOO')]
+        jobs, customers = get_feed_labels(confcust, jobcust)
+        self.assertEqual(customers, 'CUSTFOO')
+        self.assertIn(jobs, ['(JOB_Critical,JOB_Other)', '(JOB_Other,JOB_Critical)'])
+
+
+if __name__ == '__main__':
+    unittest.main()
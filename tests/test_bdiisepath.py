@@ -1,10 +1,19 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import time
 import unittest
 import json
 
 import mock
 
+from argo_connectors.exceptions import ConnectorHttpError
+from argo_connectors.io.ldap import LDAPSessionWithRetry
+from argo_connectors.io.ldapcache import LDAPSnapshotCache, build_ldap_cache
 from argo_connectors.log import Logger
-from argo_connectors.mesh.storage_element_path import attach_sepath_topodata
+from argo_connectors.mesh.srm_port import SrmPortMap, attach_srmport_topodata
+from argo_connectors.mesh.storage_element_path import attach_sepath_topodata, build_map_endpoint_path, EndpointPathMap
 
 from bonsai import LDAPEntry
 
@@ -172,6 +181,219 @@ class MeshSePathAndTopodata(unittest.TestCase):
                 'type': 'SITES'
             }])
 
+    def test_buildMapSkipsBrokenEntry(self):
+        broken = LDAPEntry('GlueVOInfoLocalID=ops,GlueSALocalID=ops,GlueSEUniqueID=se.foo,o=grid')
+        broken['GlueVOInfoAccessControlBaseRule'] = ['VO:ops']
+        broken['GlueVOInfoPath'] = []
+        mapping = build_map_endpoint_path(logger, [broken] + self.sample_ldap)
+        self.assertNotIn('se.foo', mapping)
+        self.assertEqual(mapping['grid-se.physik.uni-wuppertal.de'], [
+            {'voname': 'ops', 'GlueVOInfoPath': '/pnfs/physik.uni-wuppertal.de/data/ops'},
+            {'voname': 'dteam', 'GlueVOInfoPath': '/pnfs/physik.uni-wuppertal.de/data/dteam'}
+        ])
+        self.assertEqual(mapping['se02.esc.qmul.ac.uk'], [
+            {'voname': 'ops', 'GlueVOInfoPath': '/info'},
+            {'voname': 'dteam', 'GlueVOInfoPath': '/info'}
+        ])
+
+
+class AsyncPages(object):
+    def __init__(self, entries, exc=None):
+        self.entries = iter(entries)
+        self.exc = exc
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await asyncio.sleep(0)
+        try:
+            return next(self.entries)
+        except StopIteration:
+            if self.exc:
+                raise self.exc
+            raise StopAsyncIteration
+
+
+class LDAPStreamedSearch(unittest.TestCase):
+    def setUp(self):
+        logger.customer = CUSTOMER_NAME
+        self.loop = asyncio.get_event_loop()
+        with open('tests/sample-bdii_sepaths.json') as fh:
+            self.sample_ldap = json.loads(fh.read())
+        self.conn = mock.Mock(closed=False)
+        self.client = mock.Mock()
+        self.client.connect = mock.AsyncMock(return_value=self.conn)
+
+    def consume(self, session, ldapmap, filter='(objectClass=GlueSATop)'):
+        async def stream():
+            async for entry in session.search_iter('bdii.foo', '2170', 'o=grid',
+                                                   filter, ['GlueVOInfoPath']):
+                ldapmap.add(entry)
+            return ldapmap
+        return self.loop.run_until_complete(stream())
+
+    @mock.patch('argo_connectors.io.ldap.bonsai.LDAPClient')
+    def test_pagedSearchReusedConnection(self, mock_client):
+        mock_client.return_value = self.client
+        srm = LDAPEntry('GlueServiceUniqueID=httpg://se.foo:8446/srm/managerv2,o=grid')
+        srm['GlueServiceEndpoint'] = ['httpg://se.foo:8446/srm/managerv2']
+        self.conn.paged_search = mock.AsyncMock(side_effect=[
+            ConnectorHttpError('first page timeout'),
+            AsyncPages(self.sample_ldap), AsyncPages([srm])
+        ])
+        session = LDAPSessionWithRetry(logger, 3, 0, 10, page_size=2)
+        sepaths = self.consume(session, EndpointPathMap(logger))
+        srmports = self.consume(session, SrmPortMap(logger, 'GlueServiceEndpoint'),
+                                '(objectClass=GlueService)')
+        session.close()
+        self.assertEqual(sepaths.mapping, build_map_endpoint_path(logger, self.sample_ldap))
+        self.assertEqual(srmports.ports, {'se.foo': '8446'})
+        # broken connection is replaced only once and reused afterwards
+        self.assertEqual(self.client.connect.call_count, 2)
+        self.assertEqual(self.conn.paged_search.call_args[1]['page_size'], 2)
+        endpoints = [{'hostname': 'se.foo', 'service': 'SRM', 'tags': {}}]
+        attach_srmport_topodata(logger, 'GlueServiceEndpoint', srmports, endpoints)
+        self.assertEqual(endpoints[0]['tags'], {'info_bdii_SRM2_PORT': '8446'})
+
+    @mock.patch('argo_connectors.io.ldap.bonsai.LDAPClient')
+    def test_failedSearch(self, mock_client):
+        mock_client.return_value = self.client
+        self.conn.paged_search = mock.AsyncMock(side_effect=ConnectorHttpError('timeout'))
+        session = LDAPSessionWithRetry(logger, 2, 0, 10)
+        with self.assertRaises(ConnectorHttpError):
+            self.consume(session, EndpointPathMap(logger))
+        self.assertEqual(self.conn.paged_search.call_count, 2)
+
+        # failure after entries started to arrive is retried on a new
+        # connection skipping entries already handed over
+        self.conn.paged_search = mock.AsyncMock(side_effect=[
+            AsyncPages(self.sample_ldap[:1], ValueError('page lost')),
+            AsyncPages(self.sample_ldap)
+        ])
+        entries = list()
+
+        async def collect():
+            async for entry in session.search_iter('bdii.foo', '2170', 'o=grid',
+                                                   '(objectClass=GlueSATop)', ['GlueVOInfoPath']):
+                entries.append(entry)
+        self.loop.run_until_complete(collect())
+        self.assertEqual(self.conn.paged_search.call_count, 2)
+        self.assertEqual(entries, self.sample_ldap)
+
+    @mock.patch('argo_connectors.io.ldap.bonsai.LDAPClient')
+    def test_concurrentSearchFailed(self, mock_client):
+        srms = list()
+        for host in ['se.foo', 'se.bar', 'se.baz']:
+            srm = LDAPEntry('GlueServiceUniqueID=httpg://{}:8446/srm/managerv2,o=grid'.format(host))
+            srm['GlueServiceEndpoint'] = ['httpg://{}:8446/srm/managerv2'.format(host)]
+            srms.append(srm)
+        srmports = SrmPortMap(logger, 'GlueServiceEndpoint')
+        closed = list()
+        shared = mock.Mock(closed=False)
+        shared.paged_search = mock.AsyncMock(side_effect=[
+            AsyncPages(self.sample_ldap[:1], ValueError('page lost')),
+            AsyncPages(srms)
+        ])
+        shared.close = mock.Mock(side_effect=lambda: closed.append(len(srmports.ports)))
+        self.conn.paged_search = mock.AsyncMock(return_value=AsyncPages(self.sample_ldap))
+        self.client.connect = mock.AsyncMock(side_effect=[shared, self.conn])
+        mock_client.return_value = self.client
+        session = LDAPSessionWithRetry(logger, 2, 0, 10)
+
+        async def run():
+            sepaths = EndpointPathMap(logger)
+
+            async def stream(mapping, filter):
+                async for entry in session.search_iter('bdii.foo', '2170', 'o=grid',
+                                                       filter, ['GlueVOInfoPath']):
+                    mapping.add(entry)
+            await asyncio.gather(stream(sepaths, '(objectClass=GlueSATop)'),
+                                 stream(srmports, '(objectClass=GlueService)'))
+            return sepaths
+
+        sepaths = self.loop.run_until_complete(run())
+        session.close()
+        self.assertEqual(sepaths.mapping, build_map_endpoint_path(logger, self.sample_ldap))
+        self.assertEqual(len(srmports.ports), 3)
+        # failed search did not close connection other one was reading from
+        self.assertEqual(closed, [3])
+        self.assertEqual(self.client.connect.call_count, 2)
+        self.conn.close.assert_called_once_with()
+
+
+class LDAPSnapshots(unittest.TestCase):
+    def setUp(self):
+        logger.customer = CUSTOMER_NAME
+        self.dirpath = tempfile.mkdtemp()
+        with open('tests/sample-bdii_sepaths.json') as fh:
+            self.sample_ldap = json.loads(fh.read())
+        self.query = ('bdii.foo', '2170', 'o=grid', '(objectClass=GlueSATop)',
+                      ['GlueVOInfoAccessControlBaseRule', 'GlueVOInfoPath'])
+
+    def tearDown(self):
+        shutil.rmtree(self.dirpath)
+
+    def entries(self):
+        entries = list()
+        for res in self.sample_ldap:
+            entry = LDAPEntry(res['dn'])
+            for attr in ['GlueVOInfoAccessControlBaseRule', 'GlueVOInfoPath']:
+                if attr in res:
+                    entry[attr] = res[attr]
+            entries.append(entry)
+        return entries
+
+    def test_storeAndLookup(self):
+        cache = LDAPSnapshotCache(self.dirpath, ttl=60, max_stale=60)
+        key = cache.key(*self.query)
+        self.assertNotEqual(key, cache.key(*self.query[:3], '(objectClass=GlueService)',
+                                           self.query[4]))
+        self.assertIsNone(cache.lookup(key))
+        cache.store(key, self.entries())
+        entries, fresh = cache.lookup(key)
+        self.assertTrue(fresh)
+        self.assertEqual(build_map_endpoint_path(logger, entries),
+                         build_map_endpoint_path(logger, self.entries()))
+
+        # stale snapshot is still served until max_stale passes
+        path = os.path.join(self.dirpath, key + '.json.z')
+        os.utime(path, (time.time() - 90, time.time() - 90))
+        entries, fresh = cache.lookup(key)
+        self.assertFalse(fresh)
+        self.assertEqual(len(entries), len(self.sample_ldap))
+        os.utime(path, (time.time() - 121, time.time() - 121))
+        self.assertIsNone(cache.lookup(key))
+
+    def test_writerBatches(self):
+        cache = LDAPSnapshotCache(self.dirpath, ttl=60, max_stale=60)
+        key = cache.key(*self.query)
+        cache.store(key, self.entries()[:1])
+        writer = cache.writer(key)
+        writer.write(self.entries()[:2])
+        writer.write(self.entries()[2:])
+        # unfinished snapshot never replaces previous one
+        self.assertEqual(len(cache.lookup(key)[0]), 1)
+        writer.close()
+        entries, fresh = cache.lookup(key)
+        self.assertEqual(len(entries), len(self.sample_ldap))
+        self.assertEqual(build_map_endpoint_path(logger, entries),
+                         build_map_endpoint_path(logger, self.entries()))
+
+        writer = cache.writer(key)
+        writer.write(self.entries()[:1])
+        writer.abort()
+        self.assertEqual(len(cache.lookup(key)[0]), len(self.sample_ldap))
+        self.assertEqual(os.listdir(self.dirpath), [key + '.json.z'])
+
+    def test_buildLdapCache(self):
+        self.assertIsNone(build_ldap_cache({'inputstatesavedir': self.dirpath}))
+        cache = build_ldap_cache({'inputstatesavedir': self.dirpath,
+                                  'cachebdii': 'True', 'cachebdiittl': '600'})
+        self.assertEqual(cache.dirpath, os.path.join(self.dirpath, 'ldapcache'))
+        self.assertEqual(cache.ttl, 600.0)
+        self.assertEqual(cache.max_stale, 7 * 24 * 3600)
+
 
 if __name__ == '__main__':
     unittest.main()
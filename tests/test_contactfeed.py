@@ -3,7 +3,8 @@ import unittest
 from argo_connectors.log import Logger
 from argo_connectors.parse.gocdb_contacts import ParseSitesWithContacts, \
     ParseServiceEndpointContacts, ParseServiceGroupWithContacts, ConnectorParseError
-from argo_connectors.parse.gocdb_topology import ParseServiceEndpoints
+from argo_connectors.parse.gocdb_topology import ParseServiceEndpoints, ParseServiceGroups, ParseSites
+from argo_connectors.parse.base import XMLPages
 from argo_connectors.parse.provider_topology import ParseTopo
 from argo_connectors.parse.flat_contacts import ParseContacts as ParseFlatContacts
 from argo_connectors.parse.provider_contacts import ParseResourcesContacts, ParseProvidersContacts
@@ -30,11 +31,16 @@ class ParseSitesWithContactTest(unittest.TestCase):
             }
         )
 
+    def test_topologyContacts(self):
+        parse_sites = ParseSites(logger, self.content, CUSTOMER_NAME)
+        self.assertEqual(parse_sites.get_contacts(), self.site_contacts)
+
 
 class ParseServiceEndpointsWithContactsTest(unittest.TestCase):
     def setUp(self):
         with open('tests/sample-service_endpoint_with_contacts.xml') as feed_file:
             self.content = feed_file.read()
+        self.content_with_contacts = self.content
         logger.customer = CUSTOMER_NAME
 
         serviceendpoint_contacts = ParseServiceEndpointContacts(logger, self.content)
@@ -57,6 +63,16 @@ class ParseServiceEndpointsWithContactsTest(unittest.TestCase):
     def test_formatNoContacts(self):
         self.assertEqual(self.serviceendpoint_nocontacts, {})
 
+    def test_topologyContacts(self):
+        parse_service_endpoints = ParseServiceEndpoints(logger, self.content_with_contacts, CUSTOMER_NAME)
+        self.assertEqual(parse_service_endpoints.get_contacts(), self.serviceendpoint_contacts)
+
+    def test_formatPaginatedContacts(self):
+        pages = XMLPages([self.content_with_contacts, self.content])
+        serviceendpoint_contacts = ParseServiceEndpointContacts(logger, pages)
+        self.assertEqual(serviceendpoint_contacts.get_contacts(),
+                         self.serviceendpoint_contacts)
+
 
 class ParseServiceGroupWithContactsTest(unittest.TestCase):
     def setUp(self):
@@ -75,6 +91,10 @@ class ParseServiceGroupWithContactsTest(unittest.TestCase):
             }
         )
 
+    def test_topologyContacts(self):
+        parse_service_groups = ParseServiceGroups(logger, self.content, CUSTOMER_NAME)
+        self.assertEqual(parse_service_groups.get_contacts(), self.servicegroup_contacts)
+
 
 class ParseCsvServiceEndpointsWithContacts(unittest.TestCase):
     def setUp(self):
@@ -74,6 +74,18 @@ class ParseCsvDowntimes(unittest.TestCase):
         self.assertEqual(start_time, datetime.datetime(2022, 3, 4, 0, 0))
         self.assertEqual(end_time, datetime.datetime(2022, 3, 4, 19, 0))
 
+    def test_parseDowntimesPerDay(self):
+        start = datetime.datetime(2022, 2, 20)
+        end = datetime.datetime(2022, 3, 5)
+        days = ParseDowntimes(self.logger, self.downtimes, start, True, end).get_data_per_day()
+        self.assertEqual(len(days), 14)
+        self.assertEqual(days['2022-02-20'], [])
+        day = start
+        while day <= end:
+            downtimes = ParseDowntimes(self.logger, self.downtimes, day, True).get_data()
+            self.assertEqual(days[day.strftime('%Y-%m-%d')], downtimes)
+            day += datetime.timedelta(days=1)
+
     def test_failedParseDowntimes(self):
         date_2_21_2022 = datetime.datetime(2022, 2, 21)
         with self.assertRaises(ConnectorParseError) as cm:
@@ -31,6 +31,40 @@ class ParseGocdbDowntimes(unittest.TestCase):
         self.assertEqual(self.start, datetime.datetime(2023, 2, 21))
         self.assertEqual(self.end, datetime.datetime(2023, 2, 23))
 
+    def test_parseGocdbDowntimesChunks(self):
+        raw = self.downtimes.encode('utf-8')
+        chunks = [raw[i:i + 100] for i in range(0, len(raw), 100)]
+        expected = ParseDowntimes(self.logger, self.downtimes, self.start,
+                                  self.end, True).get_data()
+        downtimes = ParseDowntimes(self.logger, raw, self.start, self.end,
+                                   True).get_data()
+        self.assertEqual(downtimes, expected)
+        downtimes = ParseDowntimes(self.logger, chunks, self.start, self.end,
+                                   True).get_data()
+        self.assertEqual(downtimes, expected)
+
+    def test_parseGocdbDowntimesPerDay(self):
+        end = self.end.replace(hour=23, minute=59, second=59)
+        days = ParseDowntimes(self.logger, self.downtimes, self.start, end,
+                              True).get_data_per_day()
+        self.assertEqual(list(days.keys()), ['2023-02-21', '2023-02-22', '2023-02-23'])
+        for day, downtimes in days.items():
+            self.assertEqual([downtime['hostname'] for downtime in downtimes],
+                             ['mock2.foo2_567890G0', 'mock3.foo3_11111G0'])
+            self.assertEqual(downtimes[0]['start_time'], '{}T00:00:00Z'.format(day))
+            self.assertEqual(downtimes[0]['end_time'], '{}T23:59:00Z'.format(day))
+
+        start = datetime.datetime(2025, 5, 8)
+        end = datetime.datetime(2025, 5, 10, 23, 59, 59)
+        days = ParseDowntimes(self.logger, self.downtimes, start, end,
+                              False).get_data_per_day()
+        self.assertEqual(days['2025-05-09'][0],
+                         {'hostname': 'mock2.foo2', 'service': 'foo2-BDII',
+                          'start_time': '2025-05-09T00:00:00Z',
+                          'end_time': '2025-05-09T12:00:00Z'})
+        self.assertEqual(len(days['2025-05-08']), 2)
+        self.assertEqual(days['2025-05-10'], [])
+
     def test_fail_parseGocdbDowntimes(self):
         with self.assertRaises(ConnectorParseError) as cm:
             flat_downtimes = ParseDowntimes(
@@ -0,0 +1,79 @@
+import gzip
+import io
+import json
+import os
+import random
+import shutil
+import tempfile
+import unittest
+import zlib
+
+from argo_connectors.io.gzipwrite import ParallelGzipWriter, compress_threads
+from argo_connectors.io.jsonwrite import JsonWriter
+
+
+class ParallelGzip(unittest.TestCase):
+    def setUp(self):
+        rnd = random.Random(42)
+        words = [''.join(rnd.choice('abcdefgh') for _ in range(rnd.randint(2, 9)))
+                 for _ in range(300)]
+        self.data = ' '.join(rnd.choice(words) for _ in range(40000)).encode()
+
+    def compress(self, chunks, **kwargs):
+        out = io.BytesIO()
+        with ParallelGzipWriter(out, filename='/foo/group_endpoints.json.gz', **kwargs) as gz:
+            for chunk in chunks:
+                gz.write(chunk)
+        return out.getvalue()
+
+    def test_singleMember(self):
+        chunks = [self.data[i:i + 3001] for i in range(0, len(self.data), 3001)]
+        for block_size in [1024, 4096, len(self.data), 2 * len(self.data)]:
+            compressed = self.compress(chunks, threads=4, block_size=block_size,
+                                       compresslevel=6)
+            # whole stream is one gzip member with valid CRC and size
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            self.assertEqual(decompressor.decompress(compressed), self.data)
+            self.assertTrue(decompressor.eof)
+            self.assertEqual(decompressor.unused_data, b'')
+            self.assertEqual(gzip.decompress(compressed), self.data)
+        self.assertLess(len(compressed), len(self.data) / 2)
+        self.assertEqual(compressed[:4], b'\037\213\010\010')
+        self.assertIn(b'group_endpoints.json\0', compressed[:40])
+
+    def test_writeReturnsInputLength(self):
+        out = io.BytesIO()
+        with ParallelGzipWriter(out, threads=2, block_size=1024) as gz:
+            self.assertEqual(gz.write(self.data[:1000]), 1000)
+            self.assertEqual(gz.write(self.data[1000:1500]), 500)
+            self.assertEqual(gz.write(b''), 0)
+        self.assertEqual(gzip.decompress(out.getvalue()), self.data[:1500])
+
+    def test_threadsDefault(self):
+        self.assertEqual(compress_threads(), 1)
+        self.assertEqual(compress_threads(0), 1)
+        self.assertEqual(compress_threads(4), 4)
+
+    def test_emptyAndExactBlocks(self):
+        self.assertEqual(gzip.decompress(self.compress([], threads=2)), b'')
+        data = self.data[:4096]
+        self.assertEqual(gzip.decompress(self.compress([data], threads=2,
+                                                       block_size=1024)), data)
+
+    def test_jsonWriter(self):
+        dirpath = tempfile.mkdtemp()
+        try:
+            data = [{'hostname': 'host{}.foo'.format(i), 'tags': {'info_ID': str(i)}}
+                    for i in range(20000)]
+            filename = os.path.join(dirpath, 'group_endpoints.json')
+            writer = JsonWriter(data, filename, 'True', compress_threads=3)
+            self.assertEqual(writer.write_json(), (True, None))
+            with gzip.open(filename + '.gz', 'rt') as fp:
+                self.assertEqual(fp.read(), json.dumps(data, indent=4))
+            self.assertEqual(os.listdir(dirpath), ['group_endpoints.json.gz'])
+        finally:
+            shutil.rmtree(dirpath)
+
+
+if __name__ == '__main__':
+    unittest.main()
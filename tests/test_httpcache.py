@@ -0,0 +1,156 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from argo_connectors.io.http import SessionWithRetry, close_sessions
+from argo_connectors.io.httpcache import HttpCache, build_http_cache
+from argo_connectors.log import Logger
+
+logger = Logger('test_httpcache.py')
+CUSTOMER_NAME = 'CUSTOMERFOO'
+
+
+class mockHttpFeed(mock.AsyncMock):
+    async def __aenter__(self, *args, **kwargs):
+        mock_obj = mock.AsyncMock()
+        mock_obj.status = 200
+        mock_obj.headers = {'ETag': '"v1"'}
+        mock_obj.read.return_value = b'<results>cached</results>'
+        mock_obj.get_encoding = mock.Mock(return_value='utf-8')
+        return mock_obj
+    async def __aexit__(self, *args, **kwargs):
+        pass
+
+
+class mockHttpNotModified(mock.AsyncMock):
+    async def __aenter__(self, *args, **kwargs):
+        mock_obj = mock.AsyncMock()
+        mock_obj.status = 304
+        mock_obj.headers = {'ETag': '"v1"'}
+        return mock_obj
+    async def __aexit__(self, *args, **kwargs):
+        pass
+
+
+class mockHttpForbidden(mock.AsyncMock):
+    async def __aenter__(self, *args, **kwargs):
+        mock_obj = mock.AsyncMock()
+        mock_obj.status = 403
+        mock_obj.headers = {'ETag': '"v1"'}
+        mock_obj.read.return_value = b'<error>forbidden</error>'
+        mock_obj.get_encoding = mock.Mock(return_value='utf-8')
+        return mock_obj
+    async def __aexit__(self, *args, **kwargs):
+        pass
+
+
+class HttpCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.dirpath = tempfile.mkdtemp()
+        self.cache = HttpCache(self.dirpath, max_age=0, max_size=100)
+
+    def tearDown(self):
+        shutil.rmtree(self.dirpath)
+
+    def test_storeLookup(self):
+        key = self.cache.key('https://goc.egi.eu/gocdbpi/?method=get_site', 'user')
+        self.assertNotEqual(key, self.cache.key('https://goc.egi.eu/gocdbpi/?method=get_site', 'other'))
+        self.assertIsNone(self.cache.lookup(key))
+        self.cache.store(key, b'body', {'ETag': '"v1"', 'Last-Modified': 'Wed, 21 Oct 2015 07:28:00 GMT'})
+        entry = self.cache.lookup(key)
+        self.assertEqual(entry.body(), b'body')
+        self.assertFalse(entry.is_fresh())
+        self.assertEqual(entry.validators(), {'If-None-Match': '"v1"',
+                                              'If-Modified-Since': 'Wed, 21 Oct 2015 07:28:00 GMT'})
+
+    def test_noValidators(self):
+        key = self.cache.key('https://goc.egi.eu/')
+        self.cache.store(key, b'body', {})
+        self.assertIsNone(self.cache.lookup(key))
+
+    def test_noStore(self):
+        cache = HttpCache(self.dirpath, max_age=60)
+        key = cache.key('https://goc.egi.eu/')
+        cache.store(key, b'body', {'ETag': '"v1"', 'Cache-Control': 'private, No-Store'})
+        self.assertIsNone(cache.lookup(key))
+        cache.store(key, b'body', {'Cache-Control': 'max-age=60'})
+        self.assertTrue(cache.lookup(key).is_fresh())
+
+    def test_evict(self):
+        keys = [self.cache.key('https://goc.egi.eu/{}'.format(i)) for i in range(3)]
+        for i, key in enumerate(keys):
+            self.cache.store(key, b'x' * 40, {'ETag': str(i)})
+            os.utime(os.path.join(self.dirpath, key + '.body'), (i, i))
+        self.cache.store(keys[2], b'x' * 40, {'ETag': '2'})
+        self.assertIsNone(self.cache.lookup(keys[0]))
+        self.assertIsNotNone(self.cache.lookup(keys[1]))
+        self.assertIsNotNone(self.cache.lookup(keys[2]))
+
+    def test_buildHttpCache(self):
+        self.assertIsNone(build_http_cache({'inputstatesavedir': self.dirpath}))
+        cache = build_http_cache({'inputstatesavedir': self.dirpath,
+                                  'cachehttp': 'True',
+                                  'cachehttpmaxage': '60'})
+        self.assertEqual(cache.dirpath, os.path.join(self.dirpath, 'httpcache'))
+        self.assertEqual(cache.max_age, 60)
+
+
+class HttpCacheSessionTest(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.dirpath = tempfile.mkdtemp()
+        logger.customer = CUSTOMER_NAME
+        self.globopts = {
+            'connectionretry': '1', 'connectiontimeout': '180',
+            'connectionsleepretry': '1', 'connectionretryrandom': 'False',
+            'inputstatesavedir': self.dirpath, 'cachehttp': 'True'
+        }
+        self.session = SessionWithRetry(logger, 'test_httpcache.py',
+                                        self.globopts, use_cache=True)
+
+    def tearDown(self):
+        self.loop.run_until_complete(close_sessions())
+        self.loop.close()
+        asyncio.set_event_loop(asyncio.new_event_loop())
+        shutil.rmtree(self.dirpath)
+
+    @mock.patch('aiohttp.ClientSession.get')
+    def test_notModified(self, mocked_get):
+        url = 'https://goc.egi.eu/gocdbpi/?method=get_site'
+        mocked_get.side_effect = mockHttpFeed
+        res = self.loop.run_until_complete(self.session.http_get(url))
+        self.assertEqual(res, '<results>cached</results>')
+        self.assertNotIn('If-None-Match', mocked_get.call_args[1]['headers'] or {})
+
+        mocked_get.side_effect = mockHttpNotModified
+        res = self.loop.run_until_complete(self.session.http_get_bytes(url))
+        self.assertEqual(res, b'<results>cached</results>')
+        self.assertEqual(mocked_get.call_args[1]['headers']['If-None-Match'], '"v1"')
+
+    @mock.patch('aiohttp.ClientSession.get', side_effect=mockHttpFeed)
+    def test_fresh(self, mocked_get):
+        url = 'https://goc.egi.eu/gocdbpi/?method=get_site'
+        self.session.http_cache = HttpCache(self.dirpath, max_age=60)
+        self.loop.run_until_complete(self.session.http_get(url))
+        res = self.loop.run_until_complete(self.session.http_get(url))
+        self.assertEqual(res, '<results>cached</results>')
+        self.assertEqual(mocked_get.call_count, 1)
+
+    @mock.patch('aiohttp.ClientSession.get', side_effect=mockHttpForbidden)
+    def test_errorNotStored(self, mocked_get):
+        url = 'https://goc.egi.eu/gocdbpi/?method=get_site'
+        self.session.http_cache = HttpCache(self.dirpath, max_age=60)
+        for _ in range(2):
+            res = self.loop.run_until_complete(self.session.http_get(url))
+            self.assertEqual(res, '<error>forbidden</error>')
+        self.assertEqual(mocked_get.call_count, 2)
+        self.assertEqual(os.listdir(self.dirpath), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,10 @@
 import unittest
+import gzip
 import json
-from unittest.mock import mock_open, patch, Mock
+from unittest.mock import patch, Mock
 import os
 
-from argo_connectors.io.jsonwrite import JsonWriter
+from argo_connectors.io.jsonwrite import JsonWriter, build_json_opts
 
 mock_json = [
     {
@@ -36,33 +37,80 @@ class TestJsonWriter(unittest.TestCase):
             os.remove(mock_filename)   
 
 
-    def test_write_compressed_json(self):
-        with patch('gzip.open', mock_open()) as m:
-            data_writer = JsonWriter(mock_json, 'mock_file.json', 'True')
-            data_writer.write_json()    
-
-
-        m.assert_called_once_with('mock_file.json.gz', 'wb')
-        handle = m()
-        handle.write.assert_called_once_with(
-            b'[\n    {\n        "type": "NGI",\n        "group": "iris.ac.uk",\n        "subgroup": "dirac-durham",\n        "tags": {\n            "certification": "Certified",\n            "scope": "iris.ac.uk",\n            "infrastructure": "Production"\n        },\n        "notifications": {\n            "contacts": [\n                "a.g.basden@durham.ac.uk"\n            ],\n            "enabled": "true"\n        }\n    }\n]')
-
+    @patch('argo_connectors.io.jsonwrite.ParallelGzipWriter')
+    def test_write_compressed_json(self, mock_parallelgzip):
         writer = JsonWriter(mock_json, 'mock_file.json', 'True')
         success, error = writer.write_json()
 
+        # single threaded gzip unless more compress threads are set
+        self.assertFalse(mock_parallelgzip.called)
+
         self.assertTrue(success)
         self.assertIsNone(error)
+        self.assertFalse(os.path.exists(mock_filename))
+        with gzip.open(mock_filename + '.gz', 'rb') as fp:
+            self.assertEqual(fp.read(), json.dumps(mock_json, indent=4).encode())
+        with open(mock_filename + '.gz', 'rb') as fp:
+            # original filename is kept in gzip header
+            self.assertIn(b'mock_file.json\0', fp.read(64))
 
 
     def test_write_json(self):
-        with patch('builtins.open', mock_open()) as m:
-            data_writer = JsonWriter(mock_json, 'mock_file.json', 'False')
-            data_writer.write_json()
-
-        m.assert_called_once_with('mock_file.json', 'w')
-        handle = m()
-        handle.write.assert_called_once_with(
-            '[\n    {\n        "type": "NGI",\n        "group": "iris.ac.uk",\n        "subgroup": "dirac-durham",\n        "tags": {\n            "certification": "Certified",\n            "scope": "iris.ac.uk",\n            "infrastructure": "Production"\n        },\n        "notifications": {\n            "contacts": [\n                "a.g.basden@durham.ac.uk"\n            ],\n            "enabled": "true"\n        }\n    }\n]')
+        data = mock_json * 3 + [{'type': 'SITES', 'tags': {'info_URL': 'https://foo.bar/\n'}}]
+        writer = JsonWriter(data, 'mock_file.json', 'False')
+        self.assertEqual(writer.write_json(), (True, None))
+
+        with open(mock_filename) as fp:
+            self.assertEqual(fp.read(), json.dumps(data, indent=4))
+
+        for batch in [1, 3]:
+            with patch('argo_connectors.io.jsonwrite.ENCODE_BATCH', batch):
+                JsonWriter(data, 'mock_file.json', 'False').write_json()
+                with open(mock_filename) as fp:
+                    self.assertEqual(fp.read(), json.dumps(data, indent=4))
+                JsonWriter(data, 'mock_file.json', 'False', compact=True).write_json()
+                with open(mock_filename) as fp:
+                    self.assertEqual(fp.read(), json.dumps(data, separators=(',', ':')))
+
+        for data in [[], {'foo': ['bar']}]:
+            JsonWriter(data, 'mock_file.json', 'False').write_json()
+            with open(mock_filename) as fp:
+                self.assertEqual(fp.read(), json.dumps(data, indent=4))
+
+
+    def test_write_compact_json(self):
+        writer = JsonWriter(mock_json * 2, 'mock_file.json', 'True',
+                            compact=True, compress_level=1)
+        self.assertEqual(writer.write_json(), (True, None))
+
+        with gzip.open(mock_filename + '.gz', 'rt') as fp:
+            content = fp.read()
+        self.assertEqual(content, json.dumps(mock_json * 2, separators=(',', ':')))
+        self.assertEqual(json.loads(content), mock_json * 2)
+
+
+    def test_write_json_atomic(self):
+        with open(mock_filename, 'w') as fp:
+            fp.write('previous')
+
+        with patch('argo_connectors.io.jsonwrite.ENCODE_BATCH', 1):
+            with patch('json.dumps', Mock(side_effect=['[{"type": "NGI"}]', TypeError('Mocked error')])):
+                writer = JsonWriter(mock_json * 2, mock_filename, 'False')
+                success, error = writer.write_json()
+
+        self.assertFalse(success)
+        self.assertEqual(str(error), 'Mocked error')
+        with open(mock_filename) as fp:
+            self.assertEqual(fp.read(), 'previous')
+        self.assertEqual([name for name in os.listdir('.') if name.endswith('.tmp')], [])
+
+
+    def test_build_json_opts(self):
+        self.assertEqual(build_json_opts({}), dict(compact=False, compress_level=6,
+                                                   compress_threads=None))
+        self.assertEqual(build_json_opts({'jsoncompact': 'True', 'jsoncompresslevel': '1',
+                                          'jsoncompressthreads': '2'}),
+                         dict(compact=True, compress_level=1, compress_threads=2))
 
 
     def test_fail_jsonwrite(self):
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import mock
+
+from argo_connectors.metrics import TaskMetrics, instrumented, metrics_filename, write_metrics
+
+
+CUSTOMER_NAME = 'CUSTOMERFOO'
+
+
+class Task(object):
+    def __init__(self, logger, globopts, fail=None):
+        self.logger = logger
+        self.connector_name = '/usr/libexec/argo-connectors/topology-gocdb-connector.py'
+        self.globopts = globopts
+        self.metrics = TaskMetrics()
+        self.fail = fail
+
+    @instrumented
+    async def run(self):
+        with self.metrics.timer('fetch'):
+            await asyncio.sleep(0.01)
+        self.metrics.fetched([b'<xml>', b'</xml>'])
+        self.metrics.fetched('{}')
+        self.metrics.add_records('group_endpoints', 3)
+        if self.fail:
+            raise self.fail
+        return 'done'
+
+
+class Metrics(unittest.TestCase):
+    def setUp(self):
+        self.dirpath = tempfile.mkdtemp()
+        self.logger = mock.Mock()
+        self.logger.customer = CUSTOMER_NAME
+        self.loop = asyncio.get_event_loop()
+        self.globopts = {
+            'metricsprometheus': 'True',
+            'metricsprometheusdir': os.path.join(self.dirpath, 'prom'),
+            'metricssummary': 'True',
+            'metricssummarydir': os.path.join(self.dirpath, 'summary')
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.dirpath)
+
+    def test_timersAndCounters(self):
+        metrics = TaskMetrics()
+        for _ in range(2):
+            with metrics.timer('parse'):
+                time.sleep(0.01)
+        with self.assertRaises(ValueError):
+            with metrics.timer('mesh'):
+                raise ValueError('mesh failed')
+        metrics.add_time('json', 0.5)
+        metrics.count('failures')
+        metrics.add_records('downtimes', 2)
+        metrics.add_records('downtimes', 3)
+
+        self.assertGreaterEqual(metrics.timings['parse'], 0.02)
+        self.assertIn('mesh', metrics.timings)
+        self.assertEqual(metrics.timings['json'], 0.5)
+        self.assertEqual(metrics.counters, {'failures': 1})
+        self.assertEqual(metrics.records, {'downtimes': 5})
+
+    def test_prometheus(self):
+        metrics = TaskMetrics()
+        metrics.add_time('fetch', 1.5)
+        metrics.add_records('group_groups', 7)
+        metrics.fetched(b'x' * 10)
+        content = metrics.prometheus('topology-gocdb-connector', 'FOO "BAR"', True)
+        lines = content.splitlines()
+
+        labels = 'connector="topology-gocdb-connector",customer="FOO \\"BAR\\""'
+        self.assertIn('# TYPE argo_connectors_phase_seconds gauge', lines)
+        self.assertIn('argo_connectors_phase_seconds{%s,phase="fetch"} 1.500000' % labels, lines)
+        self.assertIn('argo_connectors_records{%s,kind="group_groups"} 7' % labels, lines)
+        self.assertIn('argo_connectors_fetched_bytes{%s} 10' % labels, lines)
+        self.assertIn('argo_connectors_fetches{%s} 1' % labels, lines)
+        self.assertIn('argo_connectors_last_run_success{%s} 1' % labels, lines)
+        self.assertTrue(content.endswith('\n'))
+
+    def test_instrumentedRun(self):
+        task = Task(self.logger, self.globopts)
+        self.assertEqual(self.loop.run_until_complete(task.run()), 'done')
+
+        filename = metrics_filename('topology-gocdb-connector', CUSTOMER_NAME, '.json')
+        self.assertEqual(filename, 'topology-gocdb-connector_CUSTOMERFOO.json')
+        with open(os.path.join(self.dirpath, 'summary', filename)) as fp:
+            summary = json.load(fp)
+        self.assertEqual(summary['connector'], 'topology-gocdb-connector')
+        self.assertEqual(summary['customer'], CUSTOMER_NAME)
+        self.assertTrue(summary['success'])
+        self.assertEqual(sorted(summary['phases'].keys()), ['fetch', 'run'])
+        self.assertGreaterEqual(summary['phases']['run'], summary['phases']['fetch'])
+        self.assertEqual(summary['records'], {'group_endpoints': 3})
+        self.assertEqual(summary['counters'], {'fetched_bytes': 13, 'fetches': 2})
+
+        with open(os.path.join(self.dirpath, 'prom',
+                               'topology-gocdb-connector_CUSTOMERFOO.prom')) as fp:
+            self.assertIn('argo_connectors_fetched_bytes{connector="topology-gocdb-connector",'
+                          'customer="CUSTOMERFOO"} 13', fp.read())
+        self.assertFalse(self.logger.warn.called)
+
+    def test_instrumentedFailedRun(self):
+        task = Task(self.logger, self.globopts, fail=SystemExit(1))
+        with self.assertRaises(SystemExit):
+            self.loop.run_until_complete(task.run())
+        with open(os.path.join(self.dirpath, 'summary',
+                               'topology-gocdb-connector_CUSTOMERFOO.json')) as fp:
+            summary = json.load(fp)
+        self.assertFalse(summary['success'])
+        self.assertIn('run', summary['phases'])
+
+    def test_writeDisabledOrFailed(self):
+        metrics = TaskMetrics()
+        write_metrics(self.logger, metrics, 'weights-vapor-connector.py', {})
+        write_metrics(self.logger, metrics, 'weights-vapor-connector.py', mock.MagicMock())
+        self.assertEqual(os.listdir(self.dirpath), [])
+
+        blocker = os.path.join(self.dirpath, 'file')
+        open(blocker, 'w').close()
+        write_metrics(self.logger, metrics, 'weights-vapor-connector.py',
+                      {'metricssummary': 'True', 'metricssummarydir': blocker})
+        self.assertTrue(self.logger.warn.called)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+try:
+    import fastavro
+except ImportError:
+    fastavro = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+from argo_connectors.io.avrowrite import AvroWriter
+from argo_connectors.io.msgpackwrite import MsgpackWriter
+from argo_connectors.io.outputwrite import build_writer, output_filename, write_output
+from argo_connectors.records import GroupEndpoint, GroupGroup
+
+
+class OutputFormats(unittest.TestCase):
+    def setUp(self):
+        self.dirpath = tempfile.mkdtemp()
+        self.group_endpoints = [
+            GroupEndpoint(type='SITES', group='SITE_A', service='SRM', hostname='se.foo',
+                          notifications={'contacts': ['admin@foo'], 'enabled': True},
+                          tags={'monitored': '1', 'info_ID': '1G0'}),
+            GroupEndpoint(type='SITES', group='SITE_B', service='CREAM-CE',
+                          hostname='ce.bar', tags={'monitored': '1'})
+        ]
+        self.group_groups = [
+            GroupGroup(type='NGI', group='NGI_FOO', subgroup='SITE_A',
+                       tags={'certification': 'Certified', 'scope': 'EGI'})
+        ]
+        self.downtimes = [{'hostname': 'se.foo', 'service': 'SRM',
+                           'start_time': '2023-01-01T00:00:00Z',
+                           'end_time': '2023-01-01T23:59:00Z'}]
+        self.weights = [{'type': 'computationpower', 'site': 'SITE_A', 'weight': '42'},
+                        {'type': 'computationpower', 'site': 'SITE_B', 'weight': 0}]
+        self.globopts = {'generalcompressjson': 'False'}
+
+    def tearDown(self):
+        shutil.rmtree(self.dirpath)
+
+    def expected(self, data):
+        return json.loads(json.dumps([entry.to_dict() if hasattr(entry, 'to_dict')
+                                      else entry for entry in data]))
+
+    def read_avro(self, filename):
+        with open(filename, 'rb') as fp:
+            reader = fastavro.reader(fp)
+            codec = reader.codec
+            records = list(reader)
+        # optional fields left out are read back as null
+        for record in records:
+            for key in [key for key, value in record.items() if value is None]:
+                del record[key]
+        return records, codec
+
+    @unittest.skipIf(fastavro is None, 'fastavro not installed')
+    def test_avroReadBack(self):
+        for data, schema in [(self.group_endpoints, 'group_endpoints'),
+                             (self.group_groups, 'group_groups'),
+                             (self.downtimes, 'downtimes'),
+                             (self.weights, 'weights')]:
+            for compress, codec in [('False', 'null'), ('True', 'deflate')]:
+                filename = os.path.join(self.dirpath, schema + '.avro')
+                writer = AvroWriter(data, filename, compress, schema)
+                self.assertEqual(writer.write(), (True, None))
+                records, written_codec = self.read_avro(filename)
+                self.assertEqual(records, self.expected(data))
+                self.assertEqual(written_codec, codec)
+        self.assertEqual(sorted(os.listdir(self.dirpath)),
+                         ['downtimes.avro', 'group_endpoints.avro',
+                          'group_groups.avro', 'weights.avro'])
+
+    @unittest.skipIf(fastavro is None, 'fastavro not installed')
+    def test_avroSchemaMismatch(self):
+        filename = os.path.join(self.dirpath, 'downtimes.avro')
+        ret, excep = AvroWriter([{'hostname': 'se.foo'}], filename, 'False',
+                                'downtimes').write()
+        self.assertFalse(ret)
+        self.assertIsNotNone(excep)
+        self.assertEqual(os.listdir(self.dirpath), [])
+
+    @unittest.skipIf(msgpack is None, 'msgpack not installed')
+    def test_msgpackReadBack(self):
+        filename = os.path.join(self.dirpath, 'group_endpoints.msgpack')
+        for compress in ['False', 'True']:
+            writer = MsgpackWriter(self.group_endpoints * 3, filename, compress)
+            self.assertEqual(writer.write(), (True, None))
+        with open(filename, 'rb') as fp:
+            self.assertEqual(msgpack.unpackb(fp.read()),
+                             self.expected(self.group_endpoints * 3))
+        with gzip.open(filename + '.gz', 'rb') as fp:
+            self.assertEqual(msgpack.unpackb(fp.read()),
+                             self.expected(self.group_endpoints * 3))
+
+        MsgpackWriter([], filename, 'False').write()
+        with open(filename, 'rb') as fp:
+            self.assertEqual(msgpack.unpackb(fp.read()), [])
+
+    @unittest.skipIf(fastavro is None, 'fastavro not installed')
+    def test_buildWriter(self):
+        filename = os.path.join(self.dirpath, 'downtimes_2023_01_01.json')
+        self.assertEqual(output_filename(filename, 'json'), filename)
+        self.assertEqual(output_filename(filename, 'avro'),
+                         os.path.join(self.dirpath, 'downtimes_2023_01_01.avro'))
+        self.assertEqual(output_filename('downtimes_2023_01_01', 'msgpack'),
+                         'downtimes_2023_01_01.msgpack')
+
+        writer = build_writer(self.downtimes, filename, 'downtimes', self.globopts)
+        self.assertEqual(type(writer).__name__, 'JsonWriter')
+        self.globopts['jsonformat'] = 'MsgPack'
+        writer = build_writer(self.downtimes, filename, 'downtimes', self.globopts)
+        self.assertIsInstance(writer, MsgpackWriter)
+
+        self.globopts['jsonformat'] = 'avro'
+        self.assertEqual(write_output(self.downtimes, filename, 'downtimes',
+                                      self.globopts), (True, None))
+        records, _ = self.read_avro(output_filename(filename, 'avro'))
+        self.assertEqual(records, self.downtimes)
+
+        self.globopts['jsonformat'] = 'parquet'
+        ret, excep = write_output(self.downtimes, filename, 'downtimes', self.globopts)
+        self.assertFalse(ret)
+        self.assertIsInstance(excep, ValueError)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import shutil
+import tempfile
+import unittest
+import zlib
+
+from argo_connectors.io.parsecache import ParseCache, build_parse_cache
+from argo_connectors.parse.base import XMLPages
+from argo_connectors.records import GroupEndpoint, GroupGroup
+
+
+class ParseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.dirpath = tempfile.mkdtemp()
+        self.cache = ParseCache(self.dirpath, max_entries=2)
+        self.group_groups = [GroupGroup(group='NGI_FOO', type='NGI', subgroup='SITE_FOO',
+                                        tags={'certification': 'Certified'})]
+        self.group_endpoints = [GroupEndpoint(group='SITE_FOO', hostname='host.foo',
+                                              service='SRM', type='SITES', tags={},
+                                              notifications={'contacts': [], 'enabled': True})]
+
+    def tearDown(self):
+        shutil.rmtree(self.dirpath)
+
+    def test_key(self):
+        key = self.cache.key(['<results/>', None], 'CUSTOMERFOO', False)
+        self.assertEqual(key, self.cache.key([b'<results/>', None], 'CUSTOMERFOO', False))
+        self.assertNotEqual(key, self.cache.key(['<results/>', None], 'CUSTOMERFOO', True))
+        self.assertNotEqual(key, self.cache.key([None, '<results/>'], 'CUSTOMERFOO', False))
+        self.assertNotEqual(self.cache.key([XMLPages(['<a/>', '<b/>'])]),
+                            self.cache.key([XMLPages(['<a/><b/>'])]))
+        self.assertEqual(self.cache.key([{'results': [1, 2]}]),
+                         self.cache.key([{'results': [1, 2]}]))
+
+    def test_storeLoad(self):
+        key = self.cache.key(['<results/>'], 'CUSTOMERFOO')
+        self.assertIsNone(self.cache.load(key))
+        self.cache.store(key, (self.group_groups, self.group_endpoints))
+        self.assertEqual(self.cache.load(key), (self.group_groups, self.group_endpoints))
+
+    def test_loadRecords(self):
+        key = self.cache.key(['<results/>'], 'CUSTOMERFOO')
+        self.cache.store(key, (self.group_groups, self.group_endpoints))
+        group_groups, group_endpoints = self.cache.load(key)
+        self.assertIsInstance(group_groups[0], GroupGroup)
+        self.assertIsInstance(group_endpoints[0], GroupEndpoint)
+        self.assertEqual(group_endpoints[0]['notifications'], {'contacts': [], 'enabled': True})
+        self.assertFalse(os.path.exists(os.path.join(self.dirpath, key + '.pickle.z')))
+
+    def test_unusableEntry(self):
+        key = self.cache.key(['<results/>'], 'CUSTOMERFOO')
+        path = os.path.join(self.dirpath, key + '.json.z')
+        # garbage and records with fields no longer known are a miss
+        for content in [b'garbage', zlib.compress(b'[[{"removed": 1}], []]'),
+                        zlib.compress(b'{"group_groups": []}')]:
+            with open(path, 'wb') as fp:
+                fp.write(content)
+            self.assertIsNone(self.cache.load(key))
+
+    def test_evict(self):
+        keys = [self.cache.key([str(i)]) for i in range(3)]
+        for i, key in enumerate(keys):
+            self.cache.store(key, (self.group_groups, self.group_endpoints))
+            os.utime(os.path.join(self.dirpath, key + '.json.z'), (i, i))
+        self.cache.evict()
+        self.assertIsNone(self.cache.load(keys[0]))
+        self.assertIsNotNone(self.cache.load(keys[1]))
+        self.assertIsNotNone(self.cache.load(keys[2]))
+
+    def test_buildParseCache(self):
+        self.assertIsNone(build_parse_cache({'inputstatesavedir': self.dirpath}))
+        cache = build_parse_cache({'inputstatesavedir': self.dirpath,
+                                   'cacheparsed': 'True'})
+        self.assertEqual(cache.dirpath, os.path.join(self.dirpath, 'parsecache'))
+        self.assertEqual(cache.max_entries, 32)
+
+
+if __name__ == '__main__':
+    unittest.main()
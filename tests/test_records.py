@@ -0,0 +1,69 @@
+import copy
+import json
+import pickle
+import unittest
+
+from argo_connectors.io.jsonwrite import JsonWriter
+from argo_connectors.records import GroupEndpoint, GroupGroup, json_default
+
+
+class TopoRecords(unittest.TestCase):
+    def setUp(self):
+        self.endpoint = GroupEndpoint()
+        self.endpoint['type'] = 'SITES'
+        self.endpoint['group'] = ''.join(['SITE', '_A'])
+        self.endpoint['service'] = 'SRM'
+        self.endpoint['hostname'] = 'se.foo'
+        self.endpoint['tags'] = {'monitored': '1', 'production': '1'}
+        self.endpoint_dict = {
+            'type': 'SITES', 'group': 'SITE_A', 'service': 'SRM',
+            'hostname': 'se.foo', 'tags': {'monitored': '1', 'production': '1'}
+        }
+
+    def test_mapping(self):
+        self.assertEqual(self.endpoint, self.endpoint_dict)
+        self.assertEqual(self.endpoint_dict, self.endpoint)
+        self.assertEqual(len(self.endpoint), 5)
+        self.assertNotIn('notifications', self.endpoint)
+        self.assertNotIn('subgroup', self.endpoint)
+        self.assertIsNone(self.endpoint.get('notifications'))
+        self.assertRaises(KeyError, self.endpoint.__getitem__, 'subgroup')
+        self.assertRaises(KeyError, self.endpoint.__setitem__, 'foo', 'bar')
+        self.assertRaises(KeyError, self.endpoint.__getitem__, 'keys')
+        self.endpoint['notifications'] = {'contacts': [], 'enabled': True}
+        self.assertIn('notifications', self.endpoint)
+        del self.endpoint['notifications']
+        self.assertEqual(self.endpoint, self.endpoint_dict)
+        self.assertRaises(KeyError, self.endpoint.__delitem__, 'notifications')
+        self.endpoint['tags']['info_bdii_SRM2_PORT'] = '8446'
+        self.assertNotEqual(self.endpoint, self.endpoint_dict)
+        self.assertFalse(hasattr(self.endpoint, '__dict__'))
+
+    def test_internedFields(self):
+        other = GroupEndpoint(type='SITES', group=''.join(['SITE', '_A']),
+                              hostname=''.join(['se', '.foo']))
+        self.assertIs(other['group'], self.endpoint['group'])
+        self.assertIsNot(other['hostname'], self.endpoint['hostname'])
+
+    def test_serialise(self):
+        group = GroupGroup(type='NGI', group='NGI_A', subgroup='SITE_A',
+                           tags={'certification': 'Certified'})
+        self.assertEqual(json.loads(json.dumps([group, self.endpoint], default=json_default)),
+                         [{'type': 'NGI', 'group': 'NGI_A', 'subgroup': 'SITE_A',
+                           'tags': {'certification': 'Certified'}}, self.endpoint_dict])
+        self.assertEqual(list(json.loads(json.dumps(self.endpoint, default=json_default)).keys()),
+                         ['type', 'group', 'service', 'hostname', 'tags'])
+        self.assertRaises(TypeError, json.dumps, object(), default=json_default)
+        for protocol in range(2, pickle.HIGHEST_PROTOCOL + 1):
+            loaded = pickle.loads(pickle.dumps([group, self.endpoint], protocol))
+            self.assertEqual(loaded, [group, self.endpoint])
+            self.assertIsInstance(loaded[1], GroupEndpoint)
+        self.assertEqual(copy.deepcopy(self.endpoint), self.endpoint_dict)
+
+    def test_jsonWriter(self):
+        writer = JsonWriter([self.endpoint], '/dev/null', 'False')
+        self.assertEqual(writer.write_json(), (True, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -125,6 +125,14 @@ class ParseWebApi(unittest.TestCase):
             ]
         )
 
+    def test_WebApiFeedParseBytes(self):
+        with open('tests/sample-service_types_webapi.json', 'rb') as feed_file:
+            raw = feed_file.read()
+        chunks = [raw[i:i + 100] for i in range(0, len(raw), 100)]
+        expected = self.services_webapi.get_data()
+        self.assertEqual(ParseWebApiServiceTypes(self.logger, raw).get_data(), expected)
+        self.assertEqual(ParseWebApiServiceTypes(self.logger, chunks).get_data(), expected)
+
     def test_FailedWebApiFeedParse(self):
         with self.assertRaises(ConnectorParseError) as cm:
             fail_services_webapi = ParseWebApiServiceTypes(
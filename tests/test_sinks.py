@@ -0,0 +1,77 @@
+import unittest
+import asyncio
+import threading
+import time
+
+import mock
+
+from argo_connectors.tasks.common import SinkPipeline
+
+
+CUSTOMER_NAME = 'CUSTOMERFOO'
+
+
+class Sinks(unittest.TestCase):
+    def setUp(self):
+        self.logger = mock.Mock()
+        self.logger.customer = CUSTOMER_NAME
+        self.loop = asyncio.get_event_loop()
+        self.done = list()
+
+    async def async_sink(self, name, delay):
+        await asyncio.sleep(delay)
+        self.done.append(name)
+
+    def blocking_sink(self, name, delay):
+        time.sleep(delay)
+        self.done.append((name, threading.current_thread() is threading.main_thread()))
+
+    def test_concurrentSinks(self):
+        sinks = SinkPipeline(self.logger, self.loop)
+        sinks.add('state', self.async_sink, 'state', 0.2)
+        sinks.add('webapi', self.async_sink, 'webapi', 0.2)
+        sinks.add('json', self.blocking_sink, 'json', 0.2, blocking=True)
+
+        start = time.perf_counter()
+        self.loop.run_until_complete(sinks.run())
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+        self.assertEqual(sorted(self.done, key=str), [('json', False), 'state', 'webapi'])
+        self.assertEqual(sorted(sinks.timings.keys()), ['json', 'state', 'webapi'])
+        self.assertTrue(all(t >= 0.15 for t in sinks.timings.values()))
+        self.assertTrue(self.logger.info.call_args[0][0].startswith(
+            'Customer:CUSTOMERFOO Sinks state:'))
+        self.assertFalse(self.logger.error.called)
+
+    def test_failedSinks(self):
+        async def failing(exc):
+            raise exc
+
+        def exiting():
+            raise SystemExit(1)
+
+        sinks = SinkPipeline(self.logger)
+        sinks.add('state', failing, ValueError('state failed'))
+        sinks.add('webapi', self.async_sink, 'webapi', 0.1)
+        sinks.add('json', exiting, blocking=True)
+        with self.assertRaises(ValueError):
+            self.loop.run_until_complete(sinks.run())
+
+        # other sinks are finished regardless
+        self.assertEqual(self.done, ['webapi'])
+        self.assertEqual(self.logger.error.call_count, 2)
+        self.assertEqual(self.logger.error.call_args_list[1][0][0],
+                         'Customer:CUSTOMERFOO Sink json failed - SystemExit(1)')
+
+        sinks = SinkPipeline(self.logger)
+        sinks.add('json', exiting, blocking=True)
+        with self.assertRaises(SystemExit):
+            self.loop.run_until_complete(sinks.run())
+
+    def test_noSinks(self):
+        self.loop.run_until_complete(SinkPipeline(self.logger).run())
+        self.assertFalse(self.logger.info.called)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,8 +5,9 @@ from argo_connectors.parse.gocdb_topology import ParseServiceGroups, ParseServic
 from argo_connectors.parse.flat_topology import ParseFlatEndpoints
 from argo_connectors.parse.provider_topology import ParseTopo, ParseExtensions, buildmap_id2groupname
 from argo_connectors.parse.agora_topology import ParseAgoraTopo
+from argo_connectors.parse.base import XMLPages
 from argo_connectors.exceptions import ConnectorParseError
-from argo_connectors.mesh.contacts import attach_contacts_topodata
+from argo_connectors.mesh.contacts import attach_contacts_topodata, filter_dups_noemails
 
 logger = Logger('test_topofeed.py')
 CUSTOMER_NAME = 'CUSTOMERFOO'
@@ -158,6 +159,25 @@ class ParseServiceEndpointsTest(unittest.TestCase):
         self.assertIsNotNone(temp_group)
         self.assertEqual(temp_group['hostname'], 'ce.physics.science.az_1555G0')
 
+    def test_ChunkedFeed(self):
+        chunks = [self.content[i:i + 512] for i in range(0, len(self.content), 512)]
+        parse_service_endpoints = ParseServiceEndpoints(logger, chunks, CUSTOMER_NAME)
+        self.assertEqual(parse_service_endpoints.get_group_endpoints(), self.group_endpoints)
+
+        chunks = [chunk.encode('utf-8') for chunk in chunks]
+        parse_service_endpoints_ext = ParseServiceEndpoints(logger, chunks, 'CUSTOMERFOO', uid=True, pass_extensions=True)
+        self.assertEqual(parse_service_endpoints_ext.get_group_endpoints(), self.group_endpoints_ext)
+
+    def test_PaginatedFeed(self):
+        split = self.content.index('<SERVICE_ENDPOINT', self.content.index('<SERVICE_ENDPOINT') + 1)
+        meta = '<meta><count>{}</count></meta>\n  '
+        pages = XMLPages([
+            self.content[:split].replace('<results>', '<results>' + meta.format(1)) + '</results>',
+            '<?xml version="1.0" encoding="UTF-8"?>\n<results>' + meta.format(3) + self.content[split:]
+        ])
+        parse_service_endpoints = ParseServiceEndpoints(logger, pages, CUSTOMER_NAME)
+        self.assertEqual(parse_service_endpoints.get_group_endpoints(), self.group_endpoints)
+
     def test_ConnectorParseErrorException(self):
         # Assert proper exception is thrown if empty xml is given to the function
         with self.assertRaises(ConnectorParseError) as cm:
@@ -366,6 +386,27 @@ class MeshServiceGroupsAndContacts(unittest.TestCase):
             }
         )
 
+    def test_ServiceGroupsSharedAndDictContacts(self):
+        contacts = {
+            'NGI_ARMGRID_SERVICES': [{'email': 'Name1.Surname1@email.com'},
+                                     {'email': 'Name1.Surname1@email.com'},
+                                     {'email': 'Name2.Surname2@email.com;Name3.Surname3@email.com'}],
+        }
+        topodata = [dict(self.sample_servicegroups_data[0], group='EGI'),
+                    dict(self.sample_servicegroups_data[0], group='EGI2')]
+        attach_contacts_topodata(logger, contacts, topodata, False)
+        self.assertEqual(topodata[0]['notifications']['contacts'],
+                         ['Name1.Surname1@email.com', 'Name2.Surname2@email.com',
+                          'Name3.Surname3@email.com'])
+        self.assertEqual(topodata[0]['notifications'], topodata[1]['notifications'])
+        self.assertIsNot(topodata[0]['notifications']['contacts'],
+                         topodata[1]['notifications']['contacts'])
+
+    def test_FilterDupsNoEmails(self):
+        self.assertEqual(filter_dups_noemails(['a@foo.com,b@foo.com', 'noemail',
+                                               'a@foo.com,b@foo.com', 'c@foo.com']),
+                         ['a@foo.com', 'b@foo.com', 'c@foo.com'])
+
 
 class MeshServiceEndpointsAndContacts(unittest.TestCase):
     def setUp(self):
@@ -446,6 +487,15 @@ class MeshServiceEndpointsAndContacts(unittest.TestCase):
         )
 
 
+    def test_ServiceEndpointsUidContacts(self):
+        topodata = [dict(self.sample_serviceendpoints_data[0], hostname='fqdn1.com_1234G0'),
+                    dict(self.sample_serviceendpoints_data[1], hostname='fqdn3.com')]
+        contacts = {'fqdn1.com+1234G0': ['Name1.Surname1@email.com']}
+        joined = attach_contacts_topodata(logger, contacts, topodata, True)
+        self.assertEqual(joined[0]['notifications'],
+                         {'contacts': ['Name1.Surname1@email.com'], 'enabled': True})
+        self.assertEqual(joined[1]['notifications'], {'enabled': True})
+
 class ParseServiceEndpointsAndServiceGroupsCsv(unittest.TestCase):
     def setUp(self):
         with open('tests/sample-topo.csv') as feed_file:
@@ -745,6 +795,12 @@ class ParseSitesTest(unittest.TestCase):
             ]
         )
 
+    def test_ChunkedFeed(self):
+        chunks = [self.content[i:i + 100] for i in range(0, len(self.content), 100)]
+        parse_sites = ParseSites(logger, chunks, CUSTOMER_NAME, False, False,
+                                 self.notification_flag)
+        self.assertEqual(parse_sites.get_group_groups(), self.group_groups)
+
 
 class ParseEoscProvider(unittest.TestCase):
     def setUp(self):
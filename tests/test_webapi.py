@@ -0,0 +1,146 @@
+import asyncio
+import json
+import shutil
+import tempfile
+import unittest
+import zlib
+
+import mock
+
+from argo_connectors.io.webapi import WebAPI, PublishSnapshot, build_snapshot_dir, json_stream, build_compress_opts
+from argo_connectors.log import Logger
+
+logger = Logger('test_webapi.py')
+CUSTOMER_NAME = 'CUSTOMERFOO'
+
+
+async def read_stream(stream):
+    chunks = list()
+    async for chunk in stream:
+        chunks.append(chunk)
+    return chunks
+
+
+class WebAPIStreamedUpload(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        logger.customer = CUSTOMER_NAME
+        self.group_endpoints = [
+            {'group': 'SITE_FOO_{}'.format(i), 'hostname': 'host{}.foo'.format(i),
+             'service': 'SRM', 'type': 'SITES', 'tags': {'info_URL': 'šđč'}}
+            for i in range(100)
+        ]
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_jsonStream(self):
+        for data in [self.group_endpoints, {'endpoints': self.group_endpoints},
+                     {'name': 'weights', 'groups': []}, [], {}]:
+            chunks = self.loop.run_until_complete(read_stream(json_stream(data, chunk_size=512)))
+            self.assertEqual(b''.join(chunks), json.dumps(data).encode('utf-8'))
+            self.assertTrue(all([len(chunk) < 1024 for chunk in chunks]))
+
+    def test_sendStreamed(self):
+        webapi = WebAPI('topology-gocdb-connector.py', 'api.devel.argo.grnet.gr',
+                        'xxxx', logger, 1, date='2023-01-01')
+        webapi.session = mock.Mock()
+        webapi.session.http_post = mock.AsyncMock(return_value=('', {}, 201))
+        webapi.session.close = mock.AsyncMock()
+        self.loop.run_until_complete(webapi.send(self.group_endpoints, 'endpoints'))
+        kwargs = webapi.session.http_post.call_args[1]
+        self.assertEqual(kwargs['headers']['Content-Type'], 'application/json')
+        # factory gives fresh stream for every try
+        for _ in range(2):
+            chunks = self.loop.run_until_complete(read_stream(kwargs['data']()))
+            self.assertEqual(json.loads(b''.join(chunks)), self.group_endpoints)
+
+    def test_sendCompressed(self):
+        for encoding, wbits in [('gzip', 31), ('deflate', 15)]:
+            webapi = WebAPI('topology-gocdb-connector.py', 'api.devel.argo.grnet.gr',
+                            'xxxx', logger, 1, date='2023-01-01', compress=encoding)
+            webapi.session = mock.Mock()
+            webapi.session.http_post = mock.AsyncMock(return_value=('', {}, 201))
+            webapi.session.close = mock.AsyncMock()
+            self.loop.run_until_complete(webapi.send(self.group_endpoints, 'endpoints'))
+            kwargs = webapi.session.http_post.call_args[1]
+            self.assertEqual(kwargs['headers']['Content-Encoding'], encoding)
+            chunks = self.loop.run_until_complete(read_stream(kwargs['data']()))
+            raw = zlib.decompress(b''.join(chunks), wbits)
+            self.assertEqual(raw, json.dumps(self.group_endpoints).encode('utf-8'))
+            self.assertLess(len(b''.join(chunks)), len(raw))
+
+    def test_buildCompressOpts(self):
+        self.assertEqual(build_compress_opts({}), {'compress': None})
+        self.assertEqual(build_compress_opts({'publishcompress': ''}), {'compress': None})
+        self.assertEqual(build_compress_opts({'publishcompress': 'GZIP', 'publishcompresslevel': '1'}),
+                         {'compress': 'gzip', 'compress_level': 1})
+
+
+class WebAPIPublishDiff(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.dirpath = tempfile.mkdtemp()
+        logger.customer = CUSTOMER_NAME
+        self.group_endpoints = [
+            {'group': 'SITE_FOO', 'hostname': 'host1.foo', 'service': 'SRM',
+             'type': 'SITES', 'tags': {'monitored': '1', 'production': '1'}},
+            {'group': 'SITE_FOO', 'hostname': 'host2.foo', 'service': 'CREAM-CE',
+             'type': 'SITES', 'tags': {'monitored': '1', 'production': '1'}}
+        ]
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(asyncio.new_event_loop())
+        shutil.rmtree(self.dirpath)
+
+    def _webapi(self):
+        webapi = WebAPI('topology-gocdb-connector.py', 'api.devel.argo.grnet.gr',
+                        'xxxx', logger, 1, date='2023-01-01',
+                        snapshot_dir=self.dirpath)
+        webapi.session = mock.Mock()
+        webapi.session.http_post = mock.AsyncMock(return_value=('', {}, 201))
+        webapi.session.close = mock.AsyncMock()
+        return webapi
+
+    def test_snapshotDiff(self):
+        snapshot = PublishSnapshot(self.dirpath, 'https://api/topology/endpoints', 'xxxx')
+        self.assertEqual(snapshot.diff(self.group_endpoints), (2, 0))
+        snapshot.save()
+        snapshot = PublishSnapshot(self.dirpath, 'https://api/topology/endpoints', 'xxxx')
+        changed = [dict(self.group_endpoints[0], tags={'monitored': '0'})]
+        self.assertEqual(snapshot.diff(changed), (1, 2))
+        other = PublishSnapshot(self.dirpath, 'https://api/topology/groups', 'xxxx')
+        self.assertEqual(other.diff(self.group_endpoints), (2, 0))
+
+    def test_sendUnchanged(self):
+        webapi = self._webapi()
+        self.loop.run_until_complete(webapi.send(self.group_endpoints, 'endpoints'))
+        self.assertEqual(webapi.session.http_post.call_count, 1)
+
+        webapi = self._webapi()
+        self.loop.run_until_complete(webapi.send(list(reversed(self.group_endpoints)), 'endpoints'))
+        self.assertFalse(webapi.session.http_post.called)
+
+        webapi = self._webapi()
+        self.loop.run_until_complete(webapi.send(self.group_endpoints[:1], 'endpoints'))
+        self.assertEqual(webapi.session.http_post.call_count, 1)
+
+    def test_sendFailedNoSnapshot(self):
+        webapi = self._webapi()
+        webapi.session.http_post.return_value = ('{"message": "failed"}', {}, 500)
+        self.loop.run_until_complete(webapi.send(self.group_endpoints, 'endpoints'))
+        webapi = self._webapi()
+        self.loop.run_until_complete(webapi.send(self.group_endpoints, 'endpoints'))
+        self.assertEqual(webapi.session.http_post.call_count, 1)
+
+    def test_buildSnapshotDir(self):
+        self.assertIsNone(build_snapshot_dir({'inputstatesavedir': '/var/lib/argo-connectors/states'}))
+        self.assertEqual(build_snapshot_dir({'inputstatesavedir': '/var/lib/argo-connectors/states',
+                                             'publishdiff': 'True'}),
+                         '/var/lib/argo-connectors/states/webapi')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import asyncio
+import os
+import threading
+import unittest
+
+from argo_connectors.log import Logger
+from argo_connectors.parse.base import XMLPages
+from argo_connectors.parse.gocdb_topology import ParseServiceEndpoints
+from argo_connectors.workers import FeedHandoff, SpooledPages, WorkerPool, build_worker_pool, worker_logger
+
+
+logger = Logger('test_workers.py')
+CUSTOMER_NAME = 'CUSTOMERFOO'
+
+
+def parse_endpoints(data):
+    return ParseServiceEndpoints(logger, data, CUSTOMER_NAME).get_group_endpoints()
+
+
+class FeedHandoffTest(unittest.TestCase):
+    def test_singleDocument(self):
+        handoff = FeedHandoff('<results>š</results>')
+        self.assertEqual(b''.join(handoff.load()), '<results>š</results>'.encode('utf-8'))
+        handoff.remove()
+        self.assertFalse(os.path.exists(handoff.path))
+
+    def test_pages(self):
+        handoff = FeedHandoff(XMLPages(['<results>1</results>', b'<results>2</results>']))
+        pages = handoff.load()
+        self.assertIsInstance(pages, XMLPages)
+        self.assertEqual([b''.join(page) for page in pages],
+                         [b'<results>1</results>', b'<results>2</results>'])
+        handoff.remove()
+
+
+class WorkerPoolTest(unittest.TestCase):
+    def setUp(self):
+        with open('tests/sample-service_endpoint.xml') as feed_file:
+            self.content = feed_file.read()
+        logger.customer = CUSTOMER_NAME
+        self.loop = asyncio.new_event_loop()
+        self.parse = parse_endpoints
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_inProcess(self):
+        threads = list()
+
+        def parse(data):
+            threads.append(threading.get_ident())
+            return self.parse(data)
+
+        pool = WorkerPool(1, len(self.content) + 1)
+        res = self.loop.run_until_complete(pool.submit(self.loop, parse, self.content))
+        self.assertIsNone(pool._executor)
+        self.assertEqual(res, self.parse(self.content))
+        # small feed is parsed off the event loop thread
+        self.assertNotEqual(threads, [threading.get_ident()])
+        self.assertEqual(len(threads), 1)
+
+    def test_processPool(self):
+        pool = WorkerPool(1, 0)
+        pages = XMLPages([self.content, self.content])
+        try:
+            res = self.loop.run_until_complete(pool.submit(self.loop, self.parse, self.content))
+            self.assertEqual(res, self.parse(self.content))
+            res = self.loop.run_until_complete(pool.submit(self.loop, self.parse, pages))
+            self.assertEqual(res, self.parse(pages))
+            self.assertIsNotNone(pool._executor)
+        finally:
+            pool.shutdown()
+        self.assertIsNone(pool._executor)
+
+    def test_spooledPages(self):
+        pool = WorkerPool(1, len(self.content) + 1)
+        pages = SpooledPages()
+        try:
+            self.loop.run_until_complete(pool.spool(self.loop, pages, self.content))
+            self.assertIsNone(pages.handoff)
+            self.loop.run_until_complete(pool.spool(self.loop, pages, self.content))
+            handoff = pages.handoff
+            self.assertEqual(len(handoff.pages), 2)
+            res = self.loop.run_until_complete(pool.submit(self.loop, self.parse, pages))
+            self.assertEqual(res, self.parse(XMLPages([self.content, self.content])))
+            # spooled feed is not written once more
+            self.assertEqual(len(handoff.pages), 2)
+            self.assertFalse(os.path.exists(handoff.path))
+        finally:
+            pool.shutdown()
+
+    def test_workerLogger(self):
+        wlogger = worker_logger('test_workers.py', CUSTOMER_NAME)
+        self.assertEqual(wlogger.customer, CUSTOMER_NAME)
+        self.assertIs(wlogger.logger, logger.logger)
+
+    def test_buildWorkerPool(self):
+        pool = build_worker_pool({'workerspoolsize': '5'})
+        self.assertEqual(pool.size, 5)
+        self.assertEqual(pool.inprocess_threshold, 512 * 1024)